@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class ActivityDiary:
+    """Buffered writer for the history of finished activities. Rows are stored as integer codes in a preallocated
+    buffer: activities by id and locations by type code. Names are only looked up when a full chunk is flushed to
+    disk, so logging a batch of finished activities does not format strings.
+
+    :param file_name: Output file.
+    :param activity_names: Name of each activity id.
+    :param chunk_size: Number of rows buffered before writing to disk.
+    :param file_format: Either "csv", rows are appended on each flush, or "npz", the integer coded columns and the name
+     tables are saved when the diary is closed.
+    """
+    headers = ["id", "activity", "start", "duration", "location"]
+
+    def __init__(self, file_name, activity_names, chunk_size=2 ** 16, file_format="csv"):
+        if file_format not in ["csv", "npz"]:
+            raise ValueError(f"Unsupported diary format '{file_format}', use 'csv' or 'npz'.")
+
+        self.file_name = file_name
+        self.file_format = file_format
+        self.activity_names = np.array(activity_names, dtype=object)
+        self.location_names = np.array([], dtype=object)
+
+        self.buffer = np.zeros((chunk_size, len(self.headers)), dtype=int)
+        self.num_rows = 0
+        self.chunks = []
+
+        # Location type code of each region index entry
+        self.__region_index = None
+        self.__location_codes = np.array([], dtype=int)
+
+        self.file = None
+        if file_format == "csv":
+            self.file = open(file_name, "w+")
+            self.file.write(",".join(self.headers) + "\n")
+
+    def location_codes(self, region_index):
+        """Returns the location type code of each region index entry. Codes are recomputed when the region index
+        changes."""
+        if region_index is self.__region_index:
+            return self.__location_codes
+
+        names = [type(r).__name__ for r in np.atleast_2d(region_index)[:, 2]]
+        known = {n: ix for ix, n in enumerate(self.location_names)}
+        new_names = [n for n in dict.fromkeys(names) if n not in known]
+        self.location_names = np.append(self.location_names, np.array(new_names, dtype=object))
+        known.update({n: ix for ix, n in enumerate(self.location_names)})
+
+        self.__location_codes = np.array([known[n] for n in names], dtype=int)
+        self.__region_index = region_index
+        return self.__location_codes
+
+    def append(self, ids, activity_id, start, duration, location_codes):
+        n = len(ids)
+        while n > len(self.buffer) - self.num_rows:
+            self.flush()
+            if n > len(self.buffer):
+                self.buffer = np.zeros((n, len(self.headers)), dtype=int)
+
+        rows = self.buffer[self.num_rows:self.num_rows + n]
+        rows[:, 0] = ids
+        rows[:, 1] = activity_id
+        rows[:, 2] = start
+        rows[:, 3] = duration
+        rows[:, 4] = location_codes
+        self.num_rows += n
+
+    def flush(self):
+        if self.num_rows == 0:
+            return
+
+        rows = self.buffer[:self.num_rows]
+        self.num_rows = 0
+        if self.file_format == "npz":
+            self.chunks.append(rows.copy())
+            return
+
+        columns = [rows[:, 0].astype(str), self.activity_names[rows[:, 1]], rows[:, 2].astype(str),
+                   rows[:, 3].astype(str), self.location_names[rows[:, 4]]]
+        self.file.write("\n".join([",".join(r) for r in zip(*columns)]) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.file_format == "npz" and self.file_name is not None:
+            rows = np.vstack(self.chunks or [self.buffer[:0]])
+            np.savez(self.file_name, **{h: rows[:, ix] for ix, h in enumerate(self.headers)},
+                     activity_names=self.activity_names.astype(str), location_names=self.location_names.astype(str))
+            self.chunks = []
+            self.file_name = None
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -2,15 +2,28 @@ import numpy as np
 
 from i2mb import Model
 from i2mb.activities import ActivityProperties, ActivityDescriptorProperties, TypesOfLocationBlocking
+from i2mb.activities.activity_diary import ActivityDiary
 from i2mb.activities.base_activity import ActivityList, ActivityController
 from i2mb.engine.relocator import Relocator
 from i2mb.utils import time
+from i2mb.utils.collections import EventQueue
+
+
+def enforce_unique_resource_utilization(requested_location):
+    """Given a list of location requests, this method will grant the first request per location.
+    The response is a boolean array with the shape of requested_location."""
+    requested_location = np.asarray(requested_location)
+    _, first_request = np.unique(requested_location.ravel(), return_index=True)
+    response = np.zeros(requested_location.size, dtype=bool)
+    response[first_request] = True
+    return response.reshape(requested_location.shape)
 
 
 class ActivityManager(Model):
-    file_headers = ["id", "activity", "start", "duration", "location"]
+    file_headers = ActivityDiary.headers
 
-    def __init__(self, population, relocator: 'Relocator' = None, write_diary=False):
+    def __init__(self, population, relocator: 'Relocator' = None, write_diary=False, diary_format="csv",
+                 multiple_in_progress=False):
         super().__init__()
 
         self.controllers = []
@@ -18,6 +31,7 @@ class ActivityManager(Model):
         self.activity_controllers = {}
 
         self.write_diary = write_diary
+        self.diary_format = diary_format
         self.relocator = None
         self.region_index = np.array([-1, -1, -1])
         self.blocked_locations = np.zeros(len(self.region_index), dtype=bool)
@@ -30,8 +44,23 @@ class ActivityManager(Model):
         self.current_descriptors = np.full((population_size, len(ActivityDescriptorProperties)), -1, dtype=int)
         self.current_activity_interruptable = np.ones(len(self.population), dtype=bool)
 
+        # Only the current activity of each agent is advanced every tick, unless activities can be set in progress
+        # outside the manager, in which case every activity in progress is advanced.
+        self.multiple_in_progress = multiple_in_progress
+
+        # Activity ends are scheduled in ticks, i.e., number of pre_step calls, so that each tick only the agents with
+        # an activity end due are visited. Starts are not scheduled, controllers decide them every step, and the
+        # elapsed time of current activities is advanced for every active agent in post_step.
+        self.tick = 0
+        self.activity_end_events = EventQueue()
+        self.activity_end_due = np.full(population_size, -1, dtype=int)
+
+        # (agent, activity) pairs whose blocked_for period is counting down
+        self.blocked_ids = np.array([], dtype=int)
+        self.blocked_activities = np.array([], dtype=int)
+
         # Activity Diary
-        self.file = None
+        self.diary = None
 
         # Activity rankings
         self.activity_ranking = {}
@@ -47,9 +76,9 @@ class ActivityManager(Model):
         if self.write_diary:
             self.register_activity_stop_logger()
             super().post_init(base_file_name=base_file_name)
-            self.base_file_name = f"{self.base_file_name}_activity_history.csv"
-            self.file = open(self.base_file_name, "w+")
-            self.file.write(",".join(self.file_headers) + "\n")
+            self.base_file_name = f"{self.base_file_name}_activity_history.{self.diary_format}"
+            self.diary = ActivityDiary(self.base_file_name, [type(a).__name__ for a in self.activity_list.activities],
+                                       file_format=self.diary_format)
 
     def register_activity_on_stop_method(self):
         for activity in self.activity_list.activities:
@@ -60,7 +89,7 @@ class ActivityManager(Model):
             activity.register_stop_callbacks(self.log_finished_activities)
 
     def log_finished_activities(self, activity_id, t, ids):
-        if self.file is None:
+        if self.diary is None:
             return
 
         if len(ids) == 0:
@@ -68,20 +97,19 @@ class ActivityManager(Model):
 
         ids = self.population.index[ids]
         activity = self.activity_list.activities[activity_id]
-        elapsed = activity.get_elapsed()[ids]
-        start = activity.get_start()[ids]
-        activity_type = [type(activity).__name__] * len(ids)
-        location_ids = activity.get_location()[ids]
-        locations = [type(loc_).__name__ for loc_ in self.region_index[location_ids, 2]]
-        activity_log = np.vstack([ids, activity_type, start, elapsed, locations]).T
-        self.file.write("\n".join([",".join(r) for r in activity_log]) + "\n")
+        location_codes = self.diary.location_codes(self.region_index)[activity.get_location()[ids]]
+        self.diary.append(ids, activity_id, activity.get_start()[ids], activity.get_elapsed()[ids], location_codes)
 
     def update_interruptable_flag(self, act_id, t, stop_selector):
         self.current_activity_interruptable[stop_selector] = True
 
+    def final(self, t):
+        if self.diary is not None:
+            self.diary.close()
+
     def __del__(self):
-        if self.file is not None:
-            self.file.close()
+        if self.diary is not None:
+            self.diary.close()
 
     def generate_activity_ranking(self):
         for ix, act in enumerate(self.activity_list.activities):
@@ -98,13 +126,16 @@ class ActivityManager(Model):
         return self.activity_list.activities[activity.id]
 
     def pre_step(self, t):
+        self.tick += 1
         self.update_blocked_activities()
         self.stop_activities_with_duration(t)
 
     def step(self, t):
+        """Queries the controllers for new activities. Controllers are asked about the whole population every step,
+        so this is still a scan over all agents."""
         # Initialize with inactive population
         inactive = self.current_activity == -1
-        new_activities = self.current_activity == -1
+        new_activities = inactive.copy()
         for controller in self.controllers:  # controller: ActivityController
             new_activities |= controller.has_new_activity(inactive)
 
@@ -120,9 +151,8 @@ class ActivityManager(Model):
     def __unblock_location(self, region):
         """If the parent region is blocked, we assume the at least one child blocked it. Therefore, we recursively
         check the parent to ensure all blocked children are considered before unlocking the parent. """
-        # The children at listed starting in the second entry.
-        blocked_children = region.blocked_locations[2:]
-        if ~blocked_children.any():
+        descendants = region.region_tree.get_descendants(region.index)
+        if not self.blocked_locations[descendants].any():
             region.blocked = False
 
             if region.parent is None:
@@ -176,42 +206,99 @@ class ActivityManager(Model):
             self.blocked_locations[parent_ids] = True
 
     def update_blocked_activities(self):
-        blocked_for_ix = ActivityProperties.blocked_for
-        in_progress_ix = ActivityProperties.in_progress
-        mask = self.activity_list.activity_values[:, blocked_for_ix, :] > 0
-        mask &= self.activity_list.activity_values[:, in_progress_ix, :] == 0
-        if mask.any():
-            self.activity_list.activity_values[:, blocked_for_ix, :][mask] -= 1
-            unblock_activities = self.activity_list.activity_values[:, blocked_for_ix, :] == 0
-            unblock_activities &= mask
-            if unblock_activities.any():
-                for act_ix in range(unblock_activities.shape[-1]):
-                    activity = self.activity_list.activities[act_ix]
-                    activity_unblock = unblock_activities[:, act_ix].ravel()
-                    if activity_unblock.any():
-                        activity.run_unblock_callbacks(time(), activity_unblock)
+        """Counts down the blocked_for period of stopped activities and unblocks the ones that reach 0. Only the
+        pairs registered by :meth:`stop_activities` or recorded by the activity list on a non-zero write are visited,
+        and their stored blocked_for is decremented every tick, since controllers read the remaining period."""
+        pairs = self.activity_list.pop_blocked_for()
+        if len(pairs) > 0:
+            self.register_blocked_activities(pairs[:, 0], pairs[:, 1])
+
+        if len(self.blocked_ids) == 0:
+            return
+
+        ids, activities = self.blocked_ids, self.blocked_activities
+        blocked_for = self.activity_list.gather(ids, ActivityProperties.blocked_for, activities)
+        in_progress = self.activity_list.gather(ids, ActivityProperties.in_progress, activities)
+        counting = (blocked_for > 0) & (in_progress == 0)
+        blocked_for[counting] -= 1
+
+        # Written in place, the count down does not need to be recorded again.
+        self.activity_list.activity_values.put(
+            self.activity_list.flat_index(ids, ActivityProperties.blocked_for, activities), blocked_for)
+
+        # Pairs restarted while blocked stay registered, their count down continues once they stop.
+        keep = blocked_for > 0
+        self.blocked_ids, self.blocked_activities = ids[keep], activities[keep]
+
+        unblock = counting & ~keep
+        ids, activities = ids[unblock], activities[unblock]
+        for act_ix in np.unique(activities):
+            activity = self.activity_list.activities[act_ix]
+            activity_unblock = np.zeros(len(self.population), dtype=bool)
+            activity_unblock[ids[activities == act_ix]] = True
+            activity.run_unblock_callbacks(time(), activity_unblock)
+
+    def register_blocked_activities(self, ids, activities):
+        """Registers the (agent, activity) pairs with a blocked_for period for count down."""
+        blocked = self.activity_list.get_blocked_for(ids, activities) > 0
+        if not blocked.any():
+            return
+
+        pairs = np.vstack([np.column_stack([self.blocked_ids, self.blocked_activities]),
+                           np.column_stack([ids[blocked], activities[blocked]])])
+        pairs = np.unique(pairs, axis=0)
+        self.blocked_ids, self.blocked_activities = pairs[:, 0], pairs[:, 1]
+
+    def schedule_activity_end(self, ids, duration):
+        """Schedules the stop of activities with a duration greater than 0."""
+        timed = duration > 0
+        ids, due = ids[timed], self.tick + duration[timed]
+        self.activity_end_due[ids] = due
+        self.activity_end_events.schedule(due, ids)
 
     def stop_activities_with_duration(self, t):
         """Activities that have duration set to a number greater than 0 are in_progress for that length of time. Once
-        the elapsed time equals the duration time, the activity is stopped."""
-        ids = self.current_activity != -1
+        the elapsed time equals the duration time, the activity is stopped. Only agents with an activity end due this
+        tick are checked."""
+        due, ids, _ = self.activity_end_events.pop_due(self.tick)
+        ids = np.unique(ids[self.activity_end_due[ids] == due])
+        ids = ids[self.current_activity[ids] != -1]
+        if len(ids) == 0:
+            return
+
         activities = self.current_activity[ids]
-        ids = self.population.index[ids]
         elapsed = self.activity_list.get_elapsed(ids, activities)
         duration = self.activity_list.get_duration(ids, activities)
 
+        # Activities started outside the regular pre_step, step, post_step cycle can lag behind their schedule.
+        pending = elapsed < duration
+        if pending.any():
+            self.schedule_activity_end(ids[pending], duration[pending] - elapsed[pending])
+
         # We could check for in_progress explicitly. But it adds one more memory access and vector calculation. So,
         # we assume consistency is maintained in start_activities, and stop_activities.
         stop_ids = ids[(elapsed == duration) & (duration > 0)]
         self.stop_activities(t, stop_ids)
 
     def update_current_activity(self):
-        """This method supports updating multiple activities for a single agent simultaneously."""
-        current_activities = self.activity_list.get_in_progress(slice(None), slice(None)) == 1
-        self.activity_list.get_elapsed(slice(None), slice(None))[current_activities] += 1
-        self.activity_list.get_accumulated(slice(None), slice(None))[current_activities] += 1
+        """Advances the elapsed and accumulated time of the current activity of each agent. This visits every agent
+        with a current activity. With `multiple_in_progress`, every activity in progress is advanced."""
+        if self.multiple_in_progress:
+            self.activity_list.advance()
+            return
+
+        ids = np.flatnonzero(self.current_activity != -1)
+        self.activity_list.advance(ids, self.current_activity[ids])
 
     def stage_activity(self, act_descriptors: np.ndarray, ids):
+        act_descriptors, ids, staging = self.check_staging(act_descriptors, ids)
+        return self.commit_staging(act_descriptors, ids, staging)
+
+    def check_staging(self, act_descriptors: np.ndarray, ids):
+        """Checks the staging conditions that do not depend on relocating agents.
+
+        :return: Descriptors with one row per agent, agent ids, and boolean mask of the agents that can be staged.
+        """
         if not (isinstance(ids, np.ndarray) and isinstance(ids.dtype, int)):
             ids = self.population.index[ids]
 
@@ -235,6 +322,11 @@ class ActivityManager(Model):
         # Check that locations are empty for the wait blocking type
         staging &= self.check_for_wait_blockings(ids, act_descriptors)
 
+        return act_descriptors, ids, staging
+
+    def commit_staging(self, act_descriptors: np.ndarray, ids, staging):
+        """Relocates the agents selected by `staging` in one pass, and stages the descriptors of the agents that
+        reached their location."""
         # Relocate agents to trigger space dependent adjustments.
         location_ids = act_descriptors[:, ActivityDescriptorProperties.location_ix]
         staging &= self.relocate_agents(ids, location_ids, staging)
@@ -269,24 +361,36 @@ class ActivityManager(Model):
         self.__start_activities(act_descriptors, activities, ids)
 
     def collect_new_controller_descriptors(self, ids_selector):
+        """Queries the controllers in z-order. Each controller is only asked for agents not claimed by a controller
+        with higher priority. The claimed descriptors are merged into one batch, and relocated and staged in a single
+        pass. Agents that cannot reach their location are not offered to lower priority controllers, they are
+        retried on the next step."""
         ids = self.population.index[ids_selector]
-        staged = np.zeros_like(ids, dtype=bool)
-        stage_idx = np.arange(len(staged))
-        full_staged = np.zeros(len(self.population), dtype=bool)
+        claimed = np.zeros(len(self.population), dtype=bool)
+        batch_descriptors, batch_ids = [], []
         for controller in self.controllers:  # type: ActivityController
-            not_staged = ~staged
-            act_descriptors, new_ids_selector = controller.get_new_activity(ids[not_staged])
+            available_ids = ids[~claimed[ids]]
+            act_descriptors, new_ids_selector = controller.get_new_activity(available_ids)
             if ~new_ids_selector.any():
                 continue
 
-            staged_ = self.stage_activity(act_descriptors, ids[not_staged][new_ids_selector])
-
-            full_staged[ids[not_staged][new_ids_selector]] = staged_
-            staged[stage_idx[not_staged][new_ids_selector]] = staged_
+            act_descriptors, new_ids, staging = self.check_staging(act_descriptors, available_ids[new_ids_selector])
+            claimed[new_ids[staging]] = True
+            batch_descriptors.append(act_descriptors[staging])
+            batch_ids.append(new_ids[staging])
 
-            if staged.all():
+            if claimed[ids].all():
                 break
 
+        full_staged = np.zeros(len(self.population), dtype=bool)
+        if not batch_ids:
+            return full_staged
+
+        batch_ids = np.concatenate(batch_ids)
+        batch_descriptors = np.vstack(batch_descriptors)
+        staged = self.commit_staging(batch_descriptors, batch_ids,
+                                     self.check_batch_wait_blockings(batch_ids, batch_descriptors))
+        full_staged[batch_ids] = staged
         return full_staged
 
     def __start_activities(self, act_descriptors, activities, ids):
@@ -301,6 +405,7 @@ class ActivityManager(Model):
                                         act_descriptors[:, ActivityDescriptorProperties.location_ix])
         self.current_descriptors[ids, :] = -1
         self.current_activity_interruptable[ids] = act_descriptors[:, ActivityDescriptorProperties.interruptable]
+        self.schedule_activity_end(ids, act_descriptors[:, ActivityDescriptorProperties.duration])
         self.block_locations(ids, act_descriptors)
 
         for act in self.activity_list.activities:
@@ -322,13 +427,9 @@ class ActivityManager(Model):
             relocated_ids = np.zeros_like(ids, dtype=bool)
             ids = self.population.index[ids]
             locations = region_index[location_ix, 2]
-            unique_locations = set(locations).difference({-1})
-
-            for loc in unique_locations:
-                moving_ids = ids[(locations == loc) & ids_selector]
-                moved_ids = self.relocator.move_agents(moving_ids, loc)
-                ids_selector_ = (ids.reshape(-1, 1) == moved_ids).any(axis=1)
-                relocated_ids[ids_selector_] = True
+            moving = ids_selector & (location_ix != 0)
+            moved_ids = self.relocator.move_agents_many(ids[moving], locations[moving])
+            relocated_ids[np.isin(ids, moved_ids)] = True
 
         return relocated_ids | ~update_current | same_location
 
@@ -364,15 +465,33 @@ class ActivityManager(Model):
                 act.stop_activity(t, stop_ids_)
 
         self.reset_current_activity(stop_ids)
+        stopped = self.current_activity[stop_ids] != -1
+        self.register_blocked_activities(stop_ids[stopped], self.current_activity[stop_ids[stopped]])
         self.unblock_locations(stop_ids)
         self.current_activity[stop_ids] = -1
 
+    def requested_locations(self, ids, act_descriptors):
+        """Region index of the location of each descriptor, descriptors without location use the current location."""
+        locations_ixs = act_descriptors[:, ActivityDescriptorProperties.location_ix].copy()
+        locations_ixs[locations_ixs == 0] = [r.index for r in self.population.location[ids][locations_ixs == 0]]
+        return locations_ixs
+
+    def check_batch_wait_blockings(self, ids, act_descriptors):
+        """Wait blocking descriptors of a merged batch, ordered by controller priority, are only granted if they are
+        the first request for their location. Every descriptor counts as a request, since the locations were checked
+        empty before any agent of the batch was relocated."""
+        if self.relocator is None:
+            return np.ones_like(ids, dtype=bool)
+
+        first_come = enforce_unique_resource_utilization(self.requested_locations(ids, act_descriptors))
+        wait_blocking = act_descriptors[:, ActivityDescriptorProperties.blocks_location] == TypesOfLocationBlocking.wait
+        return ~wait_blocking | first_come
+
     def check_for_wait_blockings(self, ids, act_descriptors):
         if self.relocator is None:
             return np.ones_like(ids, dtype=bool)
 
-        locations_ixs = act_descriptors[:, ActivityDescriptorProperties.location_ix].copy()
-        locations_ixs[locations_ixs == 0] = [r.index for r in self.population.location[ids][locations_ixs == 0]]
+        locations_ixs = self.requested_locations(ids, act_descriptors)
         location_empty = np.array([r.population is not None and len(r.population) or 0
                                         for r in self.region_index[locations_ixs, 2]]) < 1
         wait_blocking = act_descriptors[:, ActivityDescriptorProperties.blocks_location] == TypesOfLocationBlocking.wait
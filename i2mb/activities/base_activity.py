@@ -166,6 +166,9 @@ class ActivityList:
         self.activities = [ActivityNone(population)]
         self.activity_types = [ActivityNone]
 
+        # (agent, activity) pairs set to a non-zero blocked_for since the last call to pop_blocked_for
+        self.__blocked_pairs = []
+
     def __repr__(self):
         return repr(self.activities)
 
@@ -193,10 +196,70 @@ class ActivityList:
     def shape(self):
         return self.activity_values.shape
 
+    def advance(self, ids=None, act_ids=None):
+        """Increments the elapsed and accumulated time of activity `act_ids[i]` of agent `ids[i]`, if that activity is
+        in progress. Only the given (agent, activity) pairs are touched, instead of the whole activity stack. Without
+        ids, every activity in progress is advanced, which supports several activities in progress per agent at the
+        cost of scanning the whole stack."""
+        if ids is None:
+            in_progress = self.activity_values[:, ActivityProperties.in_progress, :] == 1
+            self.activity_values[:, ActivityProperties.elapsed, :][in_progress] += 1
+            self.activity_values[:, ActivityProperties.accumulated, :][in_progress] += 1
+            return
+
+        in_progress = self.gather(ids, ActivityProperties.in_progress, act_ids) == 1
+        ids, act_ids = ids[in_progress], act_ids[in_progress]
+        self.activity_values[ids, ActivityProperties.elapsed, act_ids] += 1
+        self.activity_values[ids, ActivityProperties.accumulated, act_ids] += 1
+
+    def flat_index(self, ids, prop_ix, act_ids):
+        """Returns the positions in the raveled activity stack of property `prop_ix` of activity `act_ids[i]` of agent
+        `ids[i]`."""
+        _, num_properties, num_activities = self.activity_values.shape
+        return (np.asarray(ids) * num_properties + prop_ix) * num_activities + act_ids
+
+    def gather(self, ids, prop_ix, act_ids):
+        """Returns property `prop_ix` of activity `act_ids[i]` for each agent `ids[i]`."""
+        return self.activity_values.take(self.flat_index(ids, prop_ix, act_ids))
+
+    def scatter(self, ids, prop_ix, act_ids, value):
+        """Sets property `prop_ix` of activity `act_ids[i]` for each agent `ids[i]` to `value`. The value is either a
+        scalar or it has one entry per agent."""
+        self.activity_values.put(self.flat_index(ids, prop_ix, act_ids), value)
+        if prop_ix == ActivityProperties.blocked_for:
+            self.register_blocked_for(ids, act_ids)
+
+    def register_blocked_for(self, ids, act_ids):
+        """Records the pairs of agents `ids[i]` and activities `act_ids[i]` with a non-zero blocked_for, so their
+        blocked period is counted down. Writes through :meth:`set_blocked_for` and :meth:`scatter` are recorded
+        automatically, direct writes to `activity_values` need to be registered explicitly."""
+        ids, act_ids = np.broadcast_arrays(np.asarray(ids, dtype=int).ravel(), np.asarray(act_ids, dtype=int).ravel())
+        blocked = self.gather(ids, ActivityProperties.blocked_for, act_ids) > 0
+        if blocked.any():
+            self.__blocked_pairs.append(np.column_stack([ids[blocked], act_ids[blocked]]))
+
+    def pop_blocked_for(self):
+        """Returns the `(k, 2)` array of (agent, activity) pairs registered since the last call, and clears them."""
+        pairs = self.__blocked_pairs
+        self.__blocked_pairs = []
+        if not pairs:
+            return np.zeros((0, 2), dtype=int)
+
+        return np.vstack(pairs)
+
+    def __written_pairs(self, idx, act_ids):
+        """Agent and activity ids of the pairs addressed by `idx` and `act_ids`, following the indexing rules of the
+        property setters."""
+        ids = np.atleast_1d(self.__index[idx]).ravel()
+        activities = np.atleast_1d(np.arange(self.activity_values.shape[2])[act_ids]).ravel()
+        if not isinstance(idx, slice) and not isinstance(act_ids, slice) and np.shape(idx) == np.shape(act_ids):
+            return ids, activities
+
+        return np.repeat(ids, len(activities)), np.tile(activities, len(ids))
+
     def __get_unique_activity_property(self, idx, prop_ix, activity_ids):
         """Given a list of ids, this method retrieves the activity property from the activities specified in
         activity_ids. The result has shape **n**x1 where n is the length of both activity_ids and ids"""
-        pop_size = len(activity_ids)
         ids = self.__index[idx]
         if len(ids) == 0:
             return np.array([])
@@ -204,9 +267,7 @@ class ActivityList:
         if (activity_ids == -1).any():
             raise ValueError(f"Accessing properties for invalid activity id (id = -1). {activity_ids}")
 
-        index_vector = np.array(tuple(zip(ids, [prop_ix] * pop_size, activity_ids)))
-        index_vector = np.ravel_multi_index(index_vector.T, self.activity_values.shape)
-        return self.activity_values.ravel()[index_vector]
+        return self.gather(ids, prop_ix, activity_ids)
 
     def __get_activity_property(self, idx, prop_ix, act_ids):
         if isinstance(idx, slice) or isinstance(idx, int):
@@ -215,8 +276,8 @@ class ActivityList:
         if isinstance(act_ids, slice) or isinstance(act_ids, int):
             return self.activity_values[idx, prop_ix, act_ids]
 
-        if np.array(idx).shape == np.array(act_ids).shape:
-            self.__get_unique_activity_property(idx, prop_ix, act_ids)
+        if np.shape(idx) == np.shape(act_ids):
+            return self.__get_unique_activity_property(idx, prop_ix, np.asarray(act_ids))
 
         return self.activity_values[idx, prop_ix, act_ids]
 
@@ -241,14 +302,11 @@ class ActivityList:
     def get_location(self, idx, act_ids) -> np.ndarray:
         return self.__get_activity_property(idx, ActivityProperties.location, act_ids)
 
-    def __set_unique_activity_property(self, ids, prop_ix, activity, value):
+    def __set_unique_activity_property(self, idx, prop_ix, activity, value):
         """Given a list of ids, this method sets the activity property from the activities specified in
                 activity_ids to the value 'value'. The value is either a scalar or it has shape **n**x1,
                 where n is the length of both activity_ids and ids"""
-        pop_size = len(ids)
-        index_vector = np.array(tuple(zip(ids, [prop_ix] * pop_size, activity)))
-        index_vector = np.ravel_multi_index(index_vector.T, self.activity_values.shape)
-        self.activity_values.ravel()[index_vector] = value
+        self.scatter(self.__index[idx], prop_ix, activity, value)
 
     def __set_activity_property(self, idx, prop_ix, act_ids, value):
 
@@ -260,7 +318,7 @@ class ActivityList:
             self.activity_values[idx, prop_ix, act_ids] = value
             return
 
-        if np.array(idx).shape == np.array(act_ids).shape:
+        if np.shape(idx) == np.shape(act_ids):
             self.__set_unique_activity_property(idx, prop_ix, act_ids, value)
             return
 
@@ -283,6 +341,7 @@ class ActivityList:
 
     def set_blocked_for(self, idx, act_ids, value):
         self.__set_activity_property(idx, ActivityProperties.blocked_for, act_ids, value)
+        self.register_blocked_for(*self.__written_pairs(idx, act_ids))
 
     def set_location(self, idx, act_ids, value):
         return self.__set_activity_property(idx, ActivityProperties.location, act_ids, value)
@@ -194,9 +194,12 @@ class ActivityDescriptorQueue:
         self.shift_right(slice_)
         self.queue[slice_, :, 0] = value
 
-    def reset(self):
-        self.queue[:] = ActivityDescriptorQueue.empty_slot
-        self.num_items[:] = 0
+    def reset(self, slice_=None):
+        if slice_ is None:
+            slice_ = slice(None)
+
+        self.queue[slice_] = ActivityDescriptorQueue.empty_slot
+        self.num_items[slice_] = 0
 
     def __getitem__(self, item):
         return ActivityDescriptorQueueView(item, self)
@@ -224,8 +227,136 @@ class ActivityDescriptorQueue:
         self.num_items[idx] += 1
 
 
+class RingActivityDescriptorQueue:
+    """Ring buffer implementation of the :class:`ActivityDescriptorQueue`. Each agent has its own head pointer into a
+    circular buffer of `depth` slots, so pushing, popping and appending only write the affected slots instead of
+    shifting the whole queue. Pushing into a full queue overwrites the oldest activity, appending to a full queue drops
+    the incoming activity.
+
+    The :attr:`queue` property and the column properties (:attr:`act_idx`, :attr:`start`, ...) return copies in queue
+    order, i.e., the front of the queue is at depth 0.
+    """
+    empty_slot = ActivityDescriptorQueue.empty_slot
+
+    def __init__(self, size, depth=3):
+        self.size = size
+        self.len = depth
+
+        self.buffer = np.full((size, len(ActivityDescriptorProperties), depth),
+                              RingActivityDescriptorQueue.empty_slot, dtype=int)
+        self.head = np.zeros(size, dtype=int)
+
+        self.num_items = np.zeros(size, dtype=int)
+        self.index = np.arange(size, dtype=int)
+
+    @property
+    def queue(self):
+        slots = (self.head[:, None] + np.arange(self.len)) % self.len
+        return np.take_along_axis(self.buffer, slots[:, None, :], axis=2)
+
+    def front(self, column):
+        """Returns `column` of the activity at the front of the queue of every agent."""
+        return self.buffer[self.index, column, self.head]
+
+    @property
+    def act_idx(self):
+        return self.front(ActivityDescriptorProperties.act_idx)
+
+    @property
+    def start(self):
+        return self.front(ActivityDescriptorProperties.start)
+
+    @property
+    def duration(self):
+        return self.front(ActivityDescriptorProperties.duration)
+
+    @property
+    def priority_level(self):
+        return self.front(ActivityDescriptorProperties.priority_level)
+
+    @property
+    def block_for(self):
+        return self.front(ActivityDescriptorProperties.block_for)
+
+    @property
+    def location_ix(self):
+        return self.front(ActivityDescriptorProperties.location_ix)
+
+    @property
+    def blocks_location(self):
+        return self.front(ActivityDescriptorProperties.blocks_location)
+
+    @property
+    def block_parent_location(self):
+        return self.front(ActivityDescriptorProperties.blocks_parent_location)
+
+    @property
+    def descriptor_id(self):
+        return self.front(ActivityDescriptorProperties.descriptor_id)
+
+    def pop(self, slice_=None):
+        if slice_ is None:
+            slice_ = slice(None)
+
+        idx = self.index[slice_]
+        if (self.num_items[idx] == 0).any():
+            raise ValueError("Trying to pop from an empty queue.")
+
+        head = self.head[idx]
+        response = self.buffer[idx, :, head]
+        self.buffer[idx, :, head] = RingActivityDescriptorQueue.empty_slot
+        self.head[idx] = (head + 1) % self.len
+        self.num_items[idx] -= 1
+
+        return response
+
+    def push(self, value, slice_=None):
+        if slice_ is None:
+            slice_ = slice(None)
+
+        if type(value) is ActivityDescriptorSpecs:
+            value = value.specifications
+
+        idx = self.index[slice_]
+        head = (self.head[idx] - 1) % self.len
+        self.buffer[idx, :, head] = value
+        self.head[idx] = head
+        self.num_items[idx] = np.minimum(self.num_items[idx] + 1, self.len)
+
+    def append(self, value, slice_=None):
+        if slice_ is None:
+            slice_ = slice(None)
+
+        if type(value) is ActivityDescriptorSpecs:
+            value = value.specifications
+
+        # if the queue is full drop the incoming packet
+        idx = np.atleast_1d(self.index[slice_])
+        have_space = self.num_items[idx] < self.len
+        if len(value) != 1:
+            value = np.asarray(value)[have_space]
+
+        idx = idx[have_space]
+        self.buffer[idx, :, (self.head[idx] + self.num_items[idx]) % self.len] = value
+        self.num_items[idx] += 1
+
+    def reset(self, slice_=None):
+        if slice_ is None:
+            slice_ = slice(None)
+
+        self.buffer[slice_] = RingActivityDescriptorQueue.empty_slot
+        self.head[slice_] = 0
+        self.num_items[slice_] = 0
+
+    def __getitem__(self, item):
+        return ActivityDescriptorQueueView(item, self)
+
+    def __str__(self):
+        return str(self.queue)
+
+
 class ActivityDescriptorQueueView:
-    def __init__(self, range_, queue: ActivityDescriptorQueue):
+    def __init__(self, range_, queue: 'ActivityDescriptorQueue | RingActivityDescriptorQueue'):
         self.__queue = queue
         self.__range = range_
 
@@ -244,8 +375,7 @@ class ActivityDescriptorQueueView:
         return r
 
     def reset(self):
-        self.__queue.queue[self.__range, :, :] = ActivityDescriptorQueue.empty_slot
-        self.__queue.num_items[self.__range] = 0
+        self.__queue.reset(self.__range)
 
 
 def create_null_descriptor_for_act_id(activity_ids):
@@ -2,29 +2,16 @@ import numpy as np
 
 from i2mb import Model
 from i2mb.activities import ActivityDescriptorProperties, ActivityProperties
-from i2mb.activities.activity_manager import ActivityManager
+from i2mb.activities.activity_diary import ActivityDiary
+from i2mb.activities.activity_manager import ActivityManager, enforce_unique_resource_utilization
 from i2mb.activities.base_activity import ActivityNone
-from i2mb.activities.base_activity_descriptor import ActivityDescriptorSpecs, ActivityDescriptorQueue, \
+from i2mb.activities.base_activity_descriptor import ActivityDescriptorSpecs, RingActivityDescriptorQueue, \
     convert_activities_to_descriptors
 from i2mb.engine.relocator import Relocator
 
 
-def enforce_unique_resource_utilization(requested_location):
-    """Given a list of location requests, this method will grant the first request per location.
-    The response is a boolean array with the shape of requested_location."""
-
-    def process_mask_column(column):
-        response = np.zeros_like(requested_location)
-        indexes = np.arange(len(response), dtype=int)
-        response[indexes[column][0]] = True
-        return response
-
-    location_mask = requested_location.reshape(-1, 1) == np.unique(requested_location)
-    return np.apply_along_axis(process_mask_column, 0, location_mask).sum(axis=1).astype(bool)
-
-
 class ActivityQueueController(Model):
-    file_headers = ["id", "activity", "start", "duration", "location"]
+    file_headers = ActivityDiary.headers
 
     def __init__(self, population, relocator: Relocator, activities: ActivityManager = None):
 
@@ -32,7 +19,7 @@ class ActivityQueueController(Model):
         if activities is None:
             activities = ActivityManager(population, relocator)
 
-        self.file = None
+        self.diary = None
         self.activity_manager = activities
         self.current_activity = self.activity_manager.current_activity
         self.population = population
@@ -40,6 +27,7 @@ class ActivityQueueController(Model):
         # Location occupancy management
         self.location_blocked = np.array([])
         self.region_index = np.array([[-1, -1, -1]])
+        self.region_tree = None
         self.register_available_locations()
         self.current_location_id = np.zeros_like(self.activity_manager.current_activity, dtype=int)
 
@@ -52,16 +40,16 @@ class ActivityQueueController(Model):
         self.current_activity_rank = np.zeros_like(self.current_activity)
 
         # FIFO queue to hold planned activities
-        self.planned_activities = ActivityDescriptorQueue(len(population), 15)
+        self.planned_activities = RingActivityDescriptorQueue(len(population), 15)
 
         # FIFO queue to respect postponed activities
-        self.postponed_activities = ActivityDescriptorQueue(len(population), 15)
+        self.postponed_activities = RingActivityDescriptorQueue(len(population), 15)
 
         # LIFO queue to create interruption chains
-        self.interrupted_activities = ActivityDescriptorQueue(len(population), 15)
+        self.interrupted_activities = RingActivityDescriptorQueue(len(population), 15)
 
         # FIFO queue to hold triggered activities
-        self.triggered_activities = ActivityDescriptorQueue(len(population), 15)
+        self.triggered_activities = RingActivityDescriptorQueue(len(population), 15)
 
         self.starting_activity = np.zeros((len(self.population)), dtype=bool)
 
@@ -242,7 +230,6 @@ class ActivityQueueController(Model):
             locked_status = blocked_location[next_activity_location]
             first_come = enforce_unique_resource_utilization(next_activity_location)
             occupied_resources[blocks_location] |= locked_status | ~first_come
-            print(occupied_resources, locked_status, ~first_come)
 
         if (~blocks_location).any():
             next_activity_location = activity_queue.location_ix[population_selector][~blocks_location]
@@ -261,28 +248,22 @@ class ActivityQueueController(Model):
         parents_idx = parents_idx[parents_idx != 0]
         parents = np.unique(parents_idx)
 
-        # Update parents_idx_bool to point to the parent ids
-        parents_idx_bool = np.zeros_like(blocked_location, dtype=bool)
-        parents_idx_bool[parents_idx] = True
-
-        # Select all children of blocked parents
-        # Create parent children association mask, TODO: Sparse matrix?
-        children_idx = (self.region_index[:, 1] == parents.reshape(-1, 1)).any(axis=0)
-        location_pairs = self.region_index[children_idx, :]
-        lp_mask = (np.unique(location_pairs[:, 1]).reshape(-1, 1) == location_pairs[:, 1])
+        # Children of the requested parents, and the parent of each child
+        children_idx, children_parents = self.region_tree.get_children_of(parents)
 
         # Mark parents as locked do to locked children
-        blocked_location[parents_idx_bool] |= (lp_mask & blocked_location[children_idx]).any(axis=1)
+        blocked_children_parents = children_parents[blocked_location[children_idx]]
+        blocked_location[blocked_children_parents] = True
         # Mark children as locked do to locked parents
-        blocked_location[children_idx] |= (lp_mask.T & blocked_location[parents_idx_bool]).any(axis=1)
+        blocked_location[children_idx] |= blocked_location[children_parents]
 
         # Select first agent blocking requesting to block the parent
         first_come = enforce_unique_resource_utilization(parents_idx)
         unmask = ~(blocked_location[parents_idx].copy() | ~first_come)
 
-        blocked_location[parents_idx_bool] = True
-        # Mark children as locked do to locked parents
-        blocked_location[children_idx] |= (lp_mask.T & blocked_location[parents_idx_bool]).any(axis=1)
+        # Block the parents, and therefore all their children
+        blocked_location[parents] = True
+        blocked_location[children_idx] = True
         # Free first comers
         blocked_location[parents_idx[unmask]] = False
 
@@ -293,17 +274,14 @@ class ActivityQueueController(Model):
             return
 
         self.region_index = self.world.region_index
+        self.region_tree = self.world.region_tree
         self.location_blocked = self.world.blocked_locations
 
     def remove_time_blocked_activities(self, have_new_activities):
-        new_activity_types = self.planned_activities.queue[:, 0, 0]
-        new_activity_types[new_activity_types == -1] = 0
-
-        index_vector = np.array([np.arange(len(new_activity_types), dtype=int),
-                                 np.full(len(new_activity_types), ActivityProperties.blocked_for),
-                                 new_activity_types])
-        index_vector = np.ravel_multi_index(index_vector, self.activity_manager.activity_values.shape)
-        blocked_for = self.activity_manager.activity_values.ravel()[index_vector]
+        new_activity_types = self.planned_activities.act_idx
+        new_activity_types[new_activity_types == RingActivityDescriptorQueue.empty_slot] = 0
+        blocked_for = self.activity_manager.activity_list.gather(np.arange(len(new_activity_types)),
+                                                                 ActivityProperties.blocked_for, new_activity_types)
         discard = (blocked_for > 0) & have_new_activities
         if discard.any():
             self.planned_activities[discard].pop()
@@ -312,7 +290,7 @@ class ActivityQueueController(Model):
         return have_new_activities
 
     def log_finished_activities(self, activity_id, t, ids):
-        if self.file is None:
+        if self.diary is None:
             return
 
         if len(ids) == 0:
@@ -320,24 +298,15 @@ class ActivityQueueController(Model):
 
         ids = self.population.index[ids]
         activity = self.activity_manager.activity_manager[activity_id]
-        elapsed = activity.get_elapsed()[ids]
-        start = activity.get_start()[ids]
-        activity_type = [type(activity).__name__] * len(ids)
-        location_ids = activity.get_location()[ids]  # type: np.ndarray
-        location_ids_mask = (self.region_index[:, 0:1] == location_ids)  # type: np.ndarray
-        location_types = np.where(location_ids_mask.T)[1]
-        locations = [type(loc_).__name__ for loc_ in self.region_index[location_types, 2]]
-        try:
-            activity_log = np.vstack([ids, activity_type, start, elapsed, locations]).T
-        except ValueError as e:
-            print(self.region_index[:, 0:1] == location_ids)
-            return
 
-        self.file.write("\n".join([",".join(r) for r in activity_log]) + "\n")
+        # Locations are stored by region id, the region index is sorted by id.
+        location_ix = np.searchsorted(self.region_index[:, 0].astype(int), activity.get_location()[ids])
+        location_codes = self.diary.location_codes(self.region_index)[location_ix]
+        self.diary.append(ids, activity_id, activity.get_start()[ids], activity.get_elapsed()[ids], location_codes)
 
     def __del__(self):
-        if self.file is not None:
-            self.file.close()
+        if self.diary is not None:
+            self.diary.close()
 
     def register_activity_stop_logger(self):
         for activity in self.activity_manager.activity_manager:
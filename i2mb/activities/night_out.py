@@ -76,9 +76,7 @@ class NightOut(Motion):
         if not return_ix.any():
             return
 
-        destinations = set(self.population.home[return_ix])
-        for r in destinations:
-            self.relocator.move_agents(return_ix & (self.population.home == r), r)
+        self.relocator.move_agents_many(return_ix, self.population.home[return_ix])
 
     def plan_night_out(self, t):
         self.going_out[:] = False
@@ -6,6 +6,7 @@ import numpy as np
 from i2mb.motion.base_motion import Motion
 from i2mb.pathogen import UserStates
 from i2mb.utils import global_time
+from i2mb.utils.collections import EventQueue
 from i2mb.worlds import World
 
 
@@ -199,10 +200,211 @@ class Schedule:
                 self.__latest_monthly.resolve(t)
 
 
+def _sample(value):
+    if callable(value) and not isinstance(value, World):
+        return value()
+
+    return value
+
+
+class CompiledSchedule:
+    """Columnar representation of the schedules of a population. The entries of every agent are sampled for a whole
+    week, and stored in arrays of shape (n, k) sorted by start time, where k is the largest number of occurrences of an
+    agent in a week. The next event of many agents is then found with a single vectorised lookup. Agents are sampled
+    again lazily, the first time they are looked up after their week rolled over.
+
+    :param schedules: Schedule of each agent, or None.
+    :param population: Population used to resolve locations given by property name.
+    :param default_location: Location of each agent used when an entry does not define one.
+    """
+    def __init__(self, schedules, population, default_location):
+        self.schedules = np.asarray(schedules, dtype=object).ravel()
+        self.population = population
+        self.default_location = default_location
+
+        n = len(self.schedules)
+        self.week = np.full(n, -1, dtype=int)
+        self.start_time = np.zeros((n, 0), dtype=int)
+        self.end_time = np.zeros((n, 0), dtype=int)
+        self.duration = np.zeros((n, 0), dtype=int)
+
+        # First tick at which the end trigger of the occurrence fires, -1 for padding
+        self.expires = np.zeros((n, 0), dtype=int)
+        self.trigger = np.zeros((n, 0, 3), dtype=bool)
+        self.auto_return = np.zeros((n, 0), dtype=bool)
+        self.event_location = np.zeros((n, 0), dtype=object)
+        self.return_location = np.zeros((n, 0), dtype=object)
+        self.exit_area = np.zeros((n, 0, 4), dtype=object)
+
+        # Starts sampled once per period, by (agent, entry index)
+        self.__period_starts = {}
+        self.__unique_starts = {}
+
+    def resolve_location(self, id_, location):
+        if location is None:
+            return self.default_location[id_]
+
+        if isinstance(location, str):
+            return getattr(self.population, location)[id_]
+
+        return location
+
+    def period_start(self, id_, ix, entry, period):
+        """Start of entry `ix` of agent `id_` in a month, sampled once per month. Months before the previous one are
+        forgotten."""
+        starts = self.__period_starts.setdefault((id_, ix), {})
+        if period not in starts:
+            starts[period] = _sample(entry.start_time)
+            for old in [p for p in starts if p < period - 1]:
+                del starts[old]
+
+        return starts[period]
+
+    def occurrences(self, id_, ix, entry, week_start):
+        """Returns the offset and start of the occurrences of an entry starting during the week starting at
+        `week_start`. Daily and weekly entries sample a start for each occurrence, monthly entries once per month, and
+        unique entries only once."""
+        ticks_day, ticks_week, ticks_month = global_time.ticks_day, global_time.ticks_week, global_time.ticks_month
+        days = week_start + np.arange(7) * ticks_day
+        offsets = []
+        if entry.repeats == "daily" or entry.repeats is True:
+            offsets = days
+
+        elif entry.repeats == "on_weekdays":
+            offsets = days[[not global_time.is_weekend(d) for d in days]]
+
+        elif entry.repeats == "on_weekends":
+            offsets = days[[global_time.is_weekend(d) for d in days]]
+
+        elif entry.repeats == "weekly":
+            offsets = [week_start]
+
+        elif entry.repeats == "monthly":
+            month_start = week_start // ticks_month * ticks_month
+            occurrences = []
+            for offset in [month_start, month_start + ticks_month]:
+                start = self.period_start(id_, ix, entry, offset // ticks_month)
+                if week_start <= offset + start < week_start + ticks_week:
+                    occurrences.append((offset, start))
+
+            return occurrences
+
+        else:
+            # Unique events are compiled once, in the first compiled week that reaches their start, including events
+            # in the past.
+            key = (id_, ix)
+            if key not in self.__unique_starts:
+                self.__unique_starts[key] = _sample(entry.start_time)
+
+            start = self.__unique_starts[key]
+            if start is None or start >= week_start + ticks_week:
+                return []
+
+            self.__unique_starts[key] = None
+            return [(0, start)]
+
+        return [(offset, _sample(entry.start_time)) for offset in offsets]
+
+    def sample_week(self, id_, week):
+        week_start = week * global_time.ticks_week
+        occurrences = []
+        for ix, entry in enumerate(self.schedules[id_].items):
+            entry: Entry
+            for offset, start in self.occurrences(id_, ix, entry, week_start):
+                start += offset
+                end_time, duration = 0, 0
+                if entry.trigger[0]:  # "duration"
+                    duration = _sample(entry.duration)
+                    end_time = start + duration
+                    expires = end_time + 1
+                elif entry.trigger[1]:  # "end_time"
+                    end_time = offset + _sample(entry.end_time)
+                    if end_time < start:
+                        end_time += global_time.ticks_day
+
+                    duration = end_time - start
+                    expires = end_time
+                else:  # "area"
+                    expires = week_start + global_time.ticks_week
+
+                occurrences.append((start, end_time, duration, expires, entry.trigger, entry.auto_return,
+                                    self.resolve_location(id_, _sample(entry.event_location)),
+                                    self.resolve_location(id_, _sample(entry.return_to)), entry.exit_area))
+
+        return sorted(occurrences, key=lambda x: x[0])
+
+    def compile(self, ids, week):
+        """Samples the occurrences of agents `ids` for the given week."""
+        samples = [self.sample_week(id_, w) for id_, w in zip(ids, week)]
+        self.week[ids] = week
+        width = max([len(s) for s in samples], default=0)
+        if width > self.expires.shape[1]:
+            self.__grow(width)
+
+        self.expires[ids] = -1
+        self.trigger[ids] = False
+        for id_, occurrences in zip(ids, samples):
+            if not occurrences:
+                continue
+
+            k = len(occurrences)
+            start, end_time, duration, expires, trigger, auto_return, event_location, return_location, exit_area = \
+                zip(*occurrences)
+            self.start_time[id_, :k] = start
+            self.end_time[id_, :k] = end_time
+            self.duration[id_, :k] = duration
+            self.expires[id_, :k] = expires
+            self.trigger[id_, :k] = trigger
+            self.auto_return[id_, :k] = auto_return
+            self.event_location[id_, :k] = event_location
+            self.return_location[id_, :k] = return_location
+            self.exit_area[id_, :k] = exit_area
+
+    def __grow(self, width):
+        pad = width - self.expires.shape[1]
+        n = len(self.schedules)
+        self.start_time = np.hstack([self.start_time, np.zeros((n, pad), dtype=int)])
+        self.end_time = np.hstack([self.end_time, np.zeros((n, pad), dtype=int)])
+        self.duration = np.hstack([self.duration, np.zeros((n, pad), dtype=int)])
+        self.expires = np.hstack([self.expires, np.full((n, pad), -1, dtype=int)])
+        self.trigger = np.hstack([self.trigger, np.zeros((n, pad, 3), dtype=bool)])
+        self.auto_return = np.hstack([self.auto_return, np.zeros((n, pad), dtype=bool)])
+        self.event_location = np.hstack([self.event_location, np.zeros((n, pad), dtype=object)])
+        self.return_location = np.hstack([self.return_location, np.zeros((n, pad), dtype=object)])
+        self.exit_area = np.hstack([self.exit_area, np.zeros((n, pad, 4), dtype=object)])
+
+    def next_events(self, ids, t):
+        """Returns the column of the next event of each agent in `ids`, the event with the earliest start time that
+        has not ended at time `t`. Agents without a pending event get -1."""
+        ids = np.asarray(ids, dtype=int)
+        ids = ids[self.schedules[ids] != None]  # noqa
+        week = t // global_time.ticks_week
+        rolled_over = self.week[ids] < week
+        if rolled_over.any():
+            self.compile(ids[rolled_over], np.full(rolled_over.sum(), week))
+
+        columns = np.full(len(ids), -1, dtype=int)
+        pending = self.expires[ids] > t
+        found = pending.any(axis=1)
+        if found.any():
+            columns[found] = pending[found].argmax(axis=1)
+
+        # Every occurrence of this week already ended, look into the next one.
+        if not found.all():
+            missing = ids[~found]
+            self.compile(missing, self.week[missing] + 1)
+            pending = self.expires[missing] > t
+            found_next = pending.any(axis=1)
+            if found_next.any():
+                columns[np.flatnonzero(~found)[found_next]] = pending[found_next].argmax(axis=1)
+
+        return ids, columns
+
+
 class ScheduleRoutines(Motion):
     def __init__(self, population, relocator, schedule: [Schedule, Iterable], default="home",
                  must_follow_schedule=1.,
-                 ignore_schedule=None):
+                 ignore_schedule=None, compiled=False):
         super().__init__(population)
         self.relocator = relocator
         n = len(population)
@@ -237,6 +439,12 @@ class ScheduleRoutines(Motion):
         self.return_location = self.default_location.copy()
         self.exit_area = np.zeros((n, 4), dtype=object)
 
+        # Resolve events from schedules sampled a week at a time, instead of one entry at a time.
+        self.compiled_schedule = None
+        self.waiting_for_week = EventQueue()
+        if compiled:
+            self.compiled_schedule = CompiledSchedule(self.schedules, self.population, self.default_location)
+
         self.update_events([True] * n, 0)
 
     def __initialize_ignore_schedule_selection(self, ignore_schedule, must_follow_schedule, n):
@@ -267,6 +475,7 @@ class ScheduleRoutines(Motion):
 
     def step(self, t):
         self.update_follow_daily_schedule(t)
+        self.update_waiting_events(t)
 
         # Process triggers
         duration_trigger, end_time_trigger, area_trigger = self.trigger.T
@@ -300,13 +509,15 @@ class ScheduleRoutines(Motion):
         # move_mask &= (self.start_time <= t) & not_at_location
         move_mask &= active_triggers.reshape((-1, 1))  # & not_at_location
 
-        regions = set(self.event_location[move_mask.ravel()].ravel())
-        for r in regions:
-            self.relocator.move_agents(move_mask.ravel() & (self.event_location == r), r)
+        self.relocator.move_agents_many(move_mask.ravel(), self.event_location[move_mask.ravel()])
 
         self.update_events(end_triggers, t)
 
     def update_events(self, active_triggers, t):
+        if self.compiled_schedule is not None:
+            self.update_compiled_events(active_triggers, t)
+            return
+
         for id_, s in zip(self.population.index[active_triggers], self.schedules[active_triggers].ravel()):
             if s is None:
                 continue
@@ -333,6 +544,34 @@ class ScheduleRoutines(Motion):
 
             self.exit_area[id_] = event.exit_area
 
+    def update_compiled_events(self, active_triggers, t):
+        ids, columns = self.compiled_schedule.next_events(self.population.index[active_triggers], t)
+
+        # Agents without an occurrence in the compiled weeks are looked up again when the next week starts.
+        no_event = columns == -1
+        self.trigger[ids[no_event]] = False
+        self.start_time[ids[no_event]] = -1
+        self.waiting_for_week.schedule((t // global_time.ticks_week + 1) * global_time.ticks_week, ids[no_event])
+
+        ids, columns = ids[~no_event], columns[~no_event]
+        schedule = self.compiled_schedule
+        self.trigger[ids] = schedule.trigger[ids, columns]
+        self.start_time[ids, 0] = schedule.start_time[ids, columns]
+        self.end_time[ids, 0] = schedule.end_time[ids, columns]
+        self.duration[ids, 0] = schedule.duration[ids, columns]
+        self.auto_return[ids, 0] = schedule.auto_return[ids, columns]
+        self.return_location[ids] = schedule.return_location[ids, columns]
+        self.event_location[ids] = schedule.event_location[ids, columns]
+        self.exit_area[ids] = schedule.exit_area[ids, columns]
+
+    def update_waiting_events(self, t):
+        if self.compiled_schedule is None or len(self.waiting_for_week) == 0:
+            return
+
+        _, ids, _ = self.waiting_for_week.pop_due(t)
+        if len(ids):
+            self.update_compiled_events(ids, t)
+
     def update_follow_daily_schedule(self, t):
         if self.ignore_schedule is None:
             return
@@ -1,18 +1,48 @@
 import numpy as np
 
 from i2mb.pathogen import UserStates, SymptomLevels
+from i2mb.utils import cache_manager
 
 
 def vectorized(fn):
-    AgentList.particle_properties.append(fn.__name__)
+    AgentList.particle_properties.add(fn.__name__)
     return fn
 
 
+_ARRAY_VIEW_ATTRIBUTES = frozenset(f"_ArrayView__{v}" for v in ["parent", "p_index", "cv", "cache_key", "gather"])
+
+
 class ArrayView:
-    def __init__(self, parent, p_index):
+    """View on the rows `p_index` of a property array. Writes go directly to the parent array. Reads gather the
+    selected rows the first time they are needed.
+
+    :param cache_key: If given, the gathered rows are memoised in the :data:`cache_manager` for the current time step
+     and shared between views of the same property and index. Memoised rows must be treated as read only.
+    """
+    def __init__(self, parent, p_index, cache_key=None):
         self.__parent = parent
         self.__p_index = p_index
-        self.__cv = parent[p_index]
+        self.__cache_key = cache_key
+        self.__cv = None
+
+    def __gather(self):
+        cv = self.__cv
+        if cv is not None:
+            return cv
+
+        cache_key = self.__cache_key
+        if cache_key is not None and cache_manager.is_cached(cache_key):
+            index, cv = cache_manager.get_from_cache(cache_key)
+            if index is not self.__p_index:
+                cv = None
+
+        if cv is None:
+            cv = self.__parent[self.__p_index]
+            if cache_key is not None:
+                cache_manager.cache_variable(**{cache_key: (self.__p_index, cv)})
+
+        self.__cv = cv
+        return cv
 
     def __setitem__(self, key, value):
         key = np.s_[key]
@@ -25,27 +55,36 @@ class ArrayView:
             _key = (_key, *key[1:])
             self.__parent[_key] = value
 
+        # Gathered rows are outdated
+        self.__cv = None
+        if self.__cache_key is not None:
+            cache_manager.cache_variable(**{self.__cache_key: (None, None)})
+
     def __getitem__(self, item):
-        return self.__cv.__getitem__(item)
+        return self.__gather().__getitem__(item)
 
     def __getattribute__(self, item):
-        if item in [f"_ArrayView__{v}" for v in ["parent", "p_index", "cv"]]:
+        if item in _ARRAY_VIEW_ATTRIBUTES:
             return object.__getattribute__(self, item)
 
-        return object.__getattribute__(self, "_ArrayView__cv").__getattribute__(item)
+        return object.__getattribute__(self, "_ArrayView__gather")().__getattribute__(item)
 
     def __invert__(self):
-        return ~self.__cv
+        return ~self.__gather()
 
     def __eq__(self, other):
-        return self.__cv == other
+        return self.__gather() == other
 
 
 class AgentListView:
+    """View on a subset of the agents of an :class:`AgentList`. Views built from sorted indices, like the ones managed
+    by the :class:`Relocator`, use binary search for membership tests and are updated in place by :meth:`add` and
+    :meth:`remove`."""
     def __init__(self, agents, index):
         self.__source = agents
         self.__index = index
         self.__len = len(index)
+        self.__sorted = None
 
     @property
     def index(self):
@@ -55,6 +94,14 @@ class AgentListView:
     def index(self, v):
         self.__index = v
         self.__len = len(v)
+        self.__sorted = None
+
+    @property
+    def is_sorted(self):
+        if self.__sorted is None:
+            self.__sorted = bool((self.__index[1:] >= self.__index[:-1]).all())
+
+        return self.__sorted
 
     def __len__(self):
         return self.__len
@@ -66,37 +113,86 @@ class AgentListView:
         if item not in AgentList.particle_properties:
             return object.__getattribute__(self, item)
 
-        attribute = self.__source.__getattribute__(item)
-        a_view = ArrayView(attribute, self.index)
-        return a_view
+        index = object.__getattribute__(self, "_AgentListView__index")
+        attribute = object.__getattribute__(self, "_AgentListView__source").__getattribute__(item)
+        cache_key = None
+        if AgentList.memoize_views:
+            cache_key = f"view_{item}_{id(index)}"
+
+        return ArrayView(attribute, index, cache_key)
 
     def find_indexes(self, idx):
-        return (self.__index.reshape((-1, 1)) == idx.ravel()).any(axis=1).ravel()
+        if not self.is_sorted:
+            return np.isin(self.__index, idx)
+
+        return sorted_membership(self.__index, idx)
 
     def add(self, ids):
-        old_ix = self.__index
-        new_index = np.union1d(old_ix, ids)
-        self.__index = new_index
-        self.__len = len(new_index)
+        ids = np.unique(ids)
+        if not self.is_sorted:
+            self.index = np.union1d(self.__index, ids)
+            return
+
+        pos = np.searchsorted(self.__index, ids)
+        new = ~sorted_contains(self.__index, ids, pos)
+        self.__index = np.insert(self.__index, pos[new], ids[new])
+        self.__len = len(self.__index)
 
     def remove(self, ids):
-        old_ix = self.__index
-        new_ix = np.setdiff1d(old_ix, ids)
-        self.__index = new_ix
-        self.__len = len(new_ix)
+        if not self.is_sorted:
+            self.index = np.setdiff1d(self.__index, ids)
+            return
+
+        ids = np.asarray(ids).ravel()
+        pos = np.searchsorted(self.__index, ids)
+        self.__index = np.delete(self.__index, pos[sorted_contains(self.__index, ids, pos)])
+        self.__len = len(self.__index)
+
+
+def sorted_contains(index, ids, pos=None):
+    """Returns a boolean mask over `ids` marking the ids found in the sorted array `index`."""
+    if pos is None:
+        pos = np.searchsorted(index, ids)
+
+    found = pos < len(index)
+    found[found] = index[pos[found]] == ids[found]
+    return found
+
+
+def sorted_membership(index, ids):
+    """Returns a boolean mask over the sorted array `index` marking the entries that are in `ids`."""
+    ids = np.asarray(ids).ravel()
+    pos = np.searchsorted(index, ids)
+    mask = np.zeros(len(index), dtype=bool)
+    mask[pos[sorted_contains(index, ids, pos)]] = True
+    return mask
 
 
 class AgentList:
-    particle_properties = ["state", "symptom_level"]
+    """Population of agents. Agent properties are stored as arrays with one row per agent.
+
+    :param agents: Number of agents, or list of agent ids.
+    :param columnar: If True, no :class:`Agent` object is created per agent. Indexing the population with an integer
+     returns an :class:`AgentProxy` that resolves the agent's properties lazily from the property arrays.
+    """
+    particle_properties = {"state", "symptom_level"}
     list_properties = []
 
-    def __init__(self, agents=0):
+    # Share the rows gathered by views of the same property and index during a time step.
+    memoize_views = False
+
+    def __init__(self, agents=0, columnar=False):
         if not isinstance(agents, int):
             self.index = np.array(agents)
         else:
             self.index = np.array(range(agents))
 
-        self.__agents = np.array([Agent(id_) for id_ in self.index])
+        self.__sorted_index = bool((self.index[1:] >= self.index[:-1]).all())
+
+        self.columnar = columnar
+        self.__agents = None
+        if not columnar:
+            self.__agents = np.array([Agent(id_) for id_ in self.index])
 
         self.__view = False
 
@@ -132,15 +228,27 @@ class AgentList:
         return len(self.index)
 
     def __iter__(self):
+        if self.columnar:
+            return (AgentProxy(self, id_) for id_ in self.index)
+
         return iter(self.__agents)
 
     def getitem(self, item):
-        return self.__agents[item]
+        if not self.columnar:
+            return self.__agents[item]
+
+        ids = self.index[item]
+        if np.ndim(ids) == 0:
+            return AgentProxy(self, ids)
+
+        agents = np.empty(len(ids), dtype=object)
+        agents[:] = [AgentProxy(self, id_) for id_ in ids]
+        return agents
 
     def __getitem__(self, item):
         """:return Agent item, or AgentList view with selected agents."""
         if isinstance(item, int) or isinstance(item, np.integer):
-            return self.__agents[item]
+            return self.getitem(item)
 
         view = AgentListView(self, self.index[item])
         return view
@@ -161,14 +269,19 @@ class AgentList:
             AgentList.list_properties.append(prop)
             return
 
-        AgentList.particle_properties.append(prop)
+        AgentList.particle_properties.add(prop)
+        if self.columnar:
+            return
 
         # If values is an numpy array, we want to keep a pointer.
         for p, v in zip(self.__agents, values):
             object.__setattr__(p, prop, v)
 
     def find_indexes(self, idx):
-        return (self.index.reshape((-1, 1)) == idx.ravel()).any(axis=1).ravel()
+        if self.__sorted_index:
+            return sorted_membership(self.index, idx)
+
+        return np.isin(self.index, idx)
 
 
 class Agent:
@@ -179,3 +292,37 @@ class Agent:
     def id(self):
         return self.__id
 
+
+class AgentProxy:
+    """Lightweight stand-in for :class:`Agent` used by columnar populations. Properties are read from and written to
+    the population property arrays on access."""
+    __slots__ = ("_AgentProxy__source", "_AgentProxy__id")
+
+    def __init__(self, source, id_):
+        object.__setattr__(self, "_AgentProxy__source", source)
+        object.__setattr__(self, "_AgentProxy__id", id_)
+
+    @property
+    def id(self):
+        return self.__id
+
+    def __getattr__(self, item):
+        if item not in AgentList.particle_properties:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+
+        return object.__getattribute__(self.__source, item)[self.__id]
+
+    def __setattr__(self, key, value):
+        if key not in AgentList.particle_properties:
+            raise AttributeError(f"'{type(self).__name__}' object has no property '{key}'")
+
+        object.__getattribute__(self.__source, key)[self.__id] = value
+
+    def __eq__(self, other):
+        return isinstance(other, AgentProxy) and other.__source is self.__source and other.__id == self.__id
+
+    def __hash__(self):
+        return hash((id(self.__source), self.__id))
+
+    def __repr__(self):
+        return f"AgentProxy({self.__id})"
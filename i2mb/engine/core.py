@@ -1,4 +1,7 @@
+from contextlib import nullcontext
 from typing import TYPE_CHECKING
+
+from i2mb.engine.profiler import EngineProfiler
 from i2mb.utils import cache_manager, global_time
 
 if TYPE_CHECKING:
@@ -7,17 +10,13 @@ if TYPE_CHECKING:
 
 class Engine:
     def __init__(self, models: list['Model'], populations=None, base_file_name="./",
-                 num_steps=None, select=None, debug=False):
+                 num_steps=None, select=None, debug=False, profiler: EngineProfiler = None):
         self.base_file_name = base_file_name
         self.debug = debug
-        if debug:
-            import time
-            if hasattr(time, "process_time_ns"):
-                self.current_time = time.process_time_ns
-            else:
-                self.current_time = time.process_time
+        if debug and profiler is None:
+            profiler = EngineProfiler()
 
-            self.debug_timer = {}
+        self.profiler = profiler
 
         self.time = 0
         self.models = models
@@ -37,20 +36,19 @@ class Engine:
                 p.set_current_time(self.time)
 
             for m in self.models:
-                m.pre_step(self.time)
+                with self.measure(m, "pre_step"):
+                    m.pre_step(self.time)
 
             for m in self.models:
-                if self.debug:
-                    t0 = self.current_time()
+                with self.measure(m, "step"):
+                    m.step(self.time)
 
-                m.step(self.time)
-                m.save_to_file(self.time)
-                if self.debug:
-                    tf = self.current_time()
-                    self.debug_timer.setdefault(f"{m}", []).append((tf - t0) * 1e-9)
+                with self.measure(m, "save_to_file"):
+                    m.save_to_file(self.time)
 
             for m in self.models:
-                m.post_step(self.time)
+                with self.measure(m, "post_step"):
+                    m.post_step(self.time)
 
             yield None
 
@@ -61,6 +59,22 @@ class Engine:
             if self.num_steps is not None and self.time == self.num_steps - 1:
                 break
 
+    def measure(self, model, phase):
+        if self.profiler is None:
+            return nullcontext()
+
+        return self.profiler.measure(model, phase)
+
+    @property
+    def debug_timer(self):
+        """Process time in seconds of step and save_to_file of each model per time step."""
+        if self.profiler is None:
+            return {}
+
+        return {f"{m}": [s + f for s, f in zip(self.profiler.get_timings(m, "step"),
+                                               self.profiler.get_timings(m, "save_to_file"))]
+                for m in self.models}
+
     def finalize(self):
         for m in self.models:
             m.final(self.time)
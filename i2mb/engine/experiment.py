@@ -14,18 +14,21 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import os
+from contextlib import contextmanager
 from pprint import pprint
 
 import numpy as np
 import pandas as pd
 
 from i2mb.engine.agents import AgentList
+from i2mb.engine.profiler import EngineProfiler
+from i2mb.utils.spatial_utils import set_neighbour_search
 
 
 class Experiment:
     def __init__(self, run_id, config):
         self.config = config
-        self.population = AgentList(config["population_size"])
+        self.population = AgentList(config["population_size"], columnar=config.get("columnar_agents", False))
         self.run_id = int(run_id)
         self.data_dir = self.config.get("data_dir", "./")
         self.scenario_name = config.get("scenario", {}).get("name", "test")
@@ -36,6 +39,13 @@ class Experiment:
         self.sim_engine = None
         self.generate_time_series = config.get("generate_time_series", False)
 
+        # Neighbour search engine used to find contacts, e.g., {"method": "grid", "min_size": 32}
+        neighbour_search = config.get("scenario", {}).get("neighbour_search")
+        if isinstance(neighbour_search, str):
+            set_neighbour_search(neighbour_search)
+        elif neighbour_search is not None:
+            set_neighbour_search(**neighbour_search)
+
         # Structures that hold data updated every frame
         self.time_series_stats = []
 
@@ -74,6 +84,32 @@ class Experiment:
 
         print(f"Run {self.get_base_name()} finished.")
 
+    @contextmanager
+    def profile(self, memory=False, file_format="csv"):
+        """Profiles the models of the simulation engine while the context is active::
+
+            with experiment.profile() as profiler:
+                experiment.run_sim_engine()
+
+        If files are saved, the summary is written to `<filename>_profile.<file_format>` on exit, file_format is either
+        "csv" or "json".
+        """
+        engine = self.sim_engine.engine
+        previous_profiler = engine.profiler
+        with EngineProfiler(memory=memory) as profiler:
+            engine.profiler = profiler
+            try:
+                yield profiler
+            finally:
+                engine.profiler = previous_profiler
+
+        if self.save_files:
+            file_name = f"{self.get_filename()}_profile.{file_format}"
+            if file_format == "json":
+                profiler.to_json(file_name)
+            else:
+                profiler.to_csv(file_name)
+
     def process_stop_criteria(self, frame):
         raise NotImplemented("Experiment stop criteria needs to be implemented in child class.")
 
@@ -0,0 +1,101 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+class EngineProfiler:
+    """Collects the time spent by every model in each phase of the engine loop: pre_step, step, save_to_file, and
+    post_step. Both process time and wall-clock time are recorded per call. Optionally, the change in memory traced by
+    :mod:`tracemalloc` is recorded as well.
+
+    The profiler is a context manager, tracemalloc is started on enter and stopped on exit when memory tracking is
+    enabled::
+
+        with EngineProfiler(memory=True) as profiler:
+            engine = Engine(models, profiler=profiler)
+            ...
+
+        profiler.to_csv("profile.csv")
+
+    :param memory: Record memory deltas with tracemalloc.
+    :param percentiles: Percentiles reported by :meth:`summary`.
+    """
+    phases = ["pre_step", "step", "save_to_file", "post_step"]
+
+    def __init__(self, memory=False, percentiles=(50, 90, 99)):
+        self.memory = memory
+        self.percentiles = percentiles
+        self.process_time = {}
+        self.wall_time = {}
+        self.memory_delta = {}
+        self.__started_tracemalloc = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+
+    @contextmanager
+    def measure(self, model, phase):
+        key = (f"{model}", phase)
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            m0 = tracemalloc.get_traced_memory()[0]
+
+        w0 = time.perf_counter_ns()
+        t0 = time.process_time_ns()
+        try:
+            yield
+        finally:
+            tf = time.process_time_ns()
+            wf = time.perf_counter_ns()
+            self.process_time.setdefault(key, []).append((tf - t0) * 1e-9)
+            self.wall_time.setdefault(key, []).append((wf - w0) * 1e-9)
+            if memory:
+                self.memory_delta.setdefault(key, []).append(tracemalloc.get_traced_memory()[0] - m0)
+
+    def get_timings(self, model, phase):
+        """Process time in seconds of every call to `phase` of `model`."""
+        return self.process_time.get((f"{model}", phase), [])
+
+    def summary(self):
+        """Returns one row per model and phase with the number of calls, total, mean, and percentiles of the process
+        time, the total wall-clock time, and the mean and maximum memory delta if memory was tracked. Rows are sorted
+        by total process time."""
+        rows = []
+        for key, process_time in self.process_time.items():
+            process_time = np.array(process_time)
+            row = dict(model=key[0], phase=key[1], calls=len(process_time), total=process_time.sum(),
+                       mean=process_time.mean())
+            row.update({f"p{p}": v for p, v in zip(self.percentiles, np.percentile(process_time, self.percentiles))})
+            row["max"] = process_time.max()
+            row["wall_total"] = float(np.sum(self.wall_time[key]))
+            if key in self.memory_delta:
+                row["memory_mean"] = float(np.mean(self.memory_delta[key]))
+                row["memory_max"] = int(np.max(self.memory_delta[key]))
+
+            rows.append(row)
+
+        return sorted(rows, key=lambda r: r["total"], reverse=True)
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.summary())
+
+    def to_csv(self, file_name):
+        self.to_dataframe().to_csv(file_name, index=False)
+
+    def to_json(self, file_name):
+        with open(file_name, "w") as out:
+            json.dump([{k: (v.item() if isinstance(v, np.generic) else v) for k, v in r.items()}
+                       for r in self.summary()], out, indent=2)
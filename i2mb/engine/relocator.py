@@ -18,6 +18,7 @@ class Relocator:
 
         n = len(population)
         self.location = np.array([universe] * n)  # type: np.ndarray[CompositeWorld]
+        self.location_id = np.full(n, universe.id, dtype=int)
         self.position = np.full((n, 2), -0.)
         self.remain = np.zeros((n,), dtype=bool)
         self.visit_counter = {}
@@ -99,6 +100,59 @@ class Relocator:
         cache_manager.invalidate()
         return idx
 
+    def move_agents_many(self, idx, destinations):
+        """Moves agents `idx` to their corresponding `destinations` in a single pass. Departures are grouped by origin
+        and destination, so every affected region updates its population once. Exit, enter, empty, and cancel
+        callbacks fire as if :meth:`move_agents` had been called once per destination.
+
+        :param idx: Agent ids or boolean selector.
+        :param destinations: Destination region of each selected agent, or a single region for all of them.
+        :return: Ids of agents that moved.
+        """
+        idx = self.population.index[idx]
+        destinations = np.asarray(destinations, dtype=object).ravel()
+        if destinations.shape[0] == 1 and len(idx) != 1:
+            destinations = np.full(len(idx), destinations[0], dtype=object)
+
+        # Remove ids that are already in their destination
+        mask = self.location[idx] != destinations
+        idx, destinations = idx[mask], destinations[mask]
+        if len(idx) == 0:
+            return idx
+
+        regions = {}
+        origin_ids = np.array([regions.setdefault(r.id, r).id for r in self.location[idx]], dtype=int)
+        destination_ids = np.array([regions.setdefault(r.id, r).id for r in destinations], dtype=int)
+        routes, route_ix = np.unique(np.column_stack([origin_ids, destination_ids]), axis=0, return_inverse=True)
+        route_ix = route_ix.ravel()
+
+        departed_ix = np.ones_like(idx, dtype=bool)
+        for ix, (origin_id, destination_id) in enumerate(routes):
+            origin, destination = regions[origin_id], regions[destination_id]
+            leaving = route_ix == ix
+            if self.check_entry_route_locked(origin, destination):
+                departed_ix[leaving] = False
+                continue
+
+            leaving_idx = np.sort(idx[leaving])
+            self.execute_on_region_exit_actions(leaving_idx, origin)
+            self.execute_transfer_route(destination, leaving_idx, origin)
+
+        for origin_id in np.unique(origin_ids[departed_ix]):
+            origin = regions[origin_id]
+            leaving_idx = idx[departed_ix & (origin_ids == origin_id)]
+            self.update_region_population(origin, np.setdiff1d(origin.population.index, leaving_idx))
+
+        for destination_id in np.unique(destination_ids):
+            destination = regions[destination_id]
+            arriving = destination_ids == destination_id
+            self.execute_on_move_cancelled_actions(idx[arriving & ~departed_ix], destination)
+            arriving_idx = idx[arriving & departed_ix]
+            self.enter_region(arriving_idx, destination, self.location[arriving_idx])
+
+        cache_manager.invalidate()
+        return idx[departed_ix]
+
     def depart_current_region(self, idx, destination):
         depart = set(self.location[idx]) - {self}
         can_enter_destination = np.ones_like(idx, dtype=bool)
@@ -113,15 +167,19 @@ class Relocator:
 
             self.execute_on_region_exit_actions(leaving_idx, r)
             self.execute_transfer_route(destination, leaving_idx, r)
-            r.population = self.population[new_idx]
-            r.location = self.location[new_idx]
-            r.position = self.position[new_idx]
-            if r.is_empty():
-                self.population.regions.remove(r)
-                self.execute_on_region_empty_actions(r)
+            self.update_region_population(r, new_idx)
 
         return can_enter_destination
 
+    def update_region_population(self, region, new_idx):
+        """Replaces the population views of `region` after agents departed."""
+        region.population = self.population[new_idx]
+        region.location = self.location[new_idx]
+        region.position = self.position[new_idx]
+        if region.is_empty():
+            self.population.regions.remove(region)
+            self.execute_on_region_empty_actions(region)
+
     @staticmethod
     def check_entry_route_locked(origin: 'CompositeWorld', destination: 'CompositeWorld'):
         entry_matrix = origin.entry_route.reshape(-1, 1) == destination.entry_route
@@ -159,6 +217,7 @@ class Relocator:
         region.population = self.population[idx]
         region.position = self.position[idx]
         self.location[idx] = region
+        self.location_id[idx] = region.id
         self.position[idx_] = region.active_enter_world(len(idx_), idx=idx_, arriving_from=departed_from_regions)
 
         region.location = self.location[idx]
@@ -179,14 +238,5 @@ class Relocator:
             self.visit_counter[type(entrance_region)][idx] += 1
 
     def get_absolute_positions(self):
-        abs_pos = np.zeros((len(self.population), 2))
-        seen_index = np.array([])
-        for r in self.population.regions:
-            idx = r.population.index
-            seen_index = np.union1d(seen_index, idx)
-            abs_pos[idx] = r.get_absolute_origin() + r.population.position
-
-        idx_ = np.setdiff1d(self.population.index, seen_index)
-        abs_pos[idx_] = self.population.position[idx_] + self.universe.origin
-
-        return abs_pos
+        region_ids, origins = self.universe.get_absolute_origin_table()
+        return origins[np.searchsorted(region_ids, self.location_id)] + self.position
@@ -1,7 +1,7 @@
 import networkx as nx
 
 from i2mb.interactions.base_interaction import Interaction
-from i2mb.utils.spatial_utils import contacts_within_radius
+from i2mb.utils.spatial_utils import get_region_contacts
 
 
 class ContactHistory(Interaction):
@@ -28,24 +28,23 @@ class ContactHistory(Interaction):
         self.track_history_seen_contacts.clear()
 
         # Keep track of last encounter
-        contacts = contacts_within_radius(self.population, self.radius)
-        for region_contacts in contacts:
-            for r in region_contacts:
-                contact_pair = tuple(r)
-                self.track_history_seen_contacts.add(contact_pair)
-                contact_type = "random"
-                if contact_pair in self.network.edges:
-                    contact_type = self.network.edges[contact_pair]["type"]
-
-                if contact_pair in self.track_history:
-                    self.track_history[contact_pair]["duration"] += 1
-                else:
-                    self.track_history[contact_pair] = dict(
-                        type=contact_type,
-                        contact_started=t,
-                        duration=1,
-                        location=type(self.population.location[contact_pair[0]]).__name__
-                    )
+        contacts = get_region_contacts(self.population, self.radius).pairs
+        for r in contacts.tolist():
+            contact_pair = tuple(r)
+            self.track_history_seen_contacts.add(contact_pair)
+            contact_type = "random"
+            if contact_pair in self.network.edges:
+                contact_type = self.network.edges[contact_pair]["type"]
+
+            if contact_pair in self.track_history:
+                self.track_history[contact_pair]["duration"] += 1
+            else:
+                self.track_history[contact_pair] = dict(
+                    type=contact_type,
+                    contact_started=t,
+                    duration=1,
+                    location=type(self.population.location[contact_pair[0]]).__name__
+                )
 
     def save_to_file(self, t):
         contacts_not_seen = set(self.track_history) - self.track_history_seen_contacts
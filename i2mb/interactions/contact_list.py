@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Contact:
     def __init__(self):
         # When was the last encounter
@@ -116,3 +119,125 @@ class ContactList:
 
     def __repr__(self):
         return f"{self.contacts}"
+
+
+class ContactStore:
+    """Columnar alternative to one :class:`ContactList` per agent. Every row is a directed contact `(a, b)`, recorded
+    in the contact list of agent `a`. Rows are kept sorted by `a` and `b`, so the contacts of an agent are a contiguous
+    block of rows. Updates, pruning, and duration enforcement are batched array operations.
+
+    Columns follow the semantics of :class:`Contact`:
+        * `first_seen`: Start of the latest encounter (:attr:`Contact.latest`).
+        * `last_seen`: Last time the contact was seen.
+        * `current_run`: Length of the latest encounter (:attr:`Contact.current`).
+        * `longest_run`: Length of the longest encounter (:attr:`Contact.longest`).
+
+    :param n: Population size.
+    :param track_time: Measured in steps, contacts whose latest encounter started earlier than `track_time` are
+     removed.
+    """
+    def __init__(self, n, track_time=None):
+        self.n = n
+        self.track_time = track_time
+        self.enabled = np.ones(n, dtype=bool)
+
+        self.__keys = np.zeros(0, dtype=np.int64)
+        self.first_seen = np.zeros(0, dtype=int)
+        self.last_seen = np.zeros(0, dtype=int)
+        self.current_run = np.zeros(0, dtype=int)
+        self.longest_run = np.zeros(0, dtype=int)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    @property
+    def a(self):
+        return self.__keys // self.n
+
+    @property
+    def b(self):
+        return self.__keys % self.n
+
+    def __agent_slice(self, id_):
+        start, end = np.searchsorted(self.__keys, [id_ * self.n, (id_ + 1) * self.n])
+        return slice(start, end)
+
+    def __compress(self, keep):
+        self.__keys = self.__keys[keep]
+        self.first_seen = self.first_seen[keep]
+        self.last_seen = self.last_seen[keep]
+        self.current_run = self.current_run[keep]
+        self.longest_run = self.longest_run[keep]
+
+    def update(self, a, b, t, symmetric=False):
+        """Records an encounter at time `t` between agents `a` and `b`. Contacts are only recorded for enabled agents.
+
+        :param a: Owner ids.
+        :param b: Contact ids.
+        :param symmetric: If True, also record the contacts in the contact lists of `b`.
+        """
+        a = np.asarray(a, dtype=np.int64).ravel()
+        b = np.asarray(b, dtype=np.int64).ravel()
+        if symmetric:
+            a, b = np.concatenate([a, b]), np.concatenate([b, a])
+
+        keep = self.enabled[a] & (a != b)
+        keys = np.unique(a[keep] * self.n + b[keep])
+
+        pos = np.searchsorted(self.__keys, keys)
+        found = pos < len(self.__keys)
+        found[found] = self.__keys[pos[found]] == keys[found]
+
+        # Existing contacts continue the current encounter or start a new one.
+        pos_found = pos[found]
+        new_encounter = (t - self.last_seen[pos_found]) > 1
+        self.first_seen[pos_found[new_encounter]] = t
+        self.current_run[pos_found[new_encounter]] = 0
+        self.current_run[pos_found[~new_encounter]] += 1
+        self.last_seen[pos_found] = t
+        self.longest_run[pos_found] = np.maximum(self.longest_run[pos_found], self.current_run[pos_found])
+
+        new_pos = pos[~found]
+        self.__keys = np.insert(self.__keys, new_pos, keys[~found])
+        self.first_seen = np.insert(self.first_seen, new_pos, t)
+        self.last_seen = np.insert(self.last_seen, new_pos, t)
+        self.current_run = np.insert(self.current_run, new_pos, 0)
+        self.longest_run = np.insert(self.longest_run, new_pos, 0)
+
+        if self.track_time is not None:
+            self.prune(t)
+
+    def prune(self, timestamp):
+        """Removes expired contacts. Contacts expire when the latest encounter occurred earlier than track_time."""
+        if self.track_time is None:
+            return
+
+        self.__compress(timestamp - self.first_seen <= self.track_time)
+
+    def enforce_duration(self, duration):
+        """Removes contacts without an encounter of at least `duration` steps."""
+        self.__compress(self.longest_run >= duration)
+
+    def contacts(self, id_):
+        """Returns the ids of the contacts of agent `id_`."""
+        return self.__keys[self.__agent_slice(id_)] % self.n
+
+    def contacts_of(self, ids):
+        """Returns the unique ids of the contacts of all agents in `ids`."""
+        owners = np.zeros(self.n, dtype=bool)
+        owners[ids] = True
+        return np.unique(self.b[owners[self.a]])
+
+    def sufficient_contacts(self, ids, duration):
+        """Returns the `(a, b)` rows of agents `ids` whose current encounter lasts at least `duration` steps."""
+        owners = np.zeros(self.n, dtype=bool)
+        owners[ids] = True
+        a = self.a
+        selected = owners[a] & (self.current_run >= duration)
+        return np.column_stack([a[selected], self.b[selected]])
+
+    def num_contacts(self):
+        return np.bincount(self.a, minlength=self.n)
+
+    def __repr__(self):
+        return f"ContactStore({len(self)} contacts)"
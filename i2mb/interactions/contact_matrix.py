@@ -1,26 +1,54 @@
-from itertools import combinations
-
 import numpy as np
 
-from i2mb.utils.spatial_utils import ravel_index_triu_nd
-
 
 class ContactMatrix:
+    """Keeps track of the duration of uninterrupted contacts between pairs of agents. Only active contacts are stored,
+    as sorted `int64` pair keys with their duration counters, so memory and reset cost are proportional to the number
+    of active contacts rather than to the number of possible pairs.
+
+    :param n: Population size.
+    """
     def __init__(self, n):
-        self.__index = np.array(list(combinations(range(n), 2)))
-        self.__contacts = np.zeros(self.__index.shape[0], dtype=bool)
-        self.__contact_duration = np.zeros(self.__index.shape[0], dtype=int)
         self.n = n
+        self.__keys = np.zeros(0, dtype=np.int64)
+        self.__contacts = np.zeros(0, dtype=bool)
+        self.__contact_duration = np.zeros(0, dtype=int)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def ravel_pairs(self, contacts):
+        contacts = np.sort(np.asarray(contacts, dtype=np.int64).reshape(-1, 2), axis=1)
+        return contacts[:, 0] * self.n + contacts[:, 1]
+
+    def unravel_keys(self, keys):
+        return np.column_stack(np.divmod(keys, self.n)).astype(int).reshape(-1, 2)
 
     def update_contacts(self, contacts):
-        idx = ravel_index_triu_nd(contacts, self.n)
-        self.__contacts[idx] = True
-        self.__contact_duration[idx] += 1
+        keys = np.unique(self.ravel_pairs(contacts))
+        pos = np.searchsorted(self.__keys, keys)
+        found = pos < len(self.__keys)
+        found[found] = self.__keys[pos[found]] == keys[found]
+
+        self.__contacts[pos[found]] = True
+        self.__contact_duration[pos[found]] += 1
+
+        new_pos = pos[~found]
+        self.__keys = np.insert(self.__keys, new_pos, keys[~found])
+        self.__contacts = np.insert(self.__contacts, new_pos, True)
+        self.__contact_duration = np.insert(self.__contact_duration, new_pos, 1)
         return
 
     def get_sufficient_contact(self, duration):
-        return self.__index[self.__contact_duration >= duration]
+        return self.unravel_keys(self.__keys[self.__contact_duration >= duration])
+
+    def get_new_sufficient_contact(self, duration):
+        """Contacts that reached `duration` in the last update. Every uninterrupted contact is returned once."""
+        new = self.__contacts & (self.__contact_duration == max(duration, 1))
+        return self.unravel_keys(self.__keys[new])
 
     def reset(self):
-        self.__contact_duration[~self.__contacts] = 0
-        self.__contacts[:] = False
+        active = self.__contacts
+        self.__keys = self.__keys[active]
+        self.__contact_duration = self.__contact_duration[active]
+        self.__contacts = np.zeros(len(self.__keys), dtype=bool)
@@ -1,9 +1,8 @@
 import numpy as np
 
-from i2mb.utils.spatial_utils import distance, contacts_within_radius
-from i2mb.utils import cache_manager
+from i2mb.utils.spatial_utils import get_region_contacts
 from .base_interaction import Interaction
-from .contact_list import ContactList
+from .contact_list import ContactList, ContactStore
 
 
 class ContactTracing(Interaction):
@@ -28,10 +27,12 @@ class ContactTracing(Interaction):
     :param false_negatives: Rate of false negatives. This parameter simulates the possibility of hte underlying
      technology failing to record a valid connection.
     :param fp_radius: Percentage of radius use to consider false positives, defaults to 0.2
+    :param columnar: If True, contacts are recorded in a single :class:`ContactStore` instead of one
+     :class:`ContactList` per agent. In this case, the `contact_list` property is not added to the population.
     """
 
     def __init__(self, radius, population, track_time=None, duration=1,
-                 coverage=1., false_positives=0, false_negatives=0, fp_radius=.02):
+                 coverage=1., false_positives=0, false_negatives=0, fp_radius=.02, columnar=False):
 
         self.fp_radius = fp_radius ** 2
         self.false_negatives = false_negatives
@@ -41,6 +42,19 @@ class ContactTracing(Interaction):
         self.population = population
         self.track_time = track_time
         self.duration = duration
+        self.columnar = columnar
+
+        covered_particles = int(len(population) * coverage)
+        mask = np.zeros(len(population), dtype=bool)
+        mask[:covered_particles] = True
+        np.random.shuffle(mask)
+
+        self.contact_store = None
+        self.contacts = None
+        if columnar:
+            self.contact_store = ContactStore(len(population), track_time)
+            self.contact_store.enabled[:] = mask
+            return
 
         contacts = []
         for p in population:
@@ -49,22 +63,12 @@ class ContactTracing(Interaction):
         contacts = np.array(contacts).reshape((-1, 1))
         population.add_property("contact_list", contacts)
 
-        covered_particles = int(len(population) * coverage)
-        mask = np.zeros(len(population), dtype=bool)
-        mask[:covered_particles] = True
-        np.random.shuffle(mask)
         for i, cl in zip(mask, contacts.ravel()):
             if not i:
                 cl.enabled = False
 
         self.contacts = contacts
 
-    @cache_manager
-    def distances(self):
-        """Computes the distance between all agents in the population."""
-        positions = self.population.position
-        return distance(positions)
-
     def step(self, t):
         """This method is called by the :class:`i2mb-core.engine.core.Engine` and represent an iteration step. THe engine provides the time
          `t` of the simulation
@@ -72,22 +76,28 @@ class ContactTracing(Interaction):
          :param t: Simulation time, i.e., number of steps so far.
          :return: Returns the population contact list at time t
         """
-        distances = self.distances()
-        fp_radius = self.radius * (1 + self.fp_radius)
-
         if self.false_positives > 0:
-            fp_contacts = np.argwhere((distances > self.radius) & (distances <= fp_radius))
-            fp_contacts = fp_contacts[np.random.choice([True, False], size=len(fp_contacts),
-                                                       p=[self.false_positives, 1 - self.false_positives]), :]
-
-            contacts = np.vstack([np.argwhere((distances <= self.radius)), fp_contacts])
+            fp_radius = self.radius * (1 + self.fp_radius)
+            region_contacts = get_region_contacts(self.population, fp_radius)
+            contacts = region_contacts.pairs
+            fp_contacts = region_contacts.distances >= self.radius
+            fp_contacts[fp_contacts] = np.random.choice([True, False], size=fp_contacts.sum(),
+                                                        p=[self.false_positives, 1 - self.false_positives])
+            contacts = contacts[(region_contacts.distances < self.radius) | fp_contacts]
         else:
-            contacts = np.argwhere((distances <= self.radius))
+            contacts = get_region_contacts(self.population, self.radius).pairs
 
-        contacts = contacts[contacts[:, 0] != contacts[:, 1], :]
-        ids = set(contacts[:, 0])
-        # ids.update(fp_contacts[:, 0])
-        for id_ in ids:
+        # contact list needs to be made explicitly symmetric.
+        contacts = np.vstack([contacts, contacts[:, ::-1]])
+        if self.columnar:
+            if self.false_negatives > 0:
+                contacts = contacts[np.random.choice([False, True], size=len(contacts),
+                                                     p=[self.false_negatives, 1 - self.false_negatives])]
+
+            self.contact_store.update(contacts[:, 0], contacts[:, 1], t)
+            return self.contact_store
+
+        for id_ in np.unique(contacts[:, 0]):
             contact_ids = contacts[contacts[:, 0] == id_, 1]
             if self.false_negatives > 0:
                 contact_ids = contact_ids[np.random.choice([False, True], size=len(contact_ids),
@@ -98,10 +108,17 @@ class ContactTracing(Interaction):
         return self.population.contact_list
 
     def final(self, t):
+        if self.columnar:
+            self.contact_store.enforce_duration(self.duration)
+            return
+
         for cl in self.contacts.ravel():
             cl.enforce_duration(self.duration)
 
     def num_contacts(self):
+        if self.columnar:
+            return self.contact_store.num_contacts()
+
         return np.array([len(c) for c in self.contacts.ravel()])
 
 
@@ -113,24 +130,27 @@ class RegionContactTracing(ContactTracing):
          :param t: Simulation time, i.e., number of steps so far.
          :return: Returns the population contact list at time t
         """
-        contacts = contacts_within_radius(self.population, self.radius)
+        region_contacts = get_region_contacts(self.population, self.radius).pairs
 
         if self.false_negatives > 0:
-            contacts = contacts[np.random.choice([False, True], size=len(contacts),
-                                                 p=[self.false_negatives, 1 - self.false_negatives])]
-
-        for region_contacts in contacts:
-            ids = np.unique(region_contacts[:, 0])
-            for id_ in ids:
-                self.population[id_].contact_list[0].update(region_contacts[region_contacts[:, 0] == id_, 1], t,
-                                                            self.duration)
-                self.population[id_].contact_list[0].prune(t)
-
-            # contact list needs to be made explicitly symmetric.
-            ids = np.unique(region_contacts[:, 1])
-            for id_ in ids:
-                self.population[id_].contact_list[0].update(region_contacts[region_contacts[:, 1] == id_, 0], t,
-                                                            self.duration)
-                self.population[id_].contact_list[0].prune(t)
+            region_contacts = region_contacts[np.random.choice([False, True], size=len(region_contacts),
+                                                               p=[self.false_negatives, 1 - self.false_negatives])]
+
+        if self.columnar:
+            self.contact_store.update(region_contacts[:, 0], region_contacts[:, 1], t, symmetric=True)
+            return self.contact_store
+
+        ids = np.unique(region_contacts[:, 0])
+        for id_ in ids:
+            self.population[id_].contact_list[0].update(region_contacts[region_contacts[:, 0] == id_, 1], t,
+                                                        self.duration)
+            self.population[id_].contact_list[0].prune(t)
+
+        # contact list needs to be made explicitly symmetric.
+        ids = np.unique(region_contacts[:, 1])
+        for id_ in ids:
+            self.population[id_].contact_list[0].update(region_contacts[region_contacts[:, 1] == id_, 0], t,
+                                                        self.duration)
+            self.population[id_].contact_list[0].prune(t)
 
         return self.population.contact_list
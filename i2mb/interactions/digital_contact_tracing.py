@@ -1,9 +1,8 @@
 import numpy as np
 
-from i2mb.utils import cache_manager
-from i2mb.utils.spatial_utils import distance, contacts_within_radius
+from i2mb.utils.spatial_utils import contacts_within_radius, get_region_contacts
 from .base_interaction import Interaction
-from .contact_list import ContactList
+from .contact_list import ContactList, ContactStore
 
 
 class ContactTracing(Interaction):
@@ -28,11 +27,13 @@ class ContactTracing(Interaction):
     :param false_negatives: Rate of false negatives. This parameter simulates the possibility of hte underlying
      technology failing to record a valid connection.
     :param fp_radius: Percentage of radius use to consider false positives, defaults to 0.2
+    :param columnar: If True, contacts are recorded in a single :class:`ContactStore` instead of one
+     :class:`ContactList` per agent.
     """
 
     def __init__(self, radius, population, track_time=None, duration=1,
                  coverage=1., false_positives=0, false_negatives=0, fp_radius=.02,
-                 dropout=0., app_activation_time=0):
+                 dropout=0., app_activation_time=0, columnar=False):
 
         self.app_activation_time = app_activation_time
         self.dropout = dropout
@@ -44,22 +45,31 @@ class ContactTracing(Interaction):
         self.population = population
         self.track_time = track_time
         self.duration = duration
+        self.columnar = columnar
 
-        contacts = []
-        for p in population:
-            contacts.append(ContactList(track_time))
-
-        contacts = np.array(contacts).reshape((-1, 1))
         covered_particles = int(len(population) * coverage)
         mask = np.zeros(len(population), dtype=bool)
         mask[:covered_particles] = True
         np.random.shuffle(mask)
         self.covered = mask
-        for i, cl in zip(mask, contacts.ravel()):
-            if not i:
-                cl.enabled = False
 
-        self.contacts = contacts
+        self.contact_store = None
+        self.contacts = None
+        if columnar:
+            self.contact_store = ContactStore(len(population), track_time)
+            self.contact_store.enabled[:] = mask
+        else:
+            contacts = []
+            for p in population:
+                contacts.append(ContactList(track_time))
+
+            contacts = np.array(contacts).reshape((-1, 1))
+            for i, cl in zip(mask, contacts.ravel()):
+                if not i:
+                    cl.enabled = False
+
+            self.contacts = contacts
+
         self.code = -1
 
         # Report of a positive test.
@@ -74,12 +84,6 @@ class ContactTracing(Interaction):
         if hasattr(self.population, "register"):
             self.code = self.population.register("DCT")
 
-    @cache_manager
-    def distances(self):
-        """Computes the distance between all agents in the population."""
-        positions = self.population.position
-        return distance(positions)
-
     def step(self, t):
         """This method is called by the :class:`i2mb-core.engine.core.Engine` and represent an iteration step. THe engine provides the time
          `t` of the simulation
@@ -90,36 +94,44 @@ class ContactTracing(Interaction):
         if t < self.app_activation_time:
             return
 
-        distances = self.distances()
-        fp_radius = self.radius * (1 + self.fp_radius)
-
         if self.false_positives > 0:
-            fp_contacts = np.argwhere((distances > self.radius) & (distances <= fp_radius))
-            fp_contacts = fp_contacts[np.random.choice([True, False], size=len(fp_contacts),
-                                                       p=[self.false_positives, 1 - self.false_positives]), :]
-
-            contacts = np.vstack([np.argwhere((distances <= self.radius)), fp_contacts])
+            fp_radius = self.radius * (1 + self.fp_radius)
+            region_contacts = get_region_contacts(self.population, fp_radius)
+            contacts = region_contacts.pairs
+            fp_contacts = region_contacts.distances >= self.radius
+            fp_contacts[fp_contacts] = np.random.choice([True, False], size=fp_contacts.sum(),
+                                                        p=[self.false_positives, 1 - self.false_positives])
+            contacts = contacts[(region_contacts.distances < self.radius) | fp_contacts]
         else:
-            contacts = np.argwhere((distances <= self.radius))
-
-        contacts = contacts[contacts[:, 0] != contacts[:, 1], :]
-        ids = set(contacts[:, 0])
-        # ids.update(fp_contacts[:, 0])
-        for id_ in ids:
-            contact_ids = contacts[contacts[:, 0] == id_, 1]
-            if self.false_negatives > 0:
-                contact_ids = contact_ids[np.random.choice([False, True], size=len(contact_ids),
-                                                           p=[self.false_negatives, 1 - self.false_negatives])]
-            self.contacts[id_].contact_list[0].update(contact_ids, t, self.duration)
-            self.contacts[id_].contact_list[0].prune(t)
+            contacts = get_region_contacts(self.population, self.radius).pairs
+
+        contacts = np.vstack([contacts, contacts[:, ::-1]])
+        if self.false_negatives > 0:
+            contacts = contacts[np.random.choice([False, True], size=len(contacts),
+                                                 p=[self.false_negatives, 1 - self.false_negatives])]
+
+        if self.columnar:
+            self.contact_store.update(contacts[:, 0], contacts[:, 1], t)
+            return self.contact_store
+
+        for id_ in np.unique(contacts[:, 0]):
+            self.contacts[id_, 0].update(contacts[contacts[:, 0] == id_, 1], t, self.duration)
+            self.contacts[id_, 0].prune(t)
 
         return self.contacts
 
     def final(self, t):
+        if self.columnar:
+            self.contact_store.enforce_duration(self.duration)
+            return
+
         for cl in self.contacts.ravel():
             cl.enforce_duration(self.duration)
 
     def num_contacts(self):
+        if self.columnar:
+            return self.contact_store.num_contacts()
+
         return np.array([len(c) for c in self.contacts.ravel()])
 
 
@@ -140,20 +152,29 @@ class RegionContactTracing(ContactTracing):
                                                  p=[self.false_negatives, 1 - self.false_negatives])]
 
         # Trace contacts
-        for region_contacts in contacts:
-            # Skip filtering  contacts when coverage is 100%
+        if self.columnar:
+            region_contacts = np.vstack([np.zeros((0, 2), dtype=int), *contacts])
             if self.coverage < 1.:
-                # Select only contacts where both ids have digital coverage.
-                selector = self.covered[region_contacts[:, 0].ravel()]
-                selector &= self.covered[region_contacts[:, 1].ravel()]
+                selector = self.covered[region_contacts[:, 0]] & self.covered[region_contacts[:, 1]]
                 region_contacts = region_contacts[selector, :]
 
-            for id_a, id_b in region_contacts:
-                self.contacts[id_a][0].update([id_b], t, self.duration)
-                self.contacts[id_b][0].update([id_a], t, self.duration)
+            self.contact_store.update(region_contacts[:, 0], region_contacts[:, 1], t, symmetric=True)
+
+        else:
+            for region_contacts in contacts:
+                # Skip filtering  contacts when coverage is 100%
+                if self.coverage < 1.:
+                    # Select only contacts where both ids have digital coverage.
+                    selector = self.covered[region_contacts[:, 0].ravel()]
+                    selector &= self.covered[region_contacts[:, 1].ravel()]
+                    region_contacts = region_contacts[selector, :]
+
+                for id_a, id_b in region_contacts:
+                    self.contacts[id_a][0].update([id_b], t, self.duration)
+                    self.contacts[id_b][0].update([id_a], t, self.duration)
 
-            for id_ in np.unique(region_contacts.ravel()):
-                self.contacts[id_][0].prune(t)
+                for id_ in np.unique(region_contacts.ravel()):
+                    self.contacts[id_][0].prune(t)
 
         # Collect positive tests
         new_tests = self.population.test_result & self.positive_test_report
@@ -162,10 +183,14 @@ class RegionContactTracing(ContactTracing):
 
             # Get contacts of positive tests
             contacts_idx = set()
-            for cl in self.contacts[new_tests[:, 0], 0]:
-                contacts_idx.update(cl.contacts)
-                if len(contacts_idx) == len(self.population):
-                    break
+            if self.columnar:
+                contacts_idx.update(self.contact_store.contacts_of(new_tests[:, 0]).tolist())
+
+            else:
+                for cl in self.contacts[new_tests[:, 0], 0]:
+                    contacts_idx.update(cl.contacts)
+                    if len(contacts_idx) == len(self.population):
+                        break
 
             non_contacts = self.population.index[new_tests.ravel()].ravel()
             contacts_idx = list(contacts_idx - set(non_contacts))
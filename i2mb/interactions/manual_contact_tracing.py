@@ -19,7 +19,7 @@ from collections import Counter
 import numpy as np
 from i2mb.interactions.base_interaction import Interaction
 from i2mb.utils import global_time
-from i2mb.utils.spatial_utils import contacts_within_radius
+from i2mb.utils.spatial_utils import get_region_contacts
 from i2mb.worlds.world_base import PublicSpace
 
 
@@ -84,10 +84,9 @@ class ManualContactTracing(Interaction):
         self.num_contacted = 0
 
         # Marc contacts
-        contacts = contacts_within_radius(self.population, self.radius)
-        for region_contacts in contacts:
-            self.contact_matrix.update([tuple(r) for r in region_contacts])
-            self.last_update.update({tuple(r): t for r in region_contacts})
+        contacts = [tuple(r) for r in get_region_contacts(self.population, self.radius).pairs.tolist()]
+        self.contact_matrix.update(contacts)
+        self.last_update.update(dict.fromkeys(contacts, t))
 
         # Enforce Track time
         for k, v in self.last_update.items():
@@ -105,8 +105,7 @@ class ContactIsolationIntervention(Intervention):
 
             regions = self.world.containment_region
             new_isolated = new_isolated.ravel() & (regions != self.population.location)
-            for r in set(regions[new_isolated].ravel()):
-                self.relocator.move_agents((regions == r) & new_isolated, r)
+            self.relocator.move_agents_many(new_isolated, regions[new_isolated])
 
     def release_agents(self, t):
         recovered_ids = self.leave_request.ravel()
@@ -118,8 +117,7 @@ class ContactIsolationIntervention(Intervention):
 
             regions = self.world.home
             recovered_ids = recovered_ids.ravel() & (regions != self.population.location)
-            for r in set(regions[recovered_ids]):
-                self.relocator.move_agents((regions == r) & recovered_ids, r)
+            self.relocator.move_agents_many(recovered_ids, regions[recovered_ids])
 
             self.leave_request[:] = False
 
@@ -1,2 +1,2 @@
-from .base_pathogen import SymptomLevels, UserStates, UserStatesLegacy
+from .base_pathogen import ProgressionEvent, SymptomLevels, UserStates, UserStatesLegacy
 from .dynamic_infection import RegionVirusDynamicExposure
@@ -2,6 +2,7 @@ import enum
 import numpy as np
 
 from i2mb.engine.model import Model
+from i2mb.utils.collections import EventQueue
 
 
 class UserStatesLegacy(enum.IntEnum):
@@ -30,6 +31,14 @@ class UserStates(enum.IntEnum):
         return UserStates.infectious
 
 
+class ProgressionEvent(enum.IntEnum):
+    # End of the incubation, the agent becomes infectious and shows symptoms if any
+    infectious_onset = 0
+
+    # Recovery or death
+    outcome = 1
+
+
 class SymptomLevels(enum.IntEnum):
     # Really not a problem
     not_sick = -1
@@ -50,6 +59,32 @@ class SymptomLevels(enum.IntEnum):
         return SymptomLevels.no_symptoms, SymptomLevels.mild, SymptomLevels.strong, SymptomLevels.critical
 
 
+def infectious_susceptible_pairs(pairs, infectious, susceptible):
+    """Orients contact pairs as `(vector, target)`, keeping only pairs between an infectious and a susceptible agent.
+
+    :param pairs: `(k, 2)` array of agent ids in contact.
+    :param infectious: Boolean mask of infectious agents.
+    :param susceptible: Boolean mask of susceptible agents.
+    """
+    infectious = infectious.ravel()
+    susceptible = susceptible.ravel()
+    forward = infectious[pairs[:, 0]] & susceptible[pairs[:, 1]]
+    backward = infectious[pairs[:, 1]] & susceptible[pairs[:, 0]]
+    return np.vstack([pairs[forward], pairs[backward][:, ::-1]]).reshape(-1, 2)
+
+
+def distribute_blame(vector_target, n):
+    """Since a particle can be in proximity of two or more infected agents, blame is equally distributed among the
+    infected agents. Returns the number of particles infected by each agent.
+
+    :param vector_target: `(k, 2)` array of `(vector, target)` pairs that lead to an infection.
+    :param n: Population size.
+    """
+    vectors, targets = vector_target[:, 0], vector_target[:, 1]
+    weights = 1 / np.bincount(targets, minlength=n)[targets]
+    return np.bincount(vectors, weights=weights, minlength=n)
+
+
 class Pathogen(Model):
     def __init__(self, population):
         self.population = population
@@ -68,6 +103,9 @@ class Pathogen(Model):
         self.particle_type = np.zeros(shape)
         self.location_contracted = np.zeros(shape, dtype=object)
 
+        # Calendar of the state transitions of infected agents, see `enable_scheduled_progression`.
+        self.progression = None
+
         population.add_property("infectious_duration_pso", self.infectious_duration_pso)
         population.add_property("incubation_duration", self.incubation_duration)
         population.add_property("illness_duration", self.illness_duration)
@@ -77,6 +115,75 @@ class Pathogen(Model):
         population.add_property("outcome", self.outcomes)
         population.add_property("location_contracted", self.location_contracted)
 
+    def enable_scheduled_progression(self):
+        """Transitions are scheduled when agents are infected, instead of comparing the transition times of the whole
+        population every tick."""
+        self.progression = EventQueue()
+
+    def schedule_progression(self, ids, due, event):
+        """Schedules `event` for agents `ids` at the first tick at or after `due`."""
+        self.progression.schedule(np.ceil(np.asarray(due, dtype=float)), ids, int(event))
+
+    def schedule_transitions(self, ids):
+        """Schedules the infectious onset and outcome of agents `ids` from their disease profile. Transitions moved to
+        a later tick are scheduled again automatically, this must be called when a change of the disease profile
+        brings a transition forward."""
+        ids = np.asarray(ids, dtype=int)
+        onset = self.time_of_infection[ids, 0] + self.incubation_duration[ids, 0]
+        self.schedule_progression(ids, onset, ProgressionEvent.infectious_onset)
+        self.schedule_progression(ids, onset + self.infectious_duration_pso[ids, 0], ProgressionEvent.outcome)
+
+    def pop_progression(self, t):
+        """Returns the ids of agents with infectious onset and outcome events due at `t`."""
+        _, ids, events = self.progression.pop_due(t)
+        return ids[events == ProgressionEvent.infectious_onset], ids[events == ProgressionEvent.outcome]
+
+    def due_transitions(self, ids, due, t, event):
+        """Returns the `ids` whose transition is `due` by `t`, the rest are scheduled again at their due time."""
+        pending = due > t
+        self.schedule_progression(ids[pending], due[pending], event)
+        return ids[~pending]
+
+    def update_scheduled_states(self, t, incubation_state, contagious_states):
+        """Applies the infectious onset and outcome events due at `t`. Events of agents that are no longer in the
+        expected state are dropped, and events due later, e.g., after a change of the disease profile, are scheduled
+        again. Returns the ids of agents that reached their outcome.
+
+        :param incubation_state: State of agents waiting for the infectious onset.
+        :param contagious_states: States of agents waiting for the outcome.
+        """
+        onset, outcome = self.pop_progression(t)
+        onset = onset[self.states[onset, 0] == incubation_state]
+        onset = self.due_transitions(onset, self.incubation_duration[onset, 0] + self.time_of_infection[onset, 0], t,
+                                     ProgressionEvent.infectious_onset)
+        self.states[onset, 0] = self.infectious_onset_state(onset)
+
+        # Outcomes of agents still in incubation wait for the infectious onset.
+        outcome = outcome[np.isin(self.states[outcome, 0], [incubation_state, *contagious_states])]
+        due = (self.infectious_duration_pso[outcome, 0] + self.incubation_duration[outcome, 0] +
+               self.time_of_infection[outcome, 0])
+        incubation = self.states[outcome, 0] == incubation_state
+        due[incubation] = np.maximum(due[incubation], t + 1)
+        outcome = self.due_transitions(outcome, due, t, ProgressionEvent.outcome)
+        self.states[outcome, 0] = self.outcomes[outcome, 0]
+        return outcome
+
+    def freeze_deceased(self, ids=None):
+        """Stops the motion of deceased agents. When `ids` are given, e.g., the outcomes of this tick, only those agents
+        are checked instead of the whole population."""
+        if not hasattr(self.population, "motion_mask"):
+            return
+
+        if ids is None:
+            self.population.motion_mask[self.states[:, 0] == UserStates.deceased] = False
+            return
+
+        self.population.motion_mask[ids[self.states[ids, 0] == UserStates.deceased]] = False
+
+    def infectious_onset_state(self, ids):
+        """State of agents `ids` at the end of their incubation."""
+        return UserStates.infectious
+
     def update_wave_done(self, pandemic_active, t):
         if not pandemic_active and self.wave_done is False:
             self.wave_done = True
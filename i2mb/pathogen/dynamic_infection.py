@@ -1,4 +1,3 @@
-from collections import Counter
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -8,8 +7,10 @@ if TYPE_CHECKING:
 
 from i2mb.pathogen import UserStates
 from i2mb.pathogen.base_pathogen import Pathogen, SymptomLevels
+from i2mb.pathogen.infectiousness_table import InfectiousnessTable, LazyInfectiousnessTable
+from i2mb.pathogen.transmission_log import TransmissionLog
 from i2mb.utils import global_time
-from i2mb.utils.spatial_utils import contacts_within_radius
+from i2mb.utils.spatial_utils import get_region_contacts
 
 
 class RegionVirusDynamicExposure(Pathogen):
@@ -25,6 +26,27 @@ class RegionVirusDynamicExposure(Pathogen):
     The signature of the `recovery_function` and  the`infectiousness_function` is as follows:
 
         function(population, time)
+
+    Alternatively, a `pair_exposure_function` returns the exposure caused by each `(vector, target)` contact, and
+    exposures of all regions are accumulated in one pass. Its signature is:
+
+        function(time, vector_target, distances, infectiousness_level)
+
+    Transmissions are recorded in a :class:`TransmissionLog`, which is spilled to `transmission_log_file` when given.
+    Contacts are only counted when `contact_sample_rate` is greater than 0, in which case that fraction of the contacts
+    of each step is added to the per agent `contact_counts`.
+
+    Disease profiles are fixed on creation, so the infectiousness curves can be tabulated by time since infection with
+    `infectiousness_table`. Pass "agent" to tabulate the `infectiousness_function` per agent, sampled every
+    `infectiousness_resolution` ticks, or a single curve, or an :class:`InfectiousnessTable`, shared by all agents. Per
+    agent curves are tabulated on the first evaluation of each infected agent. Each curve takes 4 bytes per sample,
+    i.e., `4 * duration / infectiousness_resolution` bytes, where `duration` is the longest incubation plus infectious
+    duration in ticks. With
+    `lazy_infectiousness`, the infectiousness level is only evaluated for vectors in contact with a susceptible agent,
+    the level of other infected agents is not updated.
+
+    With `scheduled_progression`, the infectious onset and outcome of each agent are scheduled when it is infected,
+    and only the transitions due are processed every tick.
     """
 
     def __init__(self, exposure_function, recovery_function, infectiousness_function, population: 'AgentList',
@@ -33,8 +55,12 @@ class RegionVirusDynamicExposure(Pathogen):
                  infectious_duration_pso_distribution=None,
                  incubation_duration_distribution=None,
                  symptom_distribution=None, death_rate=0.05, icu_beds=None,
-                 locations_of_interest=None):
+                 locations_of_interest=None, pair_exposure_function=None, transmission_log_file=None,
+                 contact_sample_rate=0., infectiousness_table=None, infectiousness_resolution=1,
+                 lazy_infectiousness=False, scheduled_progression=False):
         Pathogen.__init__(self, population)
+        if scheduled_progression:
+            self.enable_scheduled_progression()
 
         self.icu_beds = icu_beds
         self.radius = radius ** 2
@@ -55,6 +81,18 @@ class RegionVirusDynamicExposure(Pathogen):
         self.infectiousness_function = infectiousness_function
         self.recovery_function = recovery_function
         self.exposure_function = exposure_function
+        self.pair_exposure_function = pair_exposure_function
+
+        if isinstance(infectiousness_table, str) and infectiousness_table != "agent":
+            raise ValueError(f"Unsupported infectiousness table '{infectiousness_table}', use 'agent', a curve, or an "
+                             f"InfectiousnessTable.")
+
+        if infectiousness_table is not None and not isinstance(infectiousness_table, (str, InfectiousnessTable)):
+            infectiousness_table = InfectiousnessTable(infectiousness_table, infectiousness_resolution)
+
+        self.infectiousness_table = infectiousness_table
+        self.infectiousness_resolution = infectiousness_resolution
+        self.lazy_infectiousness = lazy_infectiousness
 
         try:
             self.__death_rate, self.__death_rate_icu = death_rate
@@ -75,9 +113,10 @@ class RegionVirusDynamicExposure(Pathogen):
         self.time_exposed = np.zeros(shape)
 
         # Diagnostics and information
-        self.infection_map = {}
-        self.infected_by = {}
-        self.contact_map = Counter()
+        self.transmission_log = TransmissionLog(len(population), spill_file=transmission_log_file)
+        self.infected_by = np.full(len(population), -1, dtype=int)
+        self.contact_sample_rate = contact_sample_rate
+        self.contact_counts = np.zeros(len(population), dtype=int)
 
         self.create_disease_profile()
 
@@ -164,25 +203,60 @@ class RegionVirusDynamicExposure(Pathogen):
 
         self.outcomes[infected, 0] = self.__get_outcomes(num_p0s)
 
+        if self.progression is not None:
+            self.schedule_transitions(infected)
+
     def update_states(self, t):
         self.move_susceptible_exposed()
         self.update_exposed(t)
-        infected = self.move_infected_to_infectious(t)
-        active = self.move_infectious_to_recovered(t)
-        self.update_infectiousness_level(active, infected, t)
+        if self.progression is not None:
+            recovered = self.update_scheduled_states(t, UserStates.infected, [UserStates.infectious])
+            self.freeze_deceased(recovered)
+
+            # Masks of agents infected, or infectious before the outcomes of this tick, only when needed.
+            infected = active = None
+            if not self.lazy_infectiousness or self.icu_beds is not None:
+                infected = self.states == UserStates.infected
+                active = self.states == UserStates.infectious
+                active[recovered] = True
+
+        else:
+            infected = self.move_infected_to_infectious(t)
+            active = self.move_infectious_to_recovered(t)
+
+        if not self.lazy_infectiousness:
+            self.update_infectiousness_level(active, infected, t)
 
         # Update death rate as a function of ICU bed occupation (Critical patients)
         self.death_rate = self.__death_rate
-        if ((self.symptom_levels[active] == SymptomLevels.strong).any() and self.icu_beds is not None and
+        if (self.icu_beds is not None and (self.symptom_levels[active] == SymptomLevels.strong).any() and
                 sum(self.symptom_levels[active] == SymptomLevels.strong) > self.icu_beds):
             self.death_rate = self.__death_rate_icu
 
     def update_infectiousness_level(self, active, infected, t):
-        # Update infectiousness level
-        self.infectiousness_level[active | infected] = (
-            self.infectiousness_function(t - self.time_of_infection[active | infected],
-                                         self.incubation_duration[active | infected],
-                                         self.infectious_duration_pso[active | infected]))
+        ids = np.nonzero((active | infected).ravel())[0]
+        self.infectiousness_level[ids, 0] = self.evaluate_infectiousness(t, ids)
+
+    def infectiousness_parameters(self, ids):
+        """Disease profile arguments passed to the `infectiousness_function` after the time since infection."""
+        return self.incubation_duration[ids, 0], self.infectious_duration_pso[ids, 0]
+
+    def tabulate_infectiousness(self):
+        duration = np.ceil((self.incubation_duration + self.infectious_duration_pso).max())
+        self.infectiousness_table = LazyInfectiousnessTable(self.infectiousness_function,
+                                                            self.infectiousness_parameters, len(self.population),
+                                                            duration, self.infectiousness_resolution)
+
+    def evaluate_infectiousness(self, t, ids):
+        time_since_infection = t - self.time_of_infection[ids, 0]
+        if self.infectiousness_table is None:
+            return self.infectiousness_function(time_since_infection, *self.infectiousness_parameters(ids))
+
+        # Per agent tables are created on first use, when the disease profile is final.
+        if isinstance(self.infectiousness_table, str):
+            self.tabulate_infectiousness()
+
+        return self.infectiousness_table.lookup(ids, time_since_infection)
 
     def move_infectious_to_recovered(self, t):
         # Particles that have gone through the decease.
@@ -239,10 +313,9 @@ class RegionVirusDynamicExposure(Pathogen):
             self.states[newly_exposed] = UserStates.exposed
 
     def step(self, t):
-        # Freeze the deceased.
-        deceased = self.states == UserStates.deceased
-        if hasattr(self.population, "motion_mask"):
-            self.population.motion_mask[deceased] = False
+        # Freeze the deceased, the scheduled progression freezes them on their outcome.
+        if self.progression is None:
+            self.freeze_deceased()
 
         self.update_states(t)
 
@@ -256,51 +329,80 @@ class RegionVirusDynamicExposure(Pathogen):
         if self.wave_done or not infection_mask.any():
             return
 
-        contacts = contacts_within_radius(self.population, self.radius, return_distance=True)
-        for region_contacts, region in zip(contacts, [r for r in self.population.regions if len(r.population) > 1]):
-            region_contacts, distances = region_contacts
-            self.contact_map.update([tuple(sorted(k)) for k in region_contacts])
-            region_infectious = infection_mask[region.population.index].ravel()
-            if not region_infectious.any():
-                continue
-
-            region_susceptible = ((self.states[region.population.index] == UserStates.exposed) |
-                                  (self.states[region.population.index] == UserStates.susceptible)).ravel()
-
-            if not region_susceptible.any():
-                continue
-
-            region_vector_contacts = np.logical_xor(
-                ((region_contacts[:, 0].reshape(-1, 1) == region.population.index[region_infectious].ravel()).any(
-                    axis=1) &
-                 (region_contacts[:, 1].reshape(-1, 1) == region.population.index[region_susceptible].ravel()).any(
-                     axis=1)),
-                ((region_contacts[:, 1].reshape(-1, 1) == region.population.index[region_infectious].ravel()).any(
-                    axis=1) &
-                 (region_contacts[:, 0].reshape(-1, 1) == region.population.index[region_susceptible].ravel()).any(
-                     axis=1)))
-
-            if not region_vector_contacts.any():
-                continue
-
-            exposure = self.exposure_function(t, region_vector_contacts,
-                                              region_contacts, distances,
+        region_contacts = get_region_contacts(self.population, self.radius)
+        pairs, distances = region_contacts.pairs, region_contacts.distances
+        self.count_contacts(pairs)
+
+        # Label contacts between a vector and a susceptible agent
+        infection_mask = infection_mask.ravel()
+        susceptible = ((self.states == UserStates.exposed) | (self.states == UserStates.susceptible)).ravel()
+        forward = infection_mask[pairs[:, 0]] & susceptible[pairs[:, 1]]
+        vector_contacts = forward | (infection_mask[pairs[:, 1]] & susceptible[pairs[:, 0]])
+        if not vector_contacts.any():
+            return
+
+        vector_target = np.where(forward[:, None], pairs, pairs[:, ::-1])[vector_contacts]
+        if self.lazy_infectiousness:
+            vectors = np.unique(vector_target[:, 0])
+            self.infectiousness_level[vectors, 0] = self.evaluate_infectiousness(t, vectors)
+
+        if self.pair_exposure_function is not None:
+            exposure = self.pair_exposure_function(t, vector_target, distances[vector_contacts],
+                                                   self.infectiousness_level)
+            self.exposure[:, 0] += np.bincount(vector_target[:, 1], weights=exposure, minlength=len(self.population))
+
+        else:
+            self.update_region_exposure(t, region_contacts, vector_contacts)
+
+        self.record_transmissions(t, vector_target, region_contacts.pair_region_ids[vector_contacts])
+
+    def count_contacts(self, pairs):
+        if self.contact_sample_rate <= 0:
+            return
+
+        if self.contact_sample_rate < 1:
+            pairs = pairs[np.random.random(len(pairs)) < self.contact_sample_rate]
+
+        self.contact_counts += np.bincount(pairs.ravel(), minlength=len(self.population))
+
+    def update_region_exposure(self, t, region_contacts, vector_contacts):
+        """Accumulates the exposure of each region with vector contacts using the region level `exposure_function`."""
+        pair_region_pos = np.repeat(np.arange(len(region_contacts)), np.diff(region_contacts.region_ptr))
+        for pos in np.unique(pair_region_pos[vector_contacts]):
+            region = region_contacts.regions[pos]
+            slice_ = slice(region_contacts.region_ptr[pos], region_contacts.region_ptr[pos + 1])
+            exposure = self.exposure_function(t, vector_contacts[slice_],
+                                              region_contacts.pairs[slice_], region_contacts.distances[slice_],
                                               region.population.index,
                                               self.infectiousness_level)
 
             self.exposure[region.population.index] += exposure.reshape(-1, 1)
-            for x, y in region_contacts[region_vector_contacts]:
-                if self.states[x] == UserStates.infectious:
-                    if self.exposure[y] >= .99 and y not in self.infected_by:
-                        self.infection_map.setdefault(x, {}).setdefault(y, []).append(t)
-                        self.infected_by[y] = x
 
-                else:
-                    if self.exposure[x] >= .99 and x not in self.infected_by:
-                        self.infection_map.setdefault(y, {}).setdefault(x, []).append(t)
-                        self.infected_by[x] = y
+    def record_transmissions(self, t, vector_target, region_ids):
+        """Records a vector as the source of each target exposed above the infection threshold. Only the first vector
+        in contact order is recorded, and targets are only recorded once."""
+        targets = vector_target[:, 1]
+        transmissions = (self.exposure[targets, 0] >= .99) & (self.infected_by[targets] < 0)
+        if not transmissions.any():
+            return
+
+        vector_target, region_ids = vector_target[transmissions], region_ids[transmissions]
+        _, first = np.unique(vector_target[:, 1], return_index=True)
+        first = np.sort(first)
+        vector_target, region_ids = vector_target[first], region_ids[first]
 
-        return
+        self.transmission_log.append(t, vector_target[:, 0], vector_target[:, 1], region_ids)
+        self.infected_by[vector_target[:, 1]] = vector_target[:, 0]
+
+    def r(self):
+        return self.transmission_log.r()
+
+    def r_current(self):
+        active = (self.states == UserStates.infected) | (self.states == UserStates.infectious)
+        return self.transmission_log.r_current(active)
+
+    def final(self, t):
+        self.transmission_log.flush()
 
 
 class RegionVirusDynamicExposureBaseOnViralLoad(RegionVirusDynamicExposure):
@@ -312,7 +414,9 @@ class RegionVirusDynamicExposureBaseOnViralLoad(RegionVirusDynamicExposure):
                  max_viral_load_distribution=None,
                  symptom_onset_estimator=None,
                  symptom_distribution=None, death_rate=0.05, icu_beds=None, max_viral_load=1,
-                 min_viral_load=1e-80):
+                 min_viral_load=1e-80, pair_exposure_function=None, transmission_log_file=None,
+                 contact_sample_rate=0., infectiousness_table=None, infectiousness_resolution=1,
+                 lazy_infectiousness=False, scheduled_progression=False):
 
         self.symptom_onset_estimator = symptom_onset_estimator
         self.proliferation_duration_distribution = proliferation_duration_distribution
@@ -328,7 +432,11 @@ class RegionVirusDynamicExposureBaseOnViralLoad(RegionVirusDynamicExposure):
                          illness_duration_distribution=illness_duration_distribution,
                          infectious_duration_pso_distribution=None,
                          incubation_duration_distribution=None,
-                         symptom_distribution=symptom_distribution, death_rate=death_rate, icu_beds=icu_beds)
+                         symptom_distribution=symptom_distribution, death_rate=death_rate, icu_beds=icu_beds,
+                         pair_exposure_function=pair_exposure_function,
+                         transmission_log_file=transmission_log_file, contact_sample_rate=contact_sample_rate,
+                         infectiousness_table=infectiousness_table, infectiousness_resolution=infectiousness_resolution,
+                         lazy_infectiousness=lazy_infectiousness, scheduled_progression=scheduled_progression)
 
         # Normalize with max
         self.max_viral_load /= max_viral_load
@@ -351,13 +459,9 @@ class RegionVirusDynamicExposureBaseOnViralLoad(RegionVirusDynamicExposure):
         else:
             self.illness_duration[:] = self.illness_duration_distribution(n).reshape(-1, 1)
 
-    def update_infectiousness_level(self, active, infected, t):
-        # Update infectiousness level
-        self.infectiousness_level[active | infected] = (
-            self.infectiousness_function(t - self.time_of_infection[active | infected],
-                                         self.incubation_duration[active | infected],
-                                         self.infectious_duration_pso[active | infected],
-                                         self.max_viral_load[active | infected]))
+    def infectiousness_parameters(self, ids):
+        return (self.incubation_duration[ids, 0], self.infectious_duration_pso[ids, 0],
+                self.max_viral_load[ids, 0])
 
     # def update_exposed(self, t):
     #     # Agents that are exposed
@@ -3,11 +3,11 @@ from functools import partial
 
 import numpy as np
 
-from i2mb.interactions.contact_list import ContactList
+from i2mb.interactions.contact_list import ContactList, ContactStore
 from i2mb.engine.agents import AgentList
-from i2mb.utils.spatial_utils import distance, contacts_within_radius, ravel_index_triu_nd, region_ravel_multi_index
-from i2mb.utils import cache_manager
-from .base_pathogen import Pathogen, SymptomLevels, UserStatesLegacy as UserStates
+from i2mb.utils.spatial_utils import contacts_within_radius, get_region_contacts, region_ravel_multi_index
+from .base_pathogen import Pathogen, SymptomLevels, UserStatesLegacy as UserStates, infectious_susceptible_pairs, \
+    distribute_blame
 from i2mb.interactions.contact_matrix import ContactMatrix
 
 
@@ -22,10 +22,15 @@ class CoronaVirus(Pathogen):
     :param asymptomatic_p:
     :param death_rate:
     :param icu_beds:
+    :param columnar: If True, exposures are tracked in a single :class:`ContactStore` instead of one
+     :class:`ContactList` per agent.
+    :param scheduled_progression: If True, state transitions are scheduled on infection and only the transitions due
+     are processed every tick.
     """
 
     def __init__(self, radius, exposure_time, population: AgentList, duration_distribution=None,
-                 incubation_distribution=None, asymptomatic_p=0.01, death_rate=None, icu_beds=None):
+                 incubation_distribution=None, asymptomatic_p=0.01, death_rate=None, icu_beds=None, columnar=False,
+                 scheduled_progression=False):
 
         super().__init__(population)
         self.incubation_distribution = incubation_distribution
@@ -52,9 +57,16 @@ class CoronaVirus(Pathogen):
 
         self.death_rate = self.__death_rate
 
-        self.contacts = []
-        for p in population:
-            self.contacts.append(ContactList())
+        self.columnar = columnar
+        if columnar:
+            self.contacts = ContactStore(len(population))
+        else:
+            self.contacts = []
+            for p in population:
+                self.contacts.append(ContactList())
+
+        if scheduled_progression:
+            self.enable_scheduled_progression()
 
     def infect_particles(self, infected, t, asymptomatic=None, skip_incubation=False, symptoms_level=None):
         num_p0s = len(infected)
@@ -103,36 +115,47 @@ class CoronaVirus(Pathogen):
                                                       size=num_p0s,
                                                       p=[1 - self.death_rate, self.death_rate])
 
+        if self.progression is not None:
+            self.schedule_transitions(infected)
+
     def update_states(self, t):
         # Update everyone's status
-        # Particles that change state from incubation to infection
-        active = self.states == UserStates.incubation
-        infectious = (self.incubation_duration +
-                      self.time_of_infection) <= t
-        self.states[active & infectious] = self.particle_type[active & infectious]
-
-        # Particles that have gone through the decease.
-        active = ((self.states == UserStates.asymptomatic) |
-                  (self.states == UserStates.infected))
-        through = (self.infectious_duration_pso +
-                   self.incubation_duration +
-                   self.time_of_infection) <= t
-        self.states[active & through] = self.outcomes[active & through]
-
-        # Freeze the deceased.
-        deceased = self.states == UserStates.deceased
-        self.population.motion_mask[deceased] = False
+        if self.progression is not None:
+            outcome = self.update_scheduled_states(t, UserStates.incubation,
+                                                   [UserStates.asymptomatic, UserStates.infected])
+            self.freeze_deceased(outcome)
+            active = None
+
+        else:
+            # Particles that change state from incubation to infection
+            active = self.states == UserStates.incubation
+            infectious = (self.incubation_duration +
+                          self.time_of_infection) <= t
+            self.states[active & infectious] = self.particle_type[active & infectious]
+
+            # Particles that have gone through the decease.
+            active = ((self.states == UserStates.asymptomatic) |
+                      (self.states == UserStates.infected))
+            through = (self.infectious_duration_pso +
+                       self.incubation_duration +
+                       self.time_of_infection) <= t
+            self.states[active & through] = self.outcomes[active & through]
+            self.freeze_deceased()
 
         # Update the death rate
         self.death_rate = self.__death_rate
-        if ((self.symptom_levels[active] == SymptomLevels.strong).any() and self.icu_beds is not None and
+        if self.icu_beds is None:
+            return
+
+        if active is None:
+            active = (self.states == UserStates.asymptomatic) | (self.states == UserStates.infected)
+
+        if ((self.symptom_levels[active] == SymptomLevels.strong).any() and
                 sum(self.symptom_levels[active] == SymptomLevels.strong) > self.icu_beds):
             self.death_rate = self.__death_rate_icu
 
-    @cache_manager
-    def distances(self):
-        positions = self.population.position
-        return distance(positions)
+    def infectious_onset_state(self, ids):
+        return self.particle_type[ids, 0]
 
     def r(self):
         # total = sum(self.particles_infected.ravel() > 0)
@@ -168,38 +191,39 @@ class CoronaVirus(Pathogen):
         if not infection_mask.any():
             return self.states, self.symptom_levels, self.particles_infected, 0
 
-        distances = self.distances()
-        particles_in_proximity = distances <= self.radius
-        np.fill_diagonal(particles_in_proximity, False)
-        infection_mask = np.tile(infection_mask, len(self.states))
-        susceptible = np.tile((self.states == UserStates.susceptible).T, (len(self.states), 1))
-        exposed = particles_in_proximity & infection_mask & susceptible
+        susceptible = self.states == UserStates.susceptible
+        pairs = get_region_contacts(self.population, self.radius).pairs
+        exposed = infectious_susceptible_pairs(pairs, infection_mask, susceptible)
         if hasattr(self.population, "isolated"):
-            ids = np.argwhere((exposed.sum(axis=0) > 0) & ~self.population.isolated[:, 0]).ravel()
-        else:
-            ids = np.argwhere(exposed.sum(axis=0) > 0).ravel()
+            exposed = exposed[~self.population.isolated[exposed[:, 1], 0]]
 
-        sufficient_contact = np.zeros((len(self.population), len(self.population)), dtype=bool)
-        contacts = np.argwhere(exposed)
-        for id_ in ids:
-            contact_ids = contacts[contacts[:, 1] == id_, 0]
-            self.contacts[id_].update(contact_ids, t, use_last=True)
-            sc_idx = np.array([c_id for c_id, e in self.contacts[id_].contacts.items()
-                               if e.current >= self.exposure_time], dtype=int)
+        ids = np.unique(exposed[:, 1])
+        if self.columnar:
+            self.contacts.update(exposed[:, 1], exposed[:, 0], t)
+            sufficient_contact = self.contacts.sufficient_contacts(ids, self.exposure_time)[:, ::-1]
 
-            sufficient_contact[sc_idx, id_] = True
-
-        new_infections = exposed & sufficient_contact
-        num_infected_contacts = new_infections.sum(axis=0)
-        new_infections_ids = np.argwhere(num_infected_contacts).ravel()
+        else:
+            sufficient_contact = [np.zeros((0, 2), dtype=int)]
+            for id_ in ids:
+                contact_ids = exposed[exposed[:, 1] == id_, 0]
+                self.contacts[id_].update(contact_ids, t, use_last=True)
+                sc_idx = np.array([c_id for c_id, e in self.contacts[id_].contacts.items()
+                                   if e.current >= self.exposure_time], dtype=int)
+
+                sufficient_contact.append(np.column_stack([sc_idx, np.full(len(sc_idx), id_)]))
+
+            sufficient_contact = np.vstack(sufficient_contact)
+
+        # Only sufficient contacts that are still exposed lead to an infection.
+        n = len(self.population)
+        new_infections = exposed[np.isin(exposed[:, 0] * n + exposed[:, 1],
+                                         sufficient_contact[:, 0] * n + sufficient_contact[:, 1])]
+        new_infections_ids = np.unique(new_infections[:, 1])
         if len(new_infections_ids) == 0:
             return self.states, self.symptom_levels, self.particles_infected, 0
 
         self.infect_particles(new_infections_ids, t)
-        infection_vectors = (new_infections[:, num_infected_contacts != 0] /
-                             num_infected_contacts[num_infected_contacts != 0]).sum(axis=1)
-        self.particles_infected[infection_vectors > 0, 0] = (self.particles_infected[infection_vectors > 0, 0] +
-                                                             infection_vectors[infection_vectors > 0])
+        self.particles_infected[:, 0] += distribute_blame(new_infections, n)
         # self.infect_particles(new_infections_ids, t, True)
         infected = len(new_infections_ids)
         return self.states, self.symptom_levels, self.particles_infected, infected
@@ -214,10 +238,6 @@ class RegionCoronaVirus(CoronaVirus):
         self.update_states(t)
         self.contact_matrix.reset()
 
-        # Freeze the deceased.
-        deceased = self.states == UserStates.deceased
-        self.population.motion_mask[deceased] = False
-
         infection_mask = (self.states == UserStates.infected) | (self.states == UserStates.asymptomatic)
         pandemic_active = (infection_mask | (self.states == UserStates.incubation))
 
@@ -228,42 +248,23 @@ class RegionCoronaVirus(CoronaVirus):
         if self.wave_done or not infection_mask.any():
             return self.states, self.symptom_levels, self.particles_infected, 0
 
-        contacts = contacts_within_radius(self.population, self.radius)
-        infection_mask = np.tile(infection_mask, len(self.states))
-        susceptible = np.tile((self.states == UserStates.susceptible).T, (len(self.states), 1))
-        infectious_susceptible_contact = infection_mask & susceptible
-        for region_contacts in contacts:
-            idx_ = np.ravel_multi_index(region_contacts.T, (len(self.population), len(self.population)))
-
-            # the contacts come in a diagonal format. Therefore, we need to compli
-            exposed1 = np.take(infectious_susceptible_contact | infectious_susceptible_contact.T, idx_)
-            self.contact_matrix.update_contacts(region_contacts[exposed1])
+        susceptible = self.states == UserStates.susceptible
+        region_contacts = get_region_contacts(self.population, self.radius).pairs
+        exposed = infectious_susceptible_pairs(region_contacts, infection_mask, susceptible)
+        self.contact_matrix.update_contacts(exposed)
 
+        # Sufficient contacts are oriented as (vector, target) using the current states, pairs that are no longer
+        # between an infectious and a susceptible agent are dropped.
         sufficient_contact = self.contact_matrix.get_sufficient_contact(self.exposure_time)
-
-        # Remove contacts between infected agents
-        sc_between_infected = pandemic_active[sufficient_contact[:, 0], 0] & pandemic_active[
-            sufficient_contact[:, 1], 0]
-        sufficient_contact = sufficient_contact[~sc_between_infected]
+        sufficient_contact = infectious_susceptible_pairs(sufficient_contact, infection_mask, susceptible)
 
         num_infected_contacts = sufficient_contact.shape[0]
         if num_infected_contacts == 0:
             return self.states, self.symptom_levels, self.particles_infected, 0
 
-        contacts, counts = np.unique(sufficient_contact.ravel(), return_counts=True)
-        vectors = infection_mask[contacts, 0]
-        new_infected_ids = contacts[~vectors]
+        new_infected_ids = np.unique(sufficient_contact[:, 1])
         self.infect_particles(new_infected_ids, t, asymptomatic=True)
-        vector_ids = contacts[vectors]
-
-        # Since a particle can be in proximity of two or more infected agents, we equally distribute blame among
-        # the infected agents.
-        vector_matrix = ((sufficient_contact[:, 0] == vector_ids[:, None]) |
-                         (sufficient_contact[:, 1] == vector_ids[:, None]))
-        new_infected_matrix = ((sufficient_contact[:, 0] == new_infected_ids[:, None]) |
-                               (sufficient_contact[:, 1] == new_infected_ids[:, None]))
-        infected_count = (vector_matrix.dot(new_infected_matrix.T) / new_infected_matrix.sum(axis=1)).sum(axis=1)
-        self.particles_infected[contacts[vectors], 0] += infected_count
+        self.particles_infected[:, 0] += distribute_blame(sufficient_contact, len(self.population))
 
         infected = new_infected_ids.shape[0]
 
@@ -289,10 +290,6 @@ class RegionCoronaVirusExposureWindow(RegionCoronaVirus):
         self.update_states(t)
         self.contact_matrix.reset()
 
-        # Freeze the deceased.
-        deceased = self.states == UserStates.deceased
-        self.population.motion_mask[deceased] = False
-
         infection_mask = (self.states == UserStates.infected) | (self.states == UserStates.asymptomatic)
         pandemic_active = (infection_mask | (self.states == UserStates.incubation))
 
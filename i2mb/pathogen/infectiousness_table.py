@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class InfectiousnessTable:
+    """Infectiousness curves tabulated by time since infection. `curves` is either a single curve shared by all agents
+    or one curve per agent, sampled every `resolution` ticks. Lookups use the last sample before the requested time,
+    times past the end of the table return the last sample.
+
+    :param curves: Array of shape (T,) for a shared curve, or (n, T) for one curve per agent.
+    :param resolution: Number of ticks between samples.
+    """
+
+    def __init__(self, curves, resolution=1):
+        curves = np.asarray(curves)
+        self.shared = curves.ndim == 1
+        self.curves = np.atleast_2d(curves)
+        self.resolution = resolution
+
+    @classmethod
+    def from_function(cls, function, parameters, duration, resolution=1, dtype=np.float32):
+        """Tabulates `function(time_since_infection, *parameters)` for every agent from 0 to `duration` ticks.
+        `parameters` are arrays with one entry per agent."""
+        n = len(parameters[0])
+        samples = np.arange(0, duration + resolution, resolution)
+        curves = np.zeros((n, len(samples)), dtype=dtype)
+        for ix, tau in enumerate(samples):
+            curves[:, ix] = function(np.full(n, tau), *parameters)
+
+        return cls(curves, resolution)
+
+    def __len__(self):
+        return self.curves.shape[1]
+
+    def sample_index(self, time_since_infection):
+        return np.clip(np.asarray(time_since_infection) // self.resolution, 0, len(self) - 1).astype(int)
+
+    def lookup(self, ids, time_since_infection):
+        rows = 0 if self.shared else ids
+        return self.curves[rows, self.sample_index(time_since_infection)]
+
+
+class LazyInfectiousnessTable(InfectiousnessTable):
+    """Per agent infectiousness curves tabulated on the first lookup of each agent. Only agents whose infectiousness is
+    evaluated, i.e., infected agents, get a curve, so memory grows with the number of infections instead of the
+    population size. Each curve takes `(duration / resolution + 1) * itemsize` bytes, rows are kept in a buffer that
+    doubles when full.
+
+    :param function: Infectiousness function, called as `function(time_since_infection, *parameters(ids))`.
+    :param parameters: Callable returning the arrays of function parameters of the given agent ids.
+    :param n: Population size.
+    :param duration: Last time since infection tabulated.
+    :param resolution: Number of ticks between samples.
+    """
+
+    def __init__(self, function, parameters, n, duration, resolution=1, dtype=np.float32):
+        samples = np.arange(0, duration + resolution, resolution)
+        super().__init__(np.zeros((0, len(samples)), dtype=dtype), resolution)
+        self.function = function
+        self.parameters = parameters
+        self.samples = samples
+        self.rows = np.full(n, -1, dtype=int)
+        self.num_rows = 0
+
+    def tabulate(self, ids):
+        """Tabulates the curves of `ids` that are not in the table yet."""
+        ids = np.unique(ids[self.rows[ids] == -1])
+        if len(ids) == 0:
+            return
+
+        if self.num_rows + len(ids) > len(self.curves):
+            new_size = max(self.num_rows + len(ids), 2 * len(self.curves))
+            self.curves = np.vstack([self.curves[:self.num_rows],
+                                     np.zeros((new_size - self.num_rows, len(self)), dtype=self.curves.dtype)])
+
+        rows = np.arange(self.num_rows, self.num_rows + len(ids))
+        parameters = self.parameters(ids)
+        for ix, tau in enumerate(self.samples):
+            self.curves[rows, ix] = self.function(np.full(len(ids), tau), *parameters)
+
+        self.rows[ids] = rows
+        self.num_rows += len(ids)
+
+    def lookup(self, ids, time_since_infection):
+        ids = np.asarray(ids)
+        self.tabulate(ids)
+        return self.curves[self.rows[ids], self.sample_index(time_since_infection)]
@@ -0,0 +1,230 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from i2mb.engine.agents import AgentList
+
+from i2mb.interactions.contact_matrix import ContactMatrix
+from i2mb.utils.spatial_utils import get_region_contacts
+from .base_pathogen import Pathogen, SymptomLevels, UserStatesLegacy as UserStates, distribute_blame, \
+    infectious_susceptible_pairs
+
+
+class MultiStrainVirus(Pathogen):
+    """
+    Pathogen with `num_strains` competing strains. The state of every agent with respect to every strain is stored in
+    `(N, S)` arrays, and the contacts of each tick are computed once and shared by all strains. As in
+    :class:`RegionCoronaVirus`, a susceptible agent in uninterrupted contact with an infected agent for the
+    `exposure_time` of the strain is exposed, and becomes infected with probability given by its `susceptibility` to
+    that strain. The infection is drawn once per exposure, when the contact reaches `exposure_time`, a contact that did
+    not infect only exposes the agent again once it has been interrupted. Agents carry at most one active infection at
+    a time.
+
+    Recovering from strain `i` multiplies the susceptibility of the agent to strain `j` by `1 - cross_immunity[i, j]`,
+    i.e., `cross_immunity[i, j]` is the protection against each exposure to strain `j`.
+    Reinfections with the same strain are not modelled, so the diagonal of `cross_immunity` is ignored.
+
+    The population `state` holds the most advanced state across strains: deceased, infected, incubation, immune,
+    susceptible. The single strain properties bound to the population, e.g., `time_of_infection`, refer to the last
+    infection of the agent.
+
+    :param radius:
+    :param exposure_time: Exposure time of all strains, or one per strain.
+    :param population:
+    :param num_strains: Number of strains.
+    :param cross_immunity: `(S, S)` matrix with the protection against strain `j` conferred by strain `i`. Defaults to
+     no cross immunity.
+    :param duration_distribution: Distribution of the illness duration of all strains, or one per strain.
+    :param incubation_distribution: Distribution of the incubation duration of all strains, or one per strain.
+    :param death_rate: Death rate of all strains, or one per strain.
+    """
+
+    def __init__(self, radius, exposure_time, population: 'AgentList', num_strains=2, cross_immunity=None,
+                 duration_distribution=None, incubation_distribution=None, death_rate=0.01):
+        super().__init__(population)
+        self.radius = radius ** 2
+        self.num_strains = num_strains
+        self.exposure_time = self.__per_strain(exposure_time)
+        self.duration_distribution = self.__per_strain(duration_distribution)
+        self.incubation_distribution = self.__per_strain(incubation_distribution)
+        self.death_rate = self.__per_strain(death_rate)
+
+        if cross_immunity is None:
+            cross_immunity = np.zeros((num_strains, num_strains))
+
+        self.cross_immunity = np.asarray(cross_immunity, dtype=float)
+        if self.cross_immunity.shape != (num_strains, num_strains):
+            raise ValueError(f"cross_immunity must have shape {(num_strains, num_strains)}, got "
+                             f"{self.cross_immunity.shape}.")
+
+        shape = (len(population), num_strains)
+        self.strain_states = np.full(shape, UserStates.susceptible, dtype=int)
+        self.susceptibility = np.ones(shape)
+        self.strain_time_of_infection = np.full(shape, -1, dtype=int)
+        self.strain_incubation_duration = np.zeros(shape)
+        self.strain_illness_duration = np.zeros(shape)
+        self.strain_outcomes = np.zeros(shape, dtype=int)
+        self.strain_particles_infected = np.zeros(shape)
+        self.strain = np.full((len(population), 1), -1, dtype=int)
+        population.add_property("strain", self.strain)
+
+        self.contact_matrices = [ContactMatrix(len(population)) for _ in range(num_strains)]
+        self.strain_waves = [[] for _ in range(num_strains)]
+
+    def __per_strain(self, value):
+        if isinstance(value, (list, tuple, np.ndarray)):
+            if len(value) != self.num_strains:
+                raise ValueError(f"Expected one value per strain ({self.num_strains}), got {len(value)}.")
+
+            return list(value)
+
+        return [value] * self.num_strains
+
+    def introduce_pathogen(self, num_p0s, t, asymptomatic=None, symptoms_level=None, skip_incubation=True, strain=0):
+        susceptible = np.nonzero(self.get_susceptible()[:, strain])[0]
+        num_p0s = min(num_p0s, len(susceptible))
+        ids = np.random.choice(susceptible, num_p0s, replace=False)
+        self.start_wave(t)
+        if not self.strain_waves[strain] or self.strain_waves[strain][-1][1] is not None:
+            self.strain_waves[strain].append([t, None])
+
+        self.infect_particles(ids, t, asymptomatic, skip_incubation=skip_incubation, symptoms_level=symptoms_level,
+                              strain=strain)
+
+    def infect_particles(self, infected, t, asymptomatic=None, skip_incubation=False, symptoms_level=None, strain=0):
+        num_p0s = len(infected)
+        if num_p0s == 0:
+            return
+
+        severity = np.random.choice(SymptomLevels.symptom_levels(), num_p0s, p=[.8, .138, .062])
+        if symptoms_level is not None:
+            severity[:] = symptoms_level
+
+        state = UserStates.incubation
+        incubation_period = self.incubation_distribution[strain](size=num_p0s)
+        if skip_incubation:
+            state = UserStates.infected
+            incubation_period = 0
+
+        death_rate = self.death_rate[strain]
+        self.strain_states[infected, strain] = state
+        self.strain_time_of_infection[infected, strain] = t
+        self.strain_incubation_duration[infected, strain] = incubation_period
+        self.strain_illness_duration[infected, strain] = self.duration_distribution[strain](size=num_p0s)
+        self.strain_outcomes[infected, strain] = np.random.choice([UserStates.immune, UserStates.deceased],
+                                                                  size=num_p0s, p=[1 - death_rate, death_rate])
+
+        # Single strain view of the last infection
+        self.strain[infected, 0] = strain
+        self.symptom_levels[infected, 0] = severity
+        self.time_of_infection[infected, 0] = t
+        self.incubation_duration[infected, 0] = self.strain_incubation_duration[infected, strain]
+        self.infectious_duration_pso[infected, 0] = self.strain_illness_duration[infected, strain]
+        self.illness_duration[infected, 0] = self.strain_illness_duration[infected, strain]
+        self.outcomes[infected, 0] = self.strain_outcomes[infected, strain]
+        self.location_contracted[infected, 0] = [type(loc).__name__.lower() for loc in
+                                                 self.population.location[infected]]
+        self.update_population_state()
+
+    def get_susceptible(self):
+        """`(N, S)` mask of agents that can be infected by each strain."""
+        states = self.strain_states
+        busy = ((states == UserStates.incubation) | (states == UserStates.infected) |
+                (states == UserStates.deceased)).any(axis=1)
+        return (states == UserStates.susceptible) & (self.susceptibility > 0) & ~busy[:, None]
+
+    def update_states(self, t):
+        states = self.strain_states
+        incubation = states == UserStates.incubation
+        infectious = (self.strain_incubation_duration + self.strain_time_of_infection) <= t
+        states[incubation & infectious] = UserStates.infected
+
+        infected = states == UserStates.infected
+        through = (self.strain_illness_duration + self.strain_incubation_duration +
+                   self.strain_time_of_infection) <= t
+        recovered = infected & through
+        states[recovered] = self.strain_outcomes[recovered]
+
+        # Cross immunity conferred by the strains agents recovered from
+        for strain in range(self.num_strains):
+            ids = np.nonzero(recovered[:, strain] & (states[:, strain] == UserStates.immune))[0]
+            if len(ids):
+                self.susceptibility[ids] *= 1 - self.cross_immunity[strain]
+
+        self.update_population_state()
+
+        # Freeze the deceased.
+        if hasattr(self.population, "motion_mask"):
+            self.population.motion_mask[self.states == UserStates.deceased] = False
+
+    def update_population_state(self):
+        self.states[:, 0] = UserStates.susceptible
+        for state in [UserStates.immune, UserStates.incubation, UserStates.infected, UserStates.deceased]:
+            self.states[(self.strain_states == state).any(axis=1), 0] = state
+
+    def update_waves(self, t):
+        active = ((self.strain_states == UserStates.infected) | (self.strain_states == UserStates.incubation)).any(
+            axis=0)
+        for strain, waves in enumerate(self.strain_waves):
+            if not active[strain] and waves and waves[-1][1] is None:
+                waves[-1][1] = t
+
+        self.update_wave_done(active.any(), t)
+
+    def step(self, t):
+        self.update_states(t)
+        self.update_waves(t)
+        for contact_matrix in self.contact_matrices:
+            contact_matrix.reset()
+
+        infection_mask = self.strain_states == UserStates.infected
+        if self.wave_done or not infection_mask.any():
+            return
+
+        # One contact pass shared by all strains, labelled for every strain at once.
+        susceptible = self.get_susceptible()
+        pairs = get_region_contacts(self.population, self.radius).pairs
+        forward = infection_mask[pairs[:, 0]] & susceptible[pairs[:, 1]]
+        backward = infection_mask[pairs[:, 1]] & susceptible[pairs[:, 0]]
+
+        candidates = []
+        for strain in np.nonzero((forward | backward).any(axis=0))[0]:
+            exposed = np.vstack([pairs[forward[:, strain]], pairs[backward[:, strain]][:, ::-1]])
+            contact_matrix = self.contact_matrices[strain]
+            contact_matrix.update_contacts(exposed)
+
+            sufficient_contact = contact_matrix.get_new_sufficient_contact(self.exposure_time[strain])
+            vector_target = infectious_susceptible_pairs(sufficient_contact, infection_mask[:, strain],
+                                                         susceptible[:, strain])
+            if len(vector_target):
+                candidates.append(np.column_stack([vector_target, np.full(len(vector_target), strain)]))
+
+        if not candidates:
+            return
+
+        self.infect_candidates(np.vstack(candidates), t)
+
+    def infect_candidates(self, candidates, t):
+        """Infects the targets of `(vector, target, strain)` rows of new exposures. A target exposed to several strains
+        in the same tick is infected by one of them, chosen at random, with probability equal to its susceptibility to
+        that strain."""
+        targets = np.unique(candidates[:, [1, 2]], axis=0)
+        targets = targets[np.random.random(len(targets)) < self.susceptibility[targets[:, 0], targets[:, 1]]]
+        targets = targets[np.random.permutation(len(targets))]
+        _, first = np.unique(targets[:, 0], return_index=True)
+        targets = targets[first]
+
+        n = len(self.population)
+        for strain in np.unique(targets[:, 1]):
+            ids = targets[targets[:, 1] == strain, 0]
+            self.infect_particles(ids, t, strain=strain)
+
+            vector_target = candidates[(candidates[:, 2] == strain) & np.isin(candidates[:, 1], ids), :2]
+            blame = distribute_blame(vector_target, n)
+            self.strain_particles_infected[:, strain] += blame
+            self.particles_infected[:, 0] += blame
+
+    def get_strain_totals(self):
+        """Number of agents in each state per strain, as a `(len(UserStates), S)` array."""
+        return np.stack([(self.strain_states == s).sum(axis=0) for s in UserStates])
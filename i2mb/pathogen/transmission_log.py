@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class TransmissionLog:
+    """Append-only log of transmission events stored as integer rows of (t, source, target, region). Rows are kept in
+    a preallocated buffer that doubles when full. When `spill_file` is given, the buffer holds at most `chunk_size`
+    rows and full chunks are appended to that file, events are then read back through a memory map so the log does
+    not have to fit in memory.
+
+    :param capacity: Initial number of rows of the in memory buffer.
+    :param spill_file: Optional file where full chunks are written. The file is truncated on creation.
+    :param chunk_size: Number of rows buffered before spilling to `spill_file`.
+    """
+    columns = ["t", "source", "target", "region"]
+    dtype = np.int64
+
+    def __init__(self, capacity=1024, spill_file=None, chunk_size=2 ** 16):
+        self.spill_file = spill_file
+        if spill_file is not None:
+            capacity = chunk_size
+            open(spill_file, "wb").close()
+
+        self.buffer = np.zeros((max(capacity, 1), len(self.columns)), dtype=self.dtype)
+        self.num_rows = 0
+        self.num_spilled = 0
+
+    def __len__(self):
+        return self.num_spilled + self.num_rows
+
+    def append(self, t, source, target, region=-1):
+        n = len(source)
+        if n == 0:
+            return
+
+        if self.num_rows + n > len(self.buffer):
+            if self.spill_file is not None:
+                self.flush()
+
+            if n > len(self.buffer) - self.num_rows:
+                self.buffer = np.vstack([self.buffer[:self.num_rows],
+                                         np.zeros((max(self.num_rows + n, 2 * len(self.buffer)) - self.num_rows,
+                                                   len(self.columns)), dtype=self.dtype)])
+
+        rows = self.buffer[self.num_rows:self.num_rows + n]
+        rows[:, 0] = t
+        rows[:, 1] = source
+        rows[:, 2] = target
+        rows[:, 3] = region
+        self.num_rows += n
+
+    def flush(self):
+        """Writes buffered rows to the spill file. Does nothing when the log is kept in memory."""
+        if self.spill_file is None or self.num_rows == 0:
+            return
+
+        with open(self.spill_file, "ab") as f:
+            self.buffer[:self.num_rows].tofile(f)
+
+        self.num_spilled += self.num_rows
+        self.num_rows = 0
+
+    @property
+    def events(self):
+        """All events as a (n, 4) array. Spilled logs are flushed and returned as a read only memory map."""
+        if self.spill_file is None:
+            return self.buffer[:self.num_rows]
+
+        self.flush()
+        if self.num_spilled == 0:
+            return self.buffer[:0]
+
+        return np.memmap(self.spill_file, dtype=self.dtype, mode="r", shape=(self.num_spilled, len(self.columns)))
+
+    def column(self, name):
+        return self.events[:, self.columns.index(name)]
+
+    def secondary_cases(self, n=None):
+        """Number of agents infected by each agent. `n` is the population size, defaults to the largest id logged."""
+        return np.bincount(self.column("source"), minlength=0 if n is None else n)
+
+    def secondary_case_distribution(self, cases, n=None):
+        """Number of agents in `cases` that infected exactly k agents, indexed by k. `cases` are the ids of infected
+        agents, including those that did not infect anyone."""
+        cases = np.asarray(cases)
+        if n is None:
+            n = max(cases.max(initial=-1), self.column("source").max(initial=-1)) + 1
+
+        return np.bincount(self.secondary_cases(n)[cases])
+
+    def serial_intervals(self, onset):
+        """Difference between the `onset` times of each target and its source. Pass the time of symptom onset for
+        serial intervals or the time of infection for generation intervals."""
+        onset = np.asarray(onset).ravel()
+        events = self.events
+        return onset[events[:, 2]] - onset[events[:, 1]]
+
+    def r(self):
+        """Mean number of secondary cases of agents that infected at least one agent."""
+        secondary_cases = self.secondary_cases()
+        infectors = secondary_cases > 0
+        if not infectors.any():
+            return 0
+
+        return secondary_cases.sum() / infectors.sum()
+
+    def r_current(self, active):
+        """Mean number of secondary cases of `active` agents that infected at least one agent. `active` is a boolean
+        mask of the population."""
+        active = np.asarray(active).ravel()
+        secondary_cases = self.secondary_cases(len(active))[active]
+        infectors = secondary_cases > 0
+        if not infectors.any():
+            return 0.
+
+        return secondary_cases.sum() / infectors.sum()
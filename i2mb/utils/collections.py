@@ -1,3 +1,8 @@
+import heapq
+
+import numpy as np
+
+
 class ConstrainedDict(dict):
     def __init__(self, constraint, msg=None):
         super().__init__()
@@ -11,3 +16,64 @@ class ConstrainedDict(dict):
             raise KeyError(self.msg.format(key))
 
         super().__setitem__(key, value)
+
+
+class EventQueue:
+    """Calendar of agent events keyed by the tick at which they are due. Events due at the same tick share a bucket,
+    and a binary heap over the bucket ticks yields the next due bucket, so popping costs are proportional to the number
+    of due events.
+
+    Each event is an agent id with an optional integer payload, e.g., an activity id.
+    """
+    def __init__(self):
+        self.__buckets = {}
+        self.__heap = []
+        self.__len = 0
+
+    def __len__(self):
+        return self.__len
+
+    def next_due(self):
+        """Returns the tick of the earliest event, or None if the queue is empty."""
+        if not self.__heap:
+            return None
+
+        return self.__heap[0]
+
+    def schedule(self, due, ids, payload=0):
+        ids = np.asarray(ids, dtype=int).ravel()
+        if len(ids) == 0:
+            return
+
+        due = np.broadcast_to(np.asarray(due, dtype=int), ids.shape)
+        payload = np.broadcast_to(np.asarray(payload, dtype=int), ids.shape)
+        order = np.argsort(due, kind="stable")
+        ticks, starts = np.unique(due[order], return_index=True)
+        for tick, ids_, payload_ in zip(ticks.tolist(), np.split(ids[order], starts[1:]),
+                                        np.split(payload[order], starts[1:])):
+            bucket = self.__buckets.get(tick)
+            if bucket is None:
+                bucket = self.__buckets[tick] = []
+                heapq.heappush(self.__heap, tick)
+
+            bucket.append((ids_, payload_))
+
+        self.__len += len(ids)
+
+    def pop_due(self, t):
+        """Removes and returns all events due at or before tick `t` as three arrays: due tick, agent id and payload."""
+        due, ids, payload = [], [], []
+        while self.__heap and self.__heap[0] <= t:
+            tick = heapq.heappop(self.__heap)
+            for ids_, payload_ in self.__buckets.pop(tick):
+                due.append(np.full(len(ids_), tick, dtype=int))
+                ids.append(ids_)
+                payload.append(payload_)
+
+        if not ids:
+            empty = np.array([], dtype=int)
+            return empty, empty, empty
+
+        ids = np.concatenate(ids)
+        self.__len -= len(ids)
+        return np.concatenate(due), ids, np.concatenate(payload)
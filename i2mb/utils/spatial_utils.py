@@ -2,7 +2,6 @@ from itertools import combinations
 
 import numpy as np
 import scipy.spatial as ss
-from scipy.special import comb
 
 from i2mb.utils import cache_manager
 
@@ -23,41 +22,183 @@ def distance(a, b=None, magnitude=True):
     return x_diff, y_diff
 
 
-def contacts_within_radius(population, radius, return_distance=False):
-    contacts = []
-    n = len(population)
-    if not cache_manager.is_cached(f"var_distances"):
-        distances = np.full(comb(n, 2, exact=True), np.inf)
-        for r in population.regions:
-            if len(r.population) <= 1:
-                continue
-
-            pos = r.population.position
-            d = distance(pos, pos)
-            idx = r.population.index
-            idx = np.array(list(combinations(idx, 2)))
-            np.put(distances, ravel_index_triu_nd(idx, n), d)
-            if return_distance:
-                contacts.append((near_neighbours(d, radius, n, idx=idx), d[d < radius]))
-            else:
-                contacts.append(near_neighbours(d, radius, n, idx=idx))
-
-            cache_manager.cache_variable(**{f"{r}_idx": idx, f"{r}_d": d})
-
-        cache_manager.cache_variable(**{f"var_distances": distances})
-    else:
-        for r in population.regions:
-            if len(r.population) <= 1:
-                continue
-
-            d = cache_manager.get_from_cache(f"{r}_d")
-            idx = cache_manager.get_from_cache(f"{r}_idx")
-            if return_distance:
-                contacts.append((near_neighbours(d, radius, n, idx=idx), d[d < radius]))
-            else:
-                contacts.append(near_neighbours(d, radius, n, idx=idx))
-
-    return contacts
+# Neighbour search engine used by contacts_within_radius. Regions with fewer than `min_size` agents always use the
+# brute force search, since building a grid or a tree does not pay off for a handful of agents.
+NEIGHBOUR_SEARCH_METHODS = ("brute", "grid", "kdtree")
+neighbour_search = {"method": "grid", "min_size": 32}
+
+
+def set_neighbour_search(method="grid", min_size=32):
+    """Selects the neighbour search engine used by :func:`contacts_within_radius`.
+
+    :param method: One of `"brute"`, `"grid"` (uniform cell list), or `"kdtree"`.
+    :param min_size: Regions with fewer agents than `min_size` fall back to the brute force search.
+    """
+    if method not in NEIGHBOUR_SEARCH_METHODS:
+        raise ValueError(f"Unknown neighbour search method '{method}'. Valid methods are "
+                         f"{', '.join(NEIGHBOUR_SEARCH_METHODS)}.")
+
+    neighbour_search["method"] = method
+    neighbour_search["min_size"] = min_size
+
+
+def brute_force_pairs(pos, radius):
+    """Returns the local index pairs `(i, j)`, `i < j`, of points whose squared distance is smaller than `radius`,
+    and their squared distances."""
+    d = distance(pos, pos)
+    candidates = d < radius
+    idx = np.array(list(combinations(range(len(pos)), 2)), dtype=int).reshape(-1, 2)
+    return idx[candidates], d[candidates]
+
+
+def grid_pairs(pos, radius):
+    """Uniform grid (cell list) version of :func:`brute_force_pairs`. Points are binned into square cells with side
+    equal to the contact distance, so only points in the same or adjacent cells need to be compared."""
+    n = len(pos)
+    if radius <= 0 or n < 2:
+        return np.zeros((0, 2), dtype=int), np.zeros(0)
+
+    cell_size = np.sqrt(radius)
+    cells = np.floor((pos - pos.min(axis=0)) / cell_size).astype(np.int64)
+    rows = cells[:, 1].max() + 3
+    keys = cells[:, 0] * rows + cells[:, 1] + 1
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    sorted_ix = np.arange(n)
+
+    # Same cell, only points after the current one in sorted order to count every pair once.
+    cell_end = np.searchsorted(keys, keys, side="right")
+    starts = [sorted_ix + 1]
+    ends = [cell_end]
+
+    # Half of the neighbouring cells, the other half is covered symmetrically.
+    for dx, dy in [(0, 1), (1, -1), (1, 0), (1, 1)]:
+        neighbour_keys = keys + dx * rows + dy
+        starts.append(np.searchsorted(keys, neighbour_keys, side="left"))
+        ends.append(np.searchsorted(keys, neighbour_keys, side="right"))
+
+    starts = np.concatenate(starts)
+    counts = np.clip(np.concatenate(ends) - starts, 0, None)
+    total = counts.sum()
+    if total == 0:
+        return np.zeros((0, 2), dtype=int), np.zeros(0)
+
+    src = np.repeat(np.tile(sorted_ix, 5), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    dst = np.repeat(starts, counts) + offsets
+
+    idx = np.sort(np.column_stack([order[src], order[dst]]), axis=1)
+    d = ((pos[idx[:, 0]] - pos[idx[:, 1]]) ** 2).sum(axis=1)
+    candidates = d < radius
+    idx, d = idx[candidates], d[candidates]
+
+    # Keep the ordering of the brute force search
+    sort_ix = np.lexsort((idx[:, 1], idx[:, 0]))
+    return idx[sort_ix], d[sort_ix]
+
+
+def kdtree_pairs(pos, radius):
+    """KD-tree version of :func:`brute_force_pairs`."""
+    if radius <= 0 or len(pos) < 2:
+        return np.zeros((0, 2), dtype=int), np.zeros(0)
+
+    idx = ss.cKDTree(pos).query_pairs(np.sqrt(radius), output_type="ndarray").reshape(-1, 2)
+    idx = np.sort(idx, axis=1)
+    d = ((pos[idx[:, 0]] - pos[idx[:, 1]]) ** 2).sum(axis=1)
+    candidates = d < radius
+    idx, d = idx[candidates], d[candidates]
+    sort_ix = np.lexsort((idx[:, 1], idx[:, 0]))
+    return idx[sort_ix], d[sort_ix]
+
+
+neighbour_search_engines = {"brute": brute_force_pairs, "grid": grid_pairs, "kdtree": kdtree_pairs}
+
+
+class RegionContacts:
+    """Sparse contact pairs found during one time step. Pairs of all regions are stored back to back in COO format,
+    `region_ptr` holds the CSR style offsets of each region's pairs. Memory scales with the number of contacts.
+
+    :param regions: Regions with two or more agents, in the order in which their pairs are stored.
+    :param pairs: List with the `(k, 2)` agent id pairs of each region.
+    :param distances: List with the `(k,)` squared distances of each region.
+    """
+    def __init__(self, regions, pairs, distances):
+        self.regions = list(regions)
+        self.region_ids = np.array([r.id for r in self.regions], dtype=int)
+        self.region_ptr = np.zeros(len(self.regions) + 1, dtype=int)
+        np.cumsum([len(p) for p in pairs], out=self.region_ptr[1:])
+        self.pairs = np.vstack([np.zeros((0, 2), dtype=int), *pairs]).astype(int)
+        self.distances = np.concatenate([np.zeros(0), *distances])
+        self.__region_pos = {id_: pos for pos, id_ in enumerate(self.region_ids)}
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __iter__(self):
+        for pos in range(len(self.regions)):
+            yield self.pairs[self.region_ptr[pos]:self.region_ptr[pos + 1]]
+
+    def region(self, region):
+        """Returns the pairs and distances of `region`, which can be a region or a region id."""
+        pos = self.__region_pos.get(getattr(region, "id", region))
+        if pos is None:
+            return np.zeros((0, 2), dtype=int), np.zeros(0)
+
+        slice_ = slice(self.region_ptr[pos], self.region_ptr[pos + 1])
+        return self.pairs[slice_], self.distances[slice_]
+
+    @property
+    def pair_region_ids(self):
+        """Region id of every pair."""
+        return np.repeat(self.region_ids, np.diff(self.region_ptr))
+
+
+def get_region_contacts(population, radius, method=None):
+    """Returns the :class:`RegionContacts` of agents whose squared distance is smaller than `radius`. Results are cached
+    for the current time step, so all models sharing the same radius share a single neighbour search.
+
+    :param method: Neighbour search engine, defaults to the engine selected with :func:`set_neighbour_search`.
+    """
+    if method is None:
+        method = neighbour_search["method"]
+
+    cache_key = f"region_contacts_{method}_{radius}"
+    if cache_manager.is_cached(cache_key):
+        return cache_manager.get_from_cache(cache_key)
+
+    search = neighbour_search_engines[method]
+    regions, pairs, distances = [], [], []
+    for r in population.regions:
+        if len(r.population) <= 1:
+            continue
+
+        pos = np.asarray(r.population.position)
+        if len(r.population) < neighbour_search["min_size"]:
+            idx, d = brute_force_pairs(pos, radius)
+        else:
+            idx, d = search(pos, radius)
+
+        regions.append(r)
+        pairs.append(r.population.index[idx].reshape(-1, 2))
+        distances.append(d)
+
+    region_contacts = RegionContacts(regions, pairs, distances)
+    cache_manager.cache_variable(**{cache_key: region_contacts})
+    return region_contacts
+
+
+def contacts_within_radius(population, radius, return_distance=False, method=None):
+    """Returns a list with one entry per region holding two or more agents. Each entry contains the pairs of agent
+    ids whose squared distance is smaller than `radius`. If `return_distance` is True, entries are tuples of the pairs
+    and their squared distances.
+
+    :param method: Neighbour search engine, defaults to the engine selected with :func:`set_neighbour_search`.
+    """
+    region_contacts = get_region_contacts(population, radius, method)
+    if return_distance:
+        return [region_contacts.region(r) for r in region_contacts.regions]
+
+    return list(region_contacts)
 
 
 def near_neighbours(d, radius, n, idx=None):
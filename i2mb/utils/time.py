@@ -65,6 +65,10 @@ class SimulationTime:
     def month_start(self, v):
         return v // self.ticks_month * self.time_scalar
 
+    def is_weekend(self, v):
+        """True if 'v' falls on the last two days of the week."""
+        return self.days(v) % 7 >= 5
+
     def to_current(self, delta, t):
         """Returns the time 't' truncated at the beginning of the last day and adds 'delta'."""
         return self.days(t) * self.time_scalar + delta
@@ -31,6 +31,9 @@ class Area(metaclass=ExitInit):
     __num_instances = 0
     __id_map = {}
 
+    # Incremented every time an area is moved, rotated or re-parented, used to invalidate cached absolute origins.
+    geometry_version = 0
+
     def __init__(self, dims=None, height=None, width=None, origin=None, rotation=0, scale=1, subareas=None):
         if subareas is None:
             subareas = []
@@ -70,6 +73,15 @@ class Area(metaclass=ExitInit):
         Area.__num_instances += 1
         Area.__id_map[self.id] = self
 
+    @property
+    def parent(self):
+        return self.__parent
+
+    @parent.setter
+    def parent(self, parent):
+        self.__parent = parent
+        Area.geometry_version += 1
+
     @property
     def opposite(self):
         return self.__opposite
@@ -131,6 +143,7 @@ class Area(metaclass=ExitInit):
 
         self.__origin[:] = new_origin.ravel()
         self.__opposite[:] = self.__origin + self.dims
+        Area.geometry_version += 1
 
     def __rotate(self, rotation):
         self.rotation = (rotation + self.rotation) % 360.
@@ -168,6 +181,7 @@ class Area(metaclass=ExitInit):
         return
 
     def rotate(self, rotation):
+        Area.geometry_version += 1
         self.__rotate(rotation)
         self.update_external_origin()
         for sub_area in self.__sub_areas:
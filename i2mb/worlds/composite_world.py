@@ -21,10 +21,66 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..engine.agents import AgentList
 
+from ._area import Area
 from .world_base import World
 from ..utils import cache_manager
 
 
+class RegionTree:
+    """Tree structure of a region index. Nodes are positions in the region index, and the parent of each node is given
+    by the second column of the index. Children are stored as CSR lists, and each subtree is a contiguous interval of
+    the pre-order traversal, so children and descendants are found without scanning the whole index.
+
+    :param parents: Parent position of each region index entry. Entry 0 is the root.
+    """
+    def __init__(self, parents):
+        self.parents = np.asarray(parents, dtype=int)
+        n = len(self.parents)
+        nodes = np.arange(n)
+
+        # Children lists, the root is not its own child
+        is_child = nodes != self.parents
+        self.children = nodes[is_child][np.argsort(self.parents[is_child], kind="stable")]
+        self.children_ptr = np.zeros(n + 1, dtype=int)
+        self.children_ptr[1:] = np.cumsum(np.bincount(self.parents[is_child], minlength=n))
+
+        # Pre-order traversal, subtree of node i is order[subtree_start[i]:subtree_end[i]]
+        self.order = np.zeros(n, dtype=int)
+        self.subtree_start = np.zeros(n, dtype=int)
+        self.subtree_end = np.zeros(n, dtype=int)
+        position = 0
+        stack = [(0, False)]
+        while stack:
+            node, finished = stack.pop()
+            if finished:
+                self.subtree_end[node] = position
+                continue
+
+            self.subtree_start[node] = position
+            self.order[position] = node
+            position += 1
+            stack.append((node, True))
+            stack.extend((child, False) for child in self.get_children(node)[::-1])
+
+    def get_children(self, node):
+        return self.children[self.children_ptr[node]:self.children_ptr[node + 1]]
+
+    def get_children_of(self, nodes):
+        """Returns the children of all `nodes`, and the parent of each returned child."""
+        nodes = np.asarray(nodes, dtype=int)
+        start = self.children_ptr[nodes]
+        counts = self.children_ptr[nodes + 1] - start
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.children[np.repeat(start, counts) + offsets], np.repeat(nodes, counts)
+
+    def get_subtree(self, node):
+        """Returns the node followed by all its descendants."""
+        return self.order[self.subtree_start[node]:self.subtree_end[node]]
+
+    def get_descendants(self, node):
+        return self.order[self.subtree_start[node] + 1:self.subtree_end[node]]
+
+
 class CompositeWorld(World):
     def __init__(self, dims=None, population: 'AgentList' = None, regions=None, origin=None, map_file=None,
                  containment=False, waiting_room=False, rotation=0, scale=1):
@@ -45,6 +101,11 @@ class CompositeWorld(World):
         self.__region_index_slice = slice(None)
         self.__region_index_pos = 1
         self.__blocked_locations = np.array([False, False], dtype=bool)
+        self.__region_tree = RegionTree([0, 0])
+
+        # Cached absolute origins, valid while Area.geometry_version does not change
+        self.__absolute_origin = (-1, None)
+        self.__absolute_origin_table = (-1, None, None)
 
         # Activity Information
         self.local_activities = []
@@ -94,6 +155,11 @@ class CompositeWorld(World):
     def region_index(self):
         return self.__region_index[self.__region_index_slice]
 
+    @property
+    def region_tree(self):
+        """:class:`RegionTree` over the positions of the unified region index."""
+        return self.__region_tree
+
     @property
     def blocked(self):
         return self.__blocked_locations[self.__region_index_pos]
@@ -188,6 +254,10 @@ class CompositeWorld(World):
                                      (r.parent is not None and r.parent.index or 0)
                                      or 0 for r in self.__region_index[:, 2]]
 
+        self.__region_tree = RegionTree(self.__region_index[:, 1].astype(int))
+        for region in self.list_all_regions():
+            region.__region_tree = self.__region_tree
+
     def unify_index(self):
         for region in self.list_all_regions():
             if region == self:
@@ -200,10 +270,35 @@ class CompositeWorld(World):
                 np.searchsorted(self.__region_index[:, 0], [-1] + [r.id for r in region.list_all_regions()]))
 
     def get_absolute_origin(self):
-        if self.parent is None:
-            return self.origin
+        version, absolute_origin = self.__absolute_origin
+        if version == Area.geometry_version:
+            return absolute_origin
 
-        return self.origin + self.parent.get_absolute_origin()
+        if self.parent is None:
+            absolute_origin = self.origin.copy()
+        else:
+            absolute_origin = self.origin + self.parent.get_absolute_origin()
+
+        absolute_origin.setflags(write=False)
+        self.__absolute_origin = (Area.geometry_version, absolute_origin)
+        return absolute_origin
+
+    def get_absolute_origin_table(self):
+        """Returns the sorted region ids of :attr:`region_index` and the absolute origin of each region."""
+        version, region_index, table = self.__absolute_origin_table
+        if version == Area.geometry_version and region_index is self.__region_index:
+            return table
+
+        regions = self.region_index[:, 2]
+        region_ids = self.region_index[:, 0].astype(int)
+        origins = np.zeros((len(regions), 2))
+        for ix, r in enumerate(regions[1:], 1):
+            if isinstance(r, CompositeWorld):
+                origins[ix] = r.get_absolute_origin()
+
+        table = region_ids, origins
+        self.__absolute_origin_table = (Area.geometry_version, self.__region_index, table)
+        return table
 
     def draw_world(self, ax=None, origin=(0, 0), **kwargs):
         bbox = kwargs.get("bbox", False)
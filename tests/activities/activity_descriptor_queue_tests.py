@@ -3,7 +3,8 @@ from unittest import TestCase
 import numpy as np
 
 from i2mb.activities import ActivityDescriptorProperties
-from i2mb.activities.base_activity_descriptor import ActivityDescriptorQueue, ActivityDescriptorSpecs
+from i2mb.activities.base_activity_descriptor import ActivityDescriptorQueue, ActivityDescriptorSpecs, \
+    RingActivityDescriptorQueue
 from i2mb.engine.agents import AgentList
 
 
@@ -25,12 +26,14 @@ class TestActivityDescriptorQueue(TestCase):
 
 
 class ActivityDescriptorQueueTest(TestCase):
+    queue_class = ActivityDescriptorQueue
+
     def setUp(self) -> None:
         self.population_size = 10
         self.queue_size = 6
 
     def init_queue_and_test_pattern(self):
-        activity_queue = ActivityDescriptorQueue(self.population_size, depth=self.queue_size)
+        activity_queue = self.queue_class(self.population_size, depth=self.queue_size)
         for i in range(1, self.queue_size + 2):
             activity_queue.push([i] * len(ActivityDescriptorProperties))
 
@@ -273,3 +276,36 @@ class ActivityDescriptorQueueTest(TestCase):
         act_specs = activity_queue[3:6].pop()
         self.assertEqual(act_specs.shape, (3, len(ActivityDescriptorProperties)))
         self.assertTrue((activity_specs2.specifications == act_specs).all())
+
+
+class RingActivityDescriptorQueueTest(ActivityDescriptorQueueTest):
+    queue_class = RingActivityDescriptorQueue
+
+    def test_matches_shifting_queue(self):
+        rng = np.random.default_rng(0)
+        ring_queue = RingActivityDescriptorQueue(self.population_size, depth=self.queue_size)
+        shift_queue = ActivityDescriptorQueue(self.population_size, depth=self.queue_size)
+        for i in range(200):
+            ids = np.arange(*np.sort(rng.choice(self.population_size + 1, 2, replace=False)))
+            value = rng.integers(0, 100, (len(ids), len(ActivityDescriptorProperties)))
+            ids = slice(ids[0], ids[-1] + 1)
+            operation = rng.integers(0, 4)
+            if operation == 0:
+                ring_queue[ids].push(value)
+                shift_queue[ids].push(value)
+            elif operation == 1:
+                ring_queue[ids].append(value)
+                shift_queue[ids].append(value)
+            elif operation == 2:
+                if (shift_queue.num_items[ids] == 0).any():
+                    continue
+
+                self.assertTrue((ring_queue[ids].pop() == shift_queue[ids].pop()).all())
+            else:
+                ring_queue[ids.start].reset()
+                shift_queue[ids.start].reset()
+
+            self.assertTrue((ring_queue.queue == shift_queue.queue).all())
+            self.assertTrue((ring_queue.num_items == shift_queue.num_items).all())
+            self.assertTrue((ring_queue.start == shift_queue.start).all())
+            self.assertTrue((ring_queue.location_ix == shift_queue.location_ix).all())
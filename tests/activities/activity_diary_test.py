@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from i2mb.activities.activity_diary import ActivityDiary
+
+
+class Kitchen:
+    pass
+
+
+class Bedroom:
+    pass
+
+
+class TestActivityDiary(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.region_index = np.array([[-1, 0, -1], [3, 0, Kitchen()], [5, 0, Bedroom()], [7, 0, Kitchen()]],
+                                     dtype=object)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write_rows(self, diary):
+        codes = diary.location_codes(self.region_index)
+        diary.append(np.array([0, 1]), 1, np.array([10, 11]), np.array([5, 6]), codes[[1, 2]])
+        diary.append(np.array([2, 3, 4]), 2, np.array([12, 13, 14]), np.array([7, 8, 9]), codes[[3, 3, 0]])
+
+    def test_csv_chunks(self):
+        file_name = os.path.join(self.directory.name, "diary.csv")
+        diary = ActivityDiary(file_name, ["ActivityNone", "Work", "Sleep"], chunk_size=2)
+        self.write_rows(diary)
+
+        # Rows are written in chunks, the last one is only written when closing.
+        with open(file_name) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+        diary.close()
+        with open(file_name) as f:
+            lines = f.read().splitlines()
+
+        self.assertListEqual(lines, ["id,activity,start,duration,location",
+                                     "0,Work,10,5,Kitchen",
+                                     "1,Work,11,6,Bedroom",
+                                     "2,Sleep,12,7,Kitchen",
+                                     "3,Sleep,13,8,Kitchen",
+                                     "4,Sleep,14,9,int"])
+
+    def test_npz(self):
+        file_name = os.path.join(self.directory.name, "diary.npz")
+        diary = ActivityDiary(file_name, ["ActivityNone", "Work", "Sleep"], chunk_size=4, file_format="npz")
+        self.write_rows(diary)
+        diary.close()
+
+        diary_data = np.load(file_name)
+        self.assertListEqual(diary_data["id"].tolist(), [0, 1, 2, 3, 4])
+        self.assertListEqual(diary_data["activity_names"][diary_data["activity"]].tolist(),
+                             ["Work", "Work", "Sleep", "Sleep", "Sleep"])
+        self.assertListEqual(diary_data["location_names"][diary_data["location"]].tolist(),
+                             ["Kitchen", "Bedroom", "Kitchen", "Kitchen", "int"])
+        self.assertListEqual(diary_data["duration"].tolist(), [5, 6, 7, 8, 9])
@@ -149,6 +149,23 @@ class TestActivityManager(I2MBTestCase):
         self.assertTrue((accumulated_status == test_start).all(),
                         msg=f"Accumulated times:\n{accumulated_status}\nTestPattern:\n{test_start}")
 
+    def test_update_time_multiple_in_progress(self):
+        activity_manager, test_pattern, population = self.init_population_list_and_test()
+        activity_manager.multiple_in_progress = True
+
+        ids = np.array([3, 5, 6])
+        activity_manager.stage_activity(ActivityDescriptorSpecs(0, 0, 50, 0, 60, 0).specifications, ids)
+        activity_manager.start_activities(ids)
+
+        # Activity 2 is set in progress outside the manager for agent 5
+        activity_manager.activity_list.set_in_progress([5], [2], 1)
+        global_time.set_sim_time(0)
+        activity_manager.post_step(0)
+
+        activity_list = activity_manager.activity_list
+        self.assertListEqual(activity_list.get_elapsed(ids, np.zeros(3, dtype=int)).tolist(), [1, 1, 1])
+        self.assertListEqual(activity_list.get_elapsed(ids, np.full(3, 2)).tolist(), [0, 1, 0])
+
     def test_stop_activities_with_duration(self):
         activity_manager, test_pattern, population = self.init_population_list_and_test()
 
@@ -178,6 +195,87 @@ class TestActivityManager(I2MBTestCase):
         self.assertTrue((accumulated_status == test_start).all(),
                         msg=f"Accumulated times:\n{accumulated_status}\nTestPattern:\n{test_start}")
 
+    def test_blocked_for_count_down(self):
+        activity_manager, test_pattern, population = self.init_population_list_and_test()
+        unblocked = []
+        activity_manager.activity_list.activities[2].register_unblock_callbacks(
+            lambda act_id, t, selector: unblocked.append(population.index[selector].tolist()))
+
+        ids = np.array([3, 5, 6])
+        activity_specs = ActivityDescriptorSpecs(2, 0, 5, 0, 3, 0)
+        activity_manager.stage_activity(activity_specs.specifications, ids)
+        activity_manager.start_activities(ids)
+
+        blocked_for = []
+        for i in range(10):
+            activity_manager.pre_step(i)
+            activity_manager.step(i)
+            activity_manager.post_step(i)
+            blocked_for.append(activity_manager.activity_list.get_blocked_for(ids, 2).tolist())
+
+        self.assertListEqual(blocked_for, [[3] * 3] * 6 + [[2] * 3, [1] * 3] + [[0] * 3] * 2)
+        self.assertListEqual(unblocked, [ids.tolist()])
+        self.assertEqual(len(activity_manager.blocked_ids), 0)
+
+    def test_blocked_for_set_outside_stop(self):
+        activity_manager, test_pattern, population = self.init_population_list_and_test()
+        unblocked = []
+        activity_manager.activity_list.activities[1].register_unblock_callbacks(
+            lambda act_id, t, selector: unblocked.append(population.index[selector].tolist()))
+
+        activity_list = activity_manager.activity_list
+        activity_list.set_blocked_for([1], [1], 3)
+        activity_list.set_blocked_for(np.array([2, 3]).reshape(-1, 1), [1, 2], 2)
+        activity_list.scatter(np.array([4]), ActivityProperties.blocked_for, np.array([2]), 1)
+
+        # Direct writes to the activity stack need to be registered
+        activity_list.activity_values[5, ActivityProperties.blocked_for, 2] = 2
+        activity_list.register_blocked_for([5], [2])
+
+        ids = np.array([1, 2, 2, 3, 3, 4, 5])
+        act_ids = np.array([1, 1, 2, 1, 2, 2, 2])
+        blocked_for = []
+        for i in range(4):
+            global_time.set_sim_time(i)
+            activity_manager.pre_step(i)
+            blocked_for.append(activity_list.get_blocked_for(ids, act_ids).tolist())
+
+        self.assertListEqual(blocked_for, [[2, 1, 1, 1, 1, 0, 1], [1, 0, 0, 0, 0, 0, 0], [0] * 7, [0] * 7])
+        self.assertListEqual(unblocked, [[2, 3], [1]])
+        self.assertEqual(len(activity_manager.blocked_ids), 0)
+
+    def test_collect_new_controller_descriptors(self):
+        activity_manager, test_pattern, population = self.init_population_list_and_test()
+
+        class FixedController:
+            def __init__(self, act_idx, proposed_ids):
+                self.descriptor = ActivityDescriptorSpecs(act_idx, 0, 5, 0, 0, 0).specifications
+                self.proposed_ids = proposed_ids
+                self.queried = []
+
+            def get_new_activity(self, ids):
+                self.queried.append(ids.tolist())
+                new_ids = np.isin(ids, self.proposed_ids)
+                return np.tile(self.descriptor, (new_ids.sum(), 1)), new_ids
+
+            def registration_callback(self, ids):
+                pass
+
+        first, second = FixedController(1, [0, 1, 2]), FixedController(2, [2, 3, 4])
+        activity_manager.register_activity_controller(first, z_order=1)
+        activity_manager.register_activity_controller(second, z_order=2)
+
+        # Activity 1 is blocked for agent 1, so agent 1 is offered to the second controller
+        activity_manager.activity_list.set_blocked_for([1], [1], 10)
+        staged = activity_manager.collect_new_controller_descriptors(np.ones(self.population_size, dtype=bool))
+
+        self.assertListEqual(first.queried, [list(range(self.population_size))])
+        self.assertListEqual(second.queried, [[1] + list(range(3, self.population_size))])
+        self.assertListEqual(population.index[staged].tolist(), [0, 2, 3, 4])
+        self.assertListEqual(activity_manager.current_descriptors[[0, 1, 2, 3, 4],
+                                                                  ActivityDescriptorProperties.act_idx].tolist(),
+                             [1, -1, 1, 2, 2])
+
     def test_stop(self):
         activity_manager, test_pattern, population = self.init_population_list_and_test()
 
@@ -365,6 +463,35 @@ class TestActivityManager(I2MBTestCase):
         # Test the activity is started
         self.assertTrue(activity_list.current_activity[2] == 2)
 
+    def test_wait_blocking_across_controllers(self):
+        world = WorldBuilder(Apartment, population=self.population, world_kwargs=dict(num_residents=6),
+                             sim_duration=global_time.make_time(day=4), no_gui=True)
+
+        activity_manager, _ = self.init_manager_and_test(world.relocator)
+        location = world.universe.regions[0].regions[3]
+
+        class FixedController:
+            def __init__(self, act_idx, proposed_ids):
+                self.descriptor = ActivityDescriptorSpecs(act_idx, location_ix=location.index, duration=5,
+                                                          blocks_location=TypesOfLocationBlocking.wait).specifications
+                self.proposed_ids = proposed_ids
+
+            def get_new_activity(self, ids):
+                new_ids = np.isin(ids, self.proposed_ids)
+                return np.tile(self.descriptor, (new_ids.sum(), 1)), new_ids
+
+            def registration_callback(self, ids):
+                pass
+
+        # Both controllers find the location empty, only the first request of the batch is granted.
+        activity_manager.register_activity_controller(FixedController(1, [2]), z_order=1)
+        activity_manager.register_activity_controller(FixedController(2, [4]), z_order=2)
+        staged = activity_manager.collect_new_controller_descriptors(np.ones(len(self.population), dtype=bool))
+
+        self.assertListEqual(self.population.index[staged].tolist(), [2])
+        self.assertEqual(activity_manager.current_descriptors[2, ActivityDescriptorProperties.act_idx], 1)
+        self.assertTrue((activity_manager.current_descriptors[4] == -1).all())
+
     @skip("Not implemented yet")
     def test_block_location_with_rejecting_blocking(self):
         world = WorldBuilder(Apartment, population=self.population, world_kwargs=dict(num_residents=6),
@@ -430,17 +557,17 @@ class TestActivityManager(I2MBTestCase):
             activity_manager.step(i)
             activity_manager.post_step(i)
 
-        # Trigger file closing
-        del activity_manager
+        # Flush and close the diary
+        activity_manager.final(i)
 
         with open(test_history_file) as thf:
-            for lix, line in enumerate(thf.readlines()):
-                if lix == 0:
-                    self.assertListEqual(ActivityManager.file_headers, line.split(","))
-                    continue
+            lines = thf.read().splitlines()
 
-                test_line = [f"{lix - 1}", "Work", "0", f"{durations[lix -1]}", type(location).__name__]
-                self.assertListEqual(test_line, line.split(","))
+        self.assertEqual(len(lines), len(durations) + 1)
+        self.assertListEqual(ActivityManager.file_headers, lines[0].split(","))
+        for lix, line in enumerate(lines[1:]):
+            test_line = [f"{lix}", "Work", "0", f"{durations[lix]}", type(location).__name__]
+            self.assertListEqual(test_line, line.split(","))
 
     def test_activity_descriptors_match_location(self):
         world = WorldBuilder(Apartment, population=self.population, world_kwargs=dict(num_residents=6),
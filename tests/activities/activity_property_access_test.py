@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+import numpy as np
+
+import i2mb.activities.atomic_activities as aa
+from i2mb.activities import ActivityProperties
+from i2mb.activities.base_activity import ActivityList
+from i2mb.engine.agents import AgentList
+
+
+def zip_gather(activity_values, ids, prop_ix, activity_ids):
+    """Reference implementation building the index vector with Python-level iteration."""
+    index_vector = np.array(tuple(zip(ids, [prop_ix] * len(ids), activity_ids)))
+    index_vector = np.ravel_multi_index(index_vector.T, activity_values.shape)
+    return activity_values.ravel()[index_vector]
+
+
+def create_activity_list(population_size, activity_classes):
+    population = AgentList(population_size)
+    activity_list = ActivityList(population)
+    for activity in activity_classes:
+        activity_list.add(activity(population))
+
+    rng = np.random.default_rng(0)
+    activity_list.activity_values[:] = rng.integers(0, 100, activity_list.shape)
+    activity_ids = rng.integers(0, len(activity_list.activities), population_size)
+    return activity_list, population.index, activity_ids
+
+
+class TestActivityPropertyAccess(TestCase):
+    activity_classes = [aa.Work, aa.Grooming, aa.Shower, aa.KitchenWork, aa.Rest, aa.Sleep, aa.Eat]
+
+    def setUp(self) -> None:
+        self.activity_list, self.ids, self.activity_ids = create_activity_list(10_000, self.activity_classes)
+
+    def test_gather_matches_per_agent_reference(self):
+        for prop_ix in ActivityProperties:
+            expected = zip_gather(self.activity_list.activity_values, self.ids, prop_ix, self.activity_ids)
+            self.assertTrue((self.activity_list.gather(self.ids, prop_ix, self.activity_ids) == expected).all())
+
+        expected = zip_gather(self.activity_list.activity_values, self.ids, ActivityProperties.blocked_for,
+                              self.activity_ids)
+        self.assertTrue((self.activity_list.get_blocked_for(self.ids, self.activity_ids) == expected).all())
+
+    def test_scatter_matches_per_agent_reference(self):
+        expected = self.activity_list.activity_values.copy()
+        values = np.arange(len(self.ids))
+        for id_, act_id, value in zip(self.ids, self.activity_ids, values):
+            expected[id_, ActivityProperties.blocked_for, act_id] = value
+
+        self.activity_list.set_blocked_for(self.ids, self.activity_ids, values)
+        self.assertTrue((self.activity_list.activity_values == expected).all())
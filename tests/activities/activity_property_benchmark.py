@@ -0,0 +1,34 @@
+"""Compares the time of gathering and scattering one activity property per agent with the per-agent reference
+implementation. Run with `python -m tests.activities.activity_property_benchmark`."""
+from time import perf_counter
+
+from i2mb.activities import ActivityProperties
+from tests.activities.activity_property_access_test import TestActivityPropertyAccess, create_activity_list, \
+    zip_gather
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+
+    return min(timings)
+
+
+def benchmark(population_size):
+    activity_list, ids, activity_ids = create_activity_list(population_size,
+                                                            TestActivityPropertyAccess.activity_classes)
+    prop_ix = ActivityProperties.blocked_for
+    zip_time = best_of(lambda: zip_gather(activity_list.activity_values, ids, prop_ix, activity_ids))
+    gather_time = best_of(lambda: activity_list.get_blocked_for(ids, activity_ids))
+    scatter_time = best_of(lambda: activity_list.set_blocked_for(ids, activity_ids, 0))
+    print(f"{population_size} agents: tuple-zip gather {zip_time * 1e3:.2f} ms, "
+          f"gather {gather_time * 1e3:.2f} ms, scatter {scatter_time * 1e3:.2f} ms, "
+          f"speed-up {zip_time / gather_time:.0f}x")
+
+
+if __name__ == "__main__":
+    for size in [10_000, 100_000]:
+        benchmark(size)
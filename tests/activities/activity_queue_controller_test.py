@@ -564,3 +564,34 @@ class TestActivityQueueController(TestCase):
         response = enforce_unique_resource_utilization(requested_locations)
         self.assertListEqual(response.tolist(), expected)
 
+
+def apply_along_axis_unique_resource_utilization(requested_location):
+    """Reference implementation granting the first request per location using one mask column per location."""
+
+    def process_mask_column(column):
+        response = np.zeros_like(requested_location)
+        indexes = np.arange(len(response), dtype=int)
+        response[indexes[column][0]] = True
+        return response
+
+    location_mask = requested_location.reshape(-1, 1) == np.unique(requested_location)
+    return np.apply_along_axis(process_mask_column, 0, location_mask).sum(axis=1).astype(bool)
+
+
+class TestEnforceUniqueResourceUtilization(TestCase):
+    def test_first_request_per_location_is_granted(self):
+        requested_locations = np.array([4, 20, 4, 20, 20])
+        self.assertListEqual(enforce_unique_resource_utilization(requested_locations).tolist(),
+                             [True, True, False, False, False])
+
+    def test_empty_request(self):
+        self.assertEqual(len(enforce_unique_resource_utilization(np.array([], dtype=int))), 0)
+
+    def test_matches_reference_implementation(self):
+        rng = np.random.default_rng(0)
+        for _ in range(500):
+            size = rng.integers(1, 50)
+            requested_locations = rng.integers(0, rng.integers(1, 30), size)
+            expected = apply_along_axis_unique_resource_utilization(requested_locations)
+            response = enforce_unique_resource_utilization(requested_locations)
+            self.assertListEqual(response.tolist(), expected.tolist(), msg=f"{requested_locations}")
@@ -126,3 +126,30 @@ class TestActivityList(TestCase):
 
 
 
+
+    def test_advance(self):
+        self.setup_activity_list()
+        ids = np.array([1, 2, 5, 7])
+        act_ids = np.array([3, 0, 3, 2])
+        self.activity_list.activity_values[ids[:3], ActivityProperties.in_progress, act_ids[:3]] = 1
+        self.activity_list.advance(ids, act_ids)
+        self.activity_list.advance(ids, act_ids)
+
+        expected = np.zeros(self.activity_list.shape[::2], dtype=int)
+        expected[ids[:3], act_ids[:3]] = 2
+        for prop in [ActivityProperties.elapsed, ActivityProperties.accumulated]:
+            self.assertTrue((self.activity_list.activity_values[:, prop, :] == expected).all(),
+                            msg=f"{self.activity_list.activity_values[:, prop, :]}")
+
+    def test_advance_all_in_progress(self):
+        self.setup_activity_list()
+        ids = np.array([1, 1, 5])
+        act_ids = np.array([3, 2, 3])
+        self.activity_list.activity_values[ids, ActivityProperties.in_progress, act_ids] = 1
+        self.activity_list.advance()
+
+        expected = np.zeros(self.activity_list.shape[::2], dtype=int)
+        expected[ids, act_ids] = 1
+        for prop in [ActivityProperties.elapsed, ActivityProperties.accumulated]:
+            self.assertTrue((self.activity_list.activity_values[:, prop, :] == expected).all(),
+                            msg=f"{self.activity_list.activity_values[:, prop, :]}")
@@ -0,0 +1,134 @@
+from unittest import TestCase
+
+import numpy as np
+
+from i2mb.activities.schedule_routines import CompiledSchedule, Schedule, ScheduleRoutines
+from i2mb.engine.agents import AgentList
+from i2mb.utils import global_time
+
+
+class TestCompiledSchedule(TestCase):
+    def setUp(self) -> None:
+        self.population_size = 4
+        self.population = AgentList(self.population_size)
+        self.home = np.array([f"home_{i}" for i in range(self.population_size)], dtype=object)
+        self.work = np.array([f"work_{i}" for i in range(self.population_size)], dtype=object)
+        self.population.add_property("work", self.work)
+        self.day = global_time.ticks_day
+        self.hour = global_time.ticks_hour
+
+    def make_schedules(self, entries):
+        schedules = np.empty(self.population_size, dtype=object)
+        schedules[:] = [Schedule(entries) for _ in range(self.population_size)]
+        return schedules
+
+    def test_daily_entries(self):
+        schedules = self.make_schedules([
+            dict(start_time=lambda: 8 * self.hour, end_time=lambda: 16 * self.hour, event_location="work",
+                 repeats="daily"),
+            dict(start_time=lambda: 18 * self.hour, duration=lambda: 2 * self.hour, repeats="on_weekends")])
+        compiled = CompiledSchedule(schedules, self.population, self.home)
+
+        ids, columns = compiled.next_events(self.population.index, 0)
+        self.assertListEqual(ids.tolist(), list(range(self.population_size)))
+        self.assertTrue((compiled.start_time[ids, columns] == 8 * self.hour).all())
+        self.assertTrue((compiled.end_time[ids, columns] == 16 * self.hour).all())
+        self.assertListEqual(compiled.event_location[ids, columns].tolist(), self.work.tolist())
+        self.assertListEqual(compiled.return_location[ids, columns].tolist(), self.home.tolist())
+
+        # 7 work days and 2 weekend evenings
+        self.assertEqual(compiled.expires.shape[1], 9)
+
+        # Saturday after work
+        t = 5 * self.day + 17 * self.hour
+        ids, columns = compiled.next_events(self.population.index, t)
+        self.assertTrue((compiled.start_time[ids, columns] == 5 * self.day + 18 * self.hour).all())
+        self.assertTrue(compiled.trigger[ids, columns, 0].all())
+
+        # The week rolls over lazily, and only for the agents looked up
+        t = global_time.ticks_week + 12 * self.hour
+        ids, columns = compiled.next_events([0, 1], t)
+        self.assertListEqual(compiled.week.tolist(), [1, 1, 0, 0])
+        self.assertTrue((compiled.start_time[ids, columns] == global_time.ticks_week + 8 * self.hour).all())
+
+    def test_entries_crossing_midnight(self):
+        schedules = self.make_schedules([dict(start_time=lambda: 22 * self.hour, end_time=lambda: 6 * self.hour,
+                                              repeats="daily")])
+        compiled = CompiledSchedule(schedules, self.population, self.home)
+
+        # Sunday night spans into the next week
+        t = 6 * self.day + 23 * self.hour
+        ids, columns = compiled.next_events(self.population.index, t)
+        self.assertTrue((compiled.end_time[ids, columns] == global_time.ticks_week + 6 * self.hour).all())
+        self.assertTrue((compiled.duration[ids, columns] == 8 * self.hour).all())
+
+        # Once all occurrences ended, the next week is sampled
+        ids, columns = compiled.next_events(self.population.index, global_time.ticks_week + 7 * self.hour)
+        self.assertTrue((compiled.week == 1).all())
+        self.assertTrue((compiled.start_time[ids, columns] == global_time.ticks_week + 22 * self.hour).all())
+
+    def test_unique_entries(self):
+        schedules = self.make_schedules([dict(start_time=lambda: 2 * self.day, duration=lambda: self.hour,
+                                              repeats=False)])
+        compiled = CompiledSchedule(schedules, self.population, self.home)
+        ids, columns = compiled.next_events(self.population.index, 0)
+        self.assertTrue((compiled.start_time[ids, columns] == 2 * self.day).all())
+
+        ids, columns = compiled.next_events(self.population.index, 3 * self.day)
+        self.assertTrue((columns == -1).all())
+
+    def compiled_starts(self, compiled, weeks):
+        """Start times compiled for each agent over the given weeks."""
+        starts = [[] for _ in range(self.population_size)]
+        ids = self.population.index
+        for week in weeks:
+            compiled.compile(ids, np.full(len(ids), week))
+            for id_ in ids:
+                starts[id_].extend(compiled.start_time[id_, compiled.expires[id_] != -1].tolist())
+
+        return starts
+
+    def test_random_unique_start(self):
+        rng = np.random.default_rng(0)
+        schedules = self.make_schedules([dict(start_time=lambda: int(rng.integers(0, 20 * self.day)),
+                                              duration=lambda: self.hour, repeats=False)])
+        compiled = CompiledSchedule(schedules, self.population, self.home)
+        for starts in self.compiled_starts(compiled, range(4)):
+            self.assertEqual(len(starts), 1)
+
+    def test_random_monthly_start(self):
+        rng = np.random.default_rng(0)
+        schedules = self.make_schedules([dict(start_time=lambda: int(rng.integers(0, 20 * self.day)),
+                                              duration=lambda: self.hour, repeats="monthly")])
+        compiled = CompiledSchedule(schedules, self.population, self.home)
+        month = global_time.ticks_month
+        weeks = range(0, 3 * month // global_time.ticks_week + 1)
+        for starts in self.compiled_starts(compiled, weeks):
+            self.assertListEqual(sorted(np.array(starts) // month), [0, 1, 2])
+
+
+class Relocator:
+    def __init__(self):
+        self.moves = []
+
+    def move_agents_many(self, ids, locations):
+        self.moves.append((ids, locations))
+
+
+class TestCompiledScheduleRoutines(TestCase):
+    def test_no_event_in_compiled_weeks(self):
+        population = AgentList(2)
+        population.add_property("home", np.array(["home_0", "home_1"], dtype=object))
+        population.add_property("work", np.array(["work_0", "work_1"], dtype=object))
+        population.add_property("position", np.zeros((2, 2)))
+        schedule = Schedule([dict(start_time=lambda: 20 * global_time.ticks_day, duration=lambda: 1,
+                                  event_location="work", repeats="monthly")])
+
+        # There is no occurrence in the first two weeks
+        routines = ScheduleRoutines(population, Relocator(), schedule, compiled=True)
+        self.assertTrue((routines.start_time == -1).all())
+
+        week = global_time.ticks_week
+        routines.step(week)
+        self.assertTrue((routines.start_time == 20 * global_time.ticks_day).all())
+        self.assertEqual(len(routines.waiting_for_week), 0)
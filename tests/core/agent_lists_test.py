@@ -41,3 +41,77 @@ class TestAgentList(I2MBTestCase):
         view.property2[[2, 3], 1] = 3
         self.assertEqualAny(self.population.property2[5:7], [0, 3], msg=f"{self.population.property1}")
         self.assertEqualAll(self.population.property2, self.property2, msg=f"{self.population.property2}")
+
+    def test_view_reads_after_write(self):
+        view = self.population[[2, 3, 5, 6]]
+        position = view.property2
+        self.assertEqualAll(position[:, 1], 0)
+
+        position[[1, 2], 1] = 4
+        self.assertEqualAll(position[:, 1], [0, 4, 4, 0])
+        self.assertEqualAll(self.property2[[3, 5], 1], 4)
+
+    def test_memoized_views(self):
+        from i2mb.utils import cache_manager
+        AgentList.memoize_views = True
+        try:
+            cache_manager.invalidate()
+            view = self.population[[2, 3]]
+            self.assertEqualAll(view.property1[:, 0], 0)
+
+            view.property1[:] = 1
+            self.assertEqualAll(view.property1[:, 0], 1)
+            self.assertEqualAll(view.property1.sum(), 2)
+
+        finally:
+            AgentList.memoize_views = False
+            cache_manager.invalidate()
+
+
+class TestColumnarAgentList(TestAgentList):
+    def setUp(self) -> None:
+        self.population = AgentList(10, columnar=True)
+        self.property1 = np.zeros((10, 1))
+        self.property2 = np.zeros((10, 2))
+
+        self.population.add_property("property1", self.property1)
+        self.population.add_property("property2", self.property2)
+
+    def test_agent_proxy(self):
+        agent = self.population[3]
+        self.assertEqual(agent.id, 3)
+
+        self.property2[3, 1] = 5
+        self.assertEqualAll(agent.property2, [0, 5])
+
+        agent.property1[0] = 2
+        self.assertEqual(self.property1[3, 0], 2)
+
+        self.assertEqual([a.id for a in self.population], list(range(10)))
+        self.assertEqual([a.id for a in self.population[[2, 3]][:]], [2, 3])
+        with self.assertRaises(AttributeError):
+            agent.unknown_property
+
+
+class TestAgentListViewMembership(I2MBTestCase):
+    def setUp(self) -> None:
+        self.population = AgentList(20)
+
+    def test_find_indexes(self):
+        for index in [np.array([1, 4, 6, 9, 15]), np.array([9, 1, 15, 6, 4])]:
+            view = self.population[index]
+            expected = (index.reshape(-1, 1) == np.array([4, 15, 16])).any(axis=1)
+            self.assertEqualAll(view.find_indexes(np.array([4, 15, 16])), expected)
+
+        self.assertEqualAll(self.population.find_indexes(np.array([0, 19])), np.isin(np.arange(20), [0, 19]))
+
+    def test_add_remove(self):
+        view = self.population[np.array([1, 4, 6])]
+        view.add(np.array([5, 4, 12, 0]))
+        self.assertEqual(view.index.tolist(), [0, 1, 4, 5, 6, 12])
+        self.assertEqual(len(view), 6)
+
+        view.remove(np.array([4, 13, 0]))
+        self.assertEqual(view.index.tolist(), [1, 5, 6, 12])
+        self.assertEqual(len(view), 4)
+        self.assertEqualAll(view.find_indexes(np.array([12])), [False, False, False, True])
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from i2mb import Model
+from i2mb.engine.core import Engine
+from i2mb.engine.experiment import Experiment
+from i2mb.engine.profiler import EngineProfiler
+
+
+class Allocator(Model):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def step(self, t):
+        self.chunks.append(bytearray(2 ** 16))
+
+    def __repr__(self):
+        return "Allocator"
+
+
+class Idle(Model):
+    def __repr__(self):
+        return "Idle"
+
+
+class SimEngine:
+    def __init__(self, engine):
+        self.engine = engine
+
+
+class StepExperiment(Experiment):
+    def process_stop_criteria(self, frame):
+        return frame >= 5
+
+    def collect_time_series_data(self, frame):
+        pass
+
+    def collect_aggregated_data(self):
+        pass
+
+    def process_trigger_events(self, frame):
+        pass
+
+    def display_start_msg(self):
+        pass
+
+
+class TestEngineProfiler(TestCase):
+    def run_engine(self, engine, steps):
+        for frame, _ in enumerate(engine.step()):
+            if frame == steps - 1:
+                break
+
+    def test_phases(self):
+        models = [Allocator(), Idle()]
+        with EngineProfiler(memory=True) as profiler:
+            self.run_engine(Engine(models, profiler=profiler), 10)
+
+        summary = profiler.summary()
+        self.assertEqual(len(summary), len(models) * len(EngineProfiler.phases))
+        self.assertSetEqual({(r["model"], r["phase"]) for r in summary},
+                            {(f"{m}", p) for m in models for p in EngineProfiler.phases})
+        self.assertTrue(all(r["calls"] == 10 for r in summary))
+        self.assertListEqual([r["total"] for r in summary], sorted([r["total"] for r in summary], reverse=True))
+
+        allocator_step = [r for r in summary if r["model"] == "Allocator" and r["phase"] == "step"][0]
+        self.assertGreaterEqual(allocator_step["memory_max"], 2 ** 16)
+        self.assertLessEqual(allocator_step["p50"], allocator_step["p99"])
+
+    def test_debug_timer(self):
+        models = [Allocator(), Idle()]
+        engine = Engine(models, debug=True)
+        self.run_engine(engine, 4)
+        self.assertListEqual(list(engine.debug_timer), ["Allocator", "Idle"])
+        self.assertTrue(all(len(v) == 4 for v in engine.debug_timer.values()))
+
+        self.assertDictEqual(Engine(models).debug_timer, {})
+
+    def test_export(self):
+        profiler = EngineProfiler()
+        self.run_engine(Engine([Idle()], profiler=profiler), 3)
+        with tempfile.TemporaryDirectory() as directory:
+            profiler.to_csv(os.path.join(directory, "profile.csv"))
+            profiler.to_json(os.path.join(directory, "profile.json"))
+
+            df = pd.read_csv(os.path.join(directory, "profile.csv"))
+            with open(os.path.join(directory, "profile.json")) as f:
+                rows = json.load(f)
+
+        self.assertListEqual(list(df.columns), ["model", "phase", "calls", "total", "mean", "p50", "p90", "p99", "max",
+                                                "wall_total"])
+        self.assertEqual(len(df), len(EngineProfiler.phases))
+        self.assertListEqual([r["phase"] for r in rows], df["phase"].tolist())
+
+    def test_experiment_profile(self):
+        experiment = StepExperiment(0, dict(population_size=1))
+        engine = Engine([Idle()])
+        experiment.sim_engine = SimEngine(engine)
+        with experiment.profile() as profiler:
+            experiment.run_sim_engine()
+
+        self.assertIsNone(engine.profiler)
+        self.assertEqual(len(profiler.get_timings("Idle", "step")), 6)
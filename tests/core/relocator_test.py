@@ -0,0 +1,63 @@
+import numpy as np
+
+from i2mb.engine.agents import AgentList
+from i2mb.engine.relocator import Relocator
+from i2mb.worlds import CompositeWorld
+from tests.i2mb_test_case import I2MBTestCase
+
+
+class TestRelocator(I2MBTestCase):
+    def setUp(self) -> None:
+        self.population = AgentList(12)
+        self.rooms = [CompositeWorld(dims=(10, 10)) for _ in range(4)]
+        self.world = CompositeWorld(regions=self.rooms, population=self.population)
+        self.relocator = Relocator(self.population, self.world)
+        self.relocator.move_agents(self.population.index, self.rooms[0])
+
+        self.exits = []
+        self.enters = []
+        self.relocator.register_on_region_exit_action(lambda idx, r: self.exits.append((r, sorted(idx))))
+        self.relocator.register_on_region_enter_action(lambda idx, r, _: self.enters.append((r, sorted(idx))))
+
+    def test_move_agents_many(self):
+        ids = np.array([0, 1, 2, 5, 7, 9])
+        destinations = np.array([self.rooms[i] for i in [1, 2, 1, 3, 0, 3]], dtype=object)
+        moved = self.relocator.move_agents_many(ids, destinations)
+
+        self.assertEqual(sorted(moved), [0, 1, 2, 5, 9])
+        self.assertEqual(self.rooms[0].population.index.tolist(), [3, 4, 6, 7, 8, 10, 11])
+        self.assertEqual(self.rooms[1].population.index.tolist(), [0, 2])
+        self.assertEqual(self.rooms[2].population.index.tolist(), [1])
+        self.assertEqual(self.rooms[3].population.index.tolist(), [5, 9])
+        self.assertTrue((self.population.location[[0, 2]] == self.rooms[1]).all())
+
+        self.assertEqual(len(self.exits), 3)
+        self.assertEqual(sorted(self.enters, key=lambda e: e[1]),
+                         [(self.rooms[1], [0, 2]), (self.rooms[2], [1]), (self.rooms[3], [5, 9])])
+
+    def test_empty_regions_are_released(self):
+        self.relocator.move_agents_many(self.population.index, self.rooms[2])
+        self.assertNotIn(self.rooms[0], self.population.regions)
+        self.assertEqual(len(self.rooms[2].population), 12)
+
+    def test_absolute_positions_follow_region_origins(self):
+        self.rooms[1].origin = [20, 0]
+        self.relocator.move_agents(np.array([1, 4]), self.rooms[1])
+        expected = self.population.position + [r.get_absolute_origin() for r in self.population.location]
+        self.assertTrue(np.allclose(self.relocator.get_absolute_positions(), expected))
+
+        # Moving a region invalidates the cached origins
+        self.rooms[1].origin = [30, 5]
+        positions = self.relocator.get_absolute_positions()
+        self.assertTrue(np.allclose(positions[[1, 4]], self.population.position[[1, 4]] + [30, 5]))
+        self.assertTrue(np.allclose(positions[0], self.population.position[0] + self.rooms[0].get_absolute_origin()))
+
+    def test_absolute_origins_follow_reparenting(self):
+        building = CompositeWorld(dims=(100, 100), origin=[40, 10])
+        self.rooms[1].origin = [20, 0]
+        self.assertTrue(np.allclose(self.rooms[1].get_absolute_origin(), [20, 0]))
+
+        # Re-parenting a region invalidates the cached origins
+        building.add_regions([self.rooms[1]])
+        self.assertIs(self.rooms[1].parent, building)
+        self.assertTrue(np.allclose(self.rooms[1].get_absolute_origin(), [60, 10]))
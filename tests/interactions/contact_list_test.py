@@ -0,0 +1,58 @@
+import numpy as np
+
+from i2mb.interactions.contact_list import ContactList, ContactStore
+from tests.i2mb_test_case import I2MBTestCase
+
+
+class TestContactStore(I2MBTestCase):
+    def setUp(self) -> None:
+        np.random.seed(7)
+        self.n = 20
+        self.track_time = 6
+        self.store = ContactStore(self.n, self.track_time)
+        self.contact_lists = [ContactList(self.track_time) for _ in range(self.n)]
+
+    def run_updates(self, steps=40, duration=None):
+        for t in range(steps):
+            pairs = np.random.randint(0, self.n, (15, 2))
+            pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+            self.store.update(pairs[:, 0], pairs[:, 1], t)
+            for a in np.unique(pairs[:, 0]):
+                self.contact_lists[a].update(pairs[pairs[:, 0] == a, 1], t, duration)
+
+            for cl in self.contact_lists:
+                cl.prune(t)
+
+            self.store.prune(t)
+
+    def assertSameContacts(self):
+        for a, cl in enumerate(self.contact_lists):
+            self.assertEqual(sorted(cl.contacts), self.store.contacts(a).tolist())
+
+    def test_matches_contact_list(self):
+        self.run_updates()
+        self.assertSameContacts()
+        a, b = self.store.a, self.store.b
+        for row in range(len(self.store)):
+            contact = self.contact_lists[a[row]].contacts[b[row]]
+            self.assertEqual(contact.latest, self.store.first_seen[row])
+            self.assertEqual(contact.current, self.store.current_run[row])
+            self.assertEqual(contact.longest, self.store.longest_run[row])
+
+        self.assertEqualAll(self.store.num_contacts(), [len(cl) for cl in self.contact_lists])
+
+    def test_enforce_duration(self):
+        self.run_updates(duration=2)
+        for cl in self.contact_lists:
+            cl.enforce_duration(2)
+
+        self.store.enforce_duration(2)
+        self.assertSameContacts()
+
+    def test_disabled_agents_and_symmetry(self):
+        self.store.enabled[3] = False
+        self.store.update([1, 2], [3, 4], 0, symmetric=True)
+        self.assertEqual(self.store.contacts(1).tolist(), [3])
+        self.assertEqual(self.store.contacts(3).tolist(), [])
+        self.assertEqual(self.store.contacts(4).tolist(), [2])
+        self.assertEqual(self.store.contacts_of([1, 4]).tolist(), [2, 3])
@@ -0,0 +1,42 @@
+import numpy as np
+
+from i2mb.interactions.contact_matrix import ContactMatrix
+from tests.i2mb_test_case import I2MBTestCase
+
+
+class TestContactMatrix(I2MBTestCase):
+    def setUp(self) -> None:
+        self.contact_matrix = ContactMatrix(100_000)
+
+    def test_sufficient_contact(self):
+        for _ in range(3):
+            self.contact_matrix.reset()
+            self.contact_matrix.update_contacts(np.array([[1, 2], [5, 99_999]]))
+
+        self.contact_matrix.reset()
+        self.contact_matrix.update_contacts(np.array([[1, 2], [3, 4], [3, 4]]))
+        self.assertEqual(self.contact_matrix.get_sufficient_contact(4).tolist(), [[1, 2]])
+        self.assertEqual(self.contact_matrix.get_sufficient_contact(3).tolist(), [[1, 2], [5, 99_999]])
+        self.assertEqual(self.contact_matrix.get_sufficient_contact(1).tolist(), [[1, 2], [3, 4], [5, 99_999]])
+
+    def test_new_sufficient_contact(self):
+        new_contacts = []
+        for contacts in [[[1, 2]], [[1, 2], [3, 4]], [[1, 2], [3, 4]], [[3, 4]], [[1, 2]], [[1, 2]]]:
+            self.contact_matrix.reset()
+            self.contact_matrix.update_contacts(np.array(contacts))
+            new_contacts.append(self.contact_matrix.get_new_sufficient_contact(2).tolist())
+
+        self.assertListEqual(new_contacts, [[], [[1, 2]], [[3, 4]], [], [], [[1, 2]]])
+        self.assertEqual(self.contact_matrix.get_new_sufficient_contact(0).tolist(), [])
+
+    def test_reset_drops_interrupted_contacts(self):
+        self.contact_matrix.update_contacts(np.array([[1, 2], [3, 4]]))
+        self.contact_matrix.reset()
+        self.contact_matrix.update_contacts(np.array([[4, 3]]))
+        self.contact_matrix.reset()
+        self.assertEqual(len(self.contact_matrix), 1)
+        self.assertEqual(self.contact_matrix.get_sufficient_contact(2).tolist(), [[3, 4]])
+
+        self.contact_matrix.reset()
+        self.assertEqual(len(self.contact_matrix), 0)
+        self.assertEqual(self.contact_matrix.get_sufficient_contact(0).shape, (0, 2))
@@ -0,0 +1,159 @@
+import numpy as np
+
+from i2mb.pathogen.dynamic_infection import RegionVirusDynamicExposure
+from i2mb.utils import cache_manager
+from i2mb.utils.spatial_utils import get_region_contacts
+from tests.i2mb_test_case import I2MBTestCase
+from tests.pathogen.fixtures import create_population
+
+
+def region_exposure_function(t, region_vector_contacts, region_contacts, distances, population_index,
+                             infectiousness_level):
+    """Exposure of each agent in the region, sum of exp(-d) weighted by the infectiousness of its vectors."""
+    local = np.searchsorted(population_index, region_contacts[region_vector_contacts])
+    weights = np.exp(-distances[region_vector_contacts])
+    levels = infectiousness_level[population_index].ravel()
+    exposure = np.zeros(len(population_index))
+    np.add.at(exposure, local[:, 1], levels[local[:, 0]] * weights * (levels[local[:, 1]] == 0))
+    np.add.at(exposure, local[:, 0], levels[local[:, 1]] * weights * (levels[local[:, 0]] == 0))
+    return exposure
+
+
+def pair_exposure_function(t, vector_target, distances, infectiousness_level):
+    return infectiousness_level[vector_target[:, 0], 0] * np.exp(-distances)
+
+
+def ramp_infectiousness(tau, incubation, infectious_duration):
+    return np.clip(tau / (incubation + infectious_duration), 0, 1)
+
+
+class TestRegionVirusDynamicExposure(I2MBTestCase):
+    def setUp(self) -> None:
+        cache_manager.time = 0
+        self.population = create_population()
+
+        self.infectiousness = 0.01
+        self.pathogen = RegionVirusDynamicExposure(
+            region_exposure_function, lambda t, time_exposed, exposure: exposure,
+            lambda t, inc, dur: np.full(t.shape, self.infectiousness), self.population, radius=2,
+            illness_duration_distribution=lambda n: np.full(n, 200),
+            incubation_duration_distribution=lambda n: np.full(n, 100))
+
+        # Vectors in the first two rooms, the last room has no infections.
+        self.vectors = np.array([0, 1, 12])
+        self.pathogen.infect_particles(self.vectors, 0, skip_incubation=True)
+        self.pathogen.wave_done = False
+        self.pathogen.waves.append([0, None])
+
+    def expected_exposure(self):
+        region_contacts = get_region_contacts(self.population, self.pathogen.radius)
+        exposure = np.zeros(len(self.population))
+        vector = np.isin(self.population.index, self.vectors)
+        for (a, b), d in zip(region_contacts.pairs, region_contacts.distances):
+            if vector[a] != vector[b]:
+                exposure[b if vector[a] else a] += self.infectiousness * np.exp(-d)
+
+        return exposure
+
+    def test_region_and_pair_exposure(self):
+        self.pathogen.step(1)
+        expected = self.expected_exposure()
+        self.assertTrue(expected[20:].sum() == 0 and expected.sum() > 0)
+        self.assertTrue(np.allclose(self.pathogen.exposure.ravel(), expected))
+
+        self.pathogen.exposure[:] = 0
+        self.pathogen.pair_exposure_function = pair_exposure_function
+        self.pathogen.step(1)
+        self.assertTrue(np.allclose(self.pathogen.exposure.ravel(), expected))
+        self.assertEqual(len(self.pathogen.transmission_log), 0)
+
+    def test_transmission_events(self):
+        self.infectiousness = 5
+        self.pathogen.pair_exposure_function = pair_exposure_function
+        self.pathogen.step(1)
+
+        region_contacts = get_region_contacts(self.population, self.pathogen.radius)
+        infected_by = {}
+        exposure = self.pathogen.exposure.ravel()
+        vector = np.isin(self.population.index, self.vectors)
+        for (a, b), region_id in zip(region_contacts.pairs, region_contacts.pair_region_ids):
+            if vector[a] != vector[b]:
+                source, target = (a, b) if vector[a] else (b, a)
+                if exposure[target] >= .99:
+                    infected_by.setdefault(target, (source, region_id))
+
+        self.assertGreater(len(infected_by), 0)
+        self.assertDictEqual({k: v[0] for k, v in infected_by.items()},
+                             {ix: s for ix, s in enumerate(self.pathogen.infected_by.tolist()) if s >= 0})
+
+        events = self.pathogen.transmission_log.events
+        self.assertTrue((events[:, 0] == 1).all())
+        self.assertDictEqual({target: (source, region_id) for _, source, target, region_id in events.tolist()},
+                             infected_by)
+
+        # Targets are only recorded once
+        cache_manager.time = 1
+        self.pathogen.step(2)
+        events = self.pathogen.transmission_log.events
+        self.assertEqual(len(np.unique(events[:, 2])), len(events))
+        self.assertTrue((self.pathogen.infected_by[events[:, 2]] == events[:, 1]).all())
+        self.assertEqual(self.pathogen.r(), len(events) / len(np.unique(events[:, 1])))
+
+    def test_contact_counts(self):
+        self.pathogen.step(1)
+        self.assertEqual(self.pathogen.contact_counts.sum(), 0)
+
+        self.pathogen.contact_sample_rate = 1
+        cache_manager.time = 1
+        self.pathogen.step(2)
+        pairs = get_region_contacts(self.population, self.pathogen.radius).pairs
+        self.assertListEqual(self.pathogen.contact_counts.tolist(),
+                             np.bincount(pairs.ravel(), minlength=len(self.population)).tolist())
+
+    def create_pathogen(self, **kwargs):
+        pathogen = RegionVirusDynamicExposure(
+            region_exposure_function, lambda t, time_exposed, exposure: exposure, ramp_infectiousness,
+            self.population, radius=2, illness_duration_distribution=lambda n: np.arange(n) + 100,
+            incubation_duration_distribution=lambda n: np.full(n, 100), pair_exposure_function=pair_exposure_function,
+            **kwargs)
+        pathogen.infect_particles(self.vectors, 0, skip_incubation=True)
+        pathogen.wave_done = False
+        pathogen.waves.append([0, None])
+        return pathogen
+
+    def test_tabulated_infectiousness(self):
+        pathogens = [self.create_pathogen(), self.create_pathogen(infectiousness_table="agent")]
+        for t in [10, 60]:
+            for pathogen in pathogens:
+                pathogen.step(t)
+
+            self.assertTrue(np.allclose(pathogens[0].infectiousness_level, pathogens[1].infectiousness_level))
+            self.assertTrue(np.allclose(pathogens[0].exposure, pathogens[1].exposure))
+
+        self.assertEqual(len(pathogens[1].infectiousness_table), 230)
+
+        # Only the infected agents are tabulated
+        self.assertEqual(pathogens[1].infectiousness_table.num_rows, len(self.vectors))
+        self.assertListEqual(np.flatnonzero(pathogens[1].infectiousness_table.rows >= 0).tolist(),
+                             self.vectors.tolist())
+        self.assertRaises(ValueError, self.create_pathogen, infectiousness_table="shared")
+
+        shared = self.create_pathogen(infectiousness_table=[0, 1, 2], infectiousness_resolution=100)
+        shared.step(10)
+        self.assertListEqual(shared.infectiousness_level[self.vectors, 0].tolist(), [1, 1, 1])
+        shared.step(110)
+        self.assertListEqual(shared.infectiousness_level[self.vectors, 0].tolist(), [2, 2, 2])
+
+    def test_lazy_infectiousness(self):
+        eager, lazy = self.create_pathogen(), self.create_pathogen(lazy_infectiousness=True)
+
+        # Vector 12 is isolated from susceptible agents
+        self.population.position[10:20] = [3, 3]
+        self.population.position[12] = [0, 0]
+        for pathogen in [eager, lazy]:
+            pathogen.step(10)
+
+        self.assertTrue(np.allclose(eager.exposure, lazy.exposure))
+        self.assertTrue(np.allclose(eager.infectiousness_level[[0, 1]], lazy.infectiousness_level[[0, 1]]))
+        self.assertGreater(eager.infectiousness_level[12, 0], 0)
+        self.assertEqual(lazy.infectiousness_level[12, 0], 0)
@@ -0,0 +1,21 @@
+import numpy as np
+
+from i2mb.engine.agents import AgentList
+from i2mb.engine.relocator import Relocator
+from i2mb.worlds import CompositeWorld
+
+
+def create_population(n=30, num_rooms=3, size=3):
+    """Population of `n` agents split in contiguous blocks over `num_rooms` square rooms of side `size`, at seeded
+    random positions. Agents move freely and none of them is at home."""
+    population = AgentList(n)
+    rooms = [CompositeWorld(dims=(size, size)) for _ in range(num_rooms)]
+    world = CompositeWorld(regions=rooms, population=population)
+    relocator = Relocator(population, world)
+    for ids, room in zip(np.array_split(population.index, num_rooms), rooms):
+        relocator.move_agents(ids, room)
+
+    population.add_property("motion_mask", np.ones((n, 1), dtype=bool))
+    population.add_property("at_home", np.zeros(n, dtype=bool))
+    population.position[:] = np.random.default_rng(1).random((n, 2)) * size
+    return population
@@ -0,0 +1,121 @@
+import numpy as np
+from scipy.spatial.distance import pdist, squareform
+
+from i2mb.pathogen import UserStatesLegacy as UserStates
+from i2mb.pathogen.base_pathogen import distribute_blame
+from i2mb.pathogen.infection import CoronaVirus
+from i2mb.utils import cache_manager
+from tests.i2mb_test_case import I2MBTestCase
+from tests.pathogen.fixtures import create_population
+
+
+class DenseKernel:
+    """Reference implementation of the dense N x N infection kernel the sparse pair path replaced. Contact runs follow
+    the semantics of :class:`Contact`, a run starts at 0 and grows by one every consecutive tick of exposure."""
+
+    def __init__(self, n, radius, exposure_time):
+        self.radius = radius
+        self.exposure_time = exposure_time
+        self.last_seen = np.full((n, n), -2)
+        self.run = np.zeros((n, n), dtype=int)
+
+    def step(self, t, positions, infectious, susceptible):
+        particles_in_proximity = squareform(pdist(positions, "sqeuclidean")) < self.radius
+        np.fill_diagonal(particles_in_proximity, False)
+        exposed = particles_in_proximity & infectious[:, None] & susceptible[None, :]
+
+        continued = exposed & (self.last_seen == t - 1)
+        self.run[exposed & ~continued] = 0
+        self.run[continued] += 1
+        self.last_seen[exposed] = t
+
+        new_infections = exposed & (self.run >= self.exposure_time)
+        num_infected_contacts = new_infections.sum(axis=0)
+        infected = num_infected_contacts > 0
+        blame = (new_infections[:, infected] / num_infected_contacts[infected]).sum(axis=1)
+        return np.flatnonzero(infected), blame
+
+
+class TestInfectionKernel(I2MBTestCase):
+    def setUp(self) -> None:
+        np.random.seed(4)
+        cache_manager.time = 0
+
+    def create_pathogen(self, exposure_time, columnar):
+        self.population = create_population(40, num_rooms=1, size=10)
+
+        pathogen = CoronaVirus(2, exposure_time, self.population, columnar=columnar,
+                               incubation_distribution=lambda size: np.full(size, 1000),
+                               duration_distribution=lambda size: np.full(size, 1000))
+        pathogen.infect_particles(np.arange(8), 0, skip_incubation=True)
+        pathogen.wave_done = False
+        pathogen.waves.append([0, None])
+        return pathogen
+
+    def test_sparse_path_matches_dense_kernel(self):
+        for columnar in [False, True]:
+            with self.subTest(columnar=columnar):
+                cache_manager.time = 0
+                pathogen = self.create_pathogen(3, columnar)
+                reference = DenseKernel(len(self.population), pathogen.radius, pathogen.exposure_time)
+
+                rng = np.random.default_rng(2)
+                total_infected, shared_blame = 0, False
+                for t in range(1, 40):
+                    cache_manager.time = t
+                    positions = self.population.position
+                    positions[:] = np.clip(positions + rng.normal(0, .3, positions.shape), 0, 10)
+
+                    infectious = (pathogen.states == UserStates.infected).ravel()
+                    susceptible = (pathogen.states == UserStates.susceptible).ravel()
+                    blame = pathogen.particles_infected.ravel().copy()
+                    expected_ids, expected_blame = reference.step(t, positions, infectious, susceptible)
+
+                    pathogen.step(t)
+                    new_infections = np.flatnonzero(susceptible & (pathogen.states != UserStates.susceptible).ravel())
+                    self.assertListEqual(new_infections.tolist(), expected_ids.tolist(), msg=f"t = {t}")
+                    self.assertTrue(np.allclose(pathogen.particles_infected.ravel() - blame, expected_blame))
+                    total_infected += len(new_infections)
+                    shared_blame |= (expected_blame % 1 != 0).any()
+
+                # Some targets are infected by several vectors, and not everyone is infected.
+                self.assertTrue(shared_blame)
+                self.assertTrue(0 < total_infected < len(self.population) - 8)
+
+    def test_exposure_time_threshold(self):
+        for columnar in [False, True]:
+            with self.subTest(columnar=columnar):
+                cache_manager.time = 0
+                pathogen = self.create_pathogen(3, columnar)
+                self.population.position[:] = 9
+                self.population.position[[0, 1]] = [[1, 1], [1, 2]]
+                pathogen.states[1:8, 0] = UserStates.susceptible
+
+                # Contact during ticks 1, 2, interrupted at 3, and resumed from 4 onwards.
+                infected_at = None
+                for t in range(1, 10):
+                    cache_manager.time = t
+                    self.population.position[1] = [1, 2] if t != 3 else [5, 5]
+                    pathogen.step(t)
+                    if infected_at is None and pathogen.states[1, 0] != UserStates.susceptible:
+                        infected_at = t
+
+                # The run restarts at 4 and reaches the exposure time of 3 ticks at 7.
+                self.assertEqual(infected_at, 7)
+                self.assertEqual(pathogen.particles_infected[0, 0], 1)
+
+    def test_distribute_blame_with_duplicate_targets(self):
+        vector_target = np.array([[0, 5], [1, 5], [2, 5], [0, 6], [3, 7], [1, 7]])
+        blame = distribute_blame(vector_target, 8)
+        self.assertTrue(np.allclose(blame, [1 / 3 + 1, 1 / 3 + 1 / 2, 1 / 3, 1 / 2, 0, 0, 0, 0]))
+
+        # Every infected target is blamed exactly once.
+        self.assertAlmostEqual(blame.sum(), 3)
+
+        # Same split as the dense kernel.
+        new_infections = np.zeros((8, 8), dtype=bool)
+        new_infections[vector_target[:, 0], vector_target[:, 1]] = True
+        num_infected_contacts = new_infections.sum(axis=0)
+        infected = num_infected_contacts > 0
+        dense_blame = (new_infections[:, infected] / num_infected_contacts[infected]).sum(axis=1)
+        self.assertTrue(np.allclose(blame, dense_blame))
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+import numpy as np
+
+from i2mb.pathogen.infectiousness_table import InfectiousnessTable, LazyInfectiousnessTable
+
+
+def ramp(tau, peak, duration):
+    return np.clip(np.minimum(tau / peak, (duration - tau) / (duration - peak)), 0, 1)
+
+
+class TestInfectiousnessTable(TestCase):
+    def test_from_function(self):
+        peak, duration = np.array([2., 4., 5.]), np.array([6., 8., 7.])
+        table = InfectiousnessTable.from_function(ramp, (peak, duration), 8, resolution=2)
+        self.assertEqual(len(table), 5)
+        self.assertFalse(table.shared)
+
+        ids = np.array([2, 0, 1, 1])
+        tau = np.array([4, 2, 4, 5])
+        self.assertTrue(np.allclose(table.lookup(ids, tau), ramp(np.array([4, 2, 4, 4]), peak[ids], duration[ids])))
+
+        # Past the end of the table
+        self.assertTrue(np.allclose(table.lookup(ids, tau + 100), 0))
+
+    def test_shared_curve(self):
+        table = InfectiousnessTable([0, .5, 1, .5])
+        self.assertTrue(table.shared)
+        self.assertListEqual(table.lookup(np.array([7, 3, 9]), np.array([-1, 2, 10])).tolist(), [0, 1, .5])
+
+    def test_lazy_table(self):
+        peak, duration = np.array([2., 4., 5., 3.]), np.array([6., 8., 7., 4.])
+        tabulated = []
+
+        def parameters(ids):
+            tabulated.append(ids.tolist())
+            return peak[ids], duration[ids]
+
+        table = LazyInfectiousnessTable(ramp, parameters, 4, 8, resolution=2)
+        full_table = InfectiousnessTable.from_function(ramp, (peak, duration), 8, resolution=2)
+        self.assertEqual(len(table), len(full_table))
+
+        ids = np.array([2, 0, 2])
+        tau = np.array([4, 2, 7])
+        self.assertTrue(np.allclose(table.lookup(ids, tau), full_table.lookup(ids, tau)))
+        self.assertEqual(table.num_rows, 2)
+
+        # Only new agents are tabulated
+        ids = np.array([1, 2, 3, 0])
+        self.assertTrue(np.allclose(table.lookup(ids, tau[[0, 1, 2, 0]]), full_table.lookup(ids, tau[[0, 1, 2, 0]])))
+        self.assertListEqual(tabulated, [[0, 2], [1, 3]])
+        self.assertEqual(table.num_rows, 4)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+import numpy as np
+
+from i2mb.pathogen import UserStatesLegacy as UserStates
+from i2mb.pathogen import multi_strain
+from i2mb.pathogen.multi_strain import MultiStrainVirus
+from i2mb.utils import cache_manager
+from tests.i2mb_test_case import I2MBTestCase
+from tests.pathogen.fixtures import create_population
+
+
+class TestMultiStrainVirus(I2MBTestCase):
+    def setUp(self) -> None:
+        np.random.seed(2)
+        cache_manager.time = 0
+        self.population = create_population()
+
+    def create_pathogen(self, exposure_time=1, **kwargs):
+        return MultiStrainVirus(2, exposure_time, self.population, duration_distribution=lambda size: np.full(size, 3),
+                                incubation_distribution=lambda size: np.full(size, 1), death_rate=0, **kwargs)
+
+    def run_steps(self, pathogen, steps, t0=1):
+        for t in range(t0, t0 + steps):
+            cache_manager.time = t
+            pathogen.step(t)
+
+    def test_single_contact_pass(self):
+        pathogen = self.create_pathogen(num_strains=3)
+        for strain in range(3):
+            pathogen.introduce_pathogen(1, 0, strain=strain)
+
+        with mock.patch.object(multi_strain, "get_region_contacts",
+                               wraps=multi_strain.get_region_contacts) as get_region_contacts:
+            self.run_steps(pathogen, 4)
+
+        self.assertEqual(get_region_contacts.call_count, 4)
+
+        # Strains spread, and agents carry a single active infection.
+        totals = pathogen.get_strain_totals()
+        self.assertLess(totals[UserStates.susceptible].sum(), 3 * (len(self.population) - 1))
+        active = (pathogen.strain_states == UserStates.incubation) | (pathogen.strain_states == UserStates.infected)
+        self.assertTrueAll(active.sum(axis=1) <= 1)
+        self.assertAlmostEqual(pathogen.particles_infected.sum(), pathogen.strain_particles_infected.sum())
+        self.assertAlmostEqual(pathogen.strain_particles_infected.sum(),
+                               (pathogen.strain_states != UserStates.susceptible).sum() - 3)
+
+    def test_cross_immunity(self):
+        pathogen = self.create_pathogen(cross_immunity=[[0, 1], [.5, 0]])
+        ids = np.arange(10)
+        pathogen.start_wave(0)
+        pathogen.infect_particles(ids, 0, skip_incubation=True, strain=0)
+        pathogen.infect_particles(ids + 10, 0, skip_incubation=True, strain=1)
+        self.assertEqualAll(self.population.state[:20], UserStates.infected)
+
+        pathogen.update_states(3)
+        self.assertEqualAll(self.population.state[:20], UserStates.immune)
+        self.assertEqualAll(pathogen.susceptibility[ids], [1, 0])
+        self.assertEqualAll(pathogen.susceptibility[ids + 10], [.5, 1])
+
+        susceptible = pathogen.get_susceptible()
+        self.assertFalseAny(susceptible[ids])
+        self.assertEqualAll(susceptible[ids + 10], [True, False])
+
+        # Immune to strain 1 and infected with strain 0 is infected.
+        pathogen.infect_particles(ids + 10, 3, skip_incubation=True, strain=0)
+        self.assertEqualAll(self.population.state[10:20], UserStates.infected)
+        self.assertEqualAll(self.population.strain[10:20], 0)
+
+        self.assertRaises(ValueError, self.create_pathogen, cross_immunity=np.zeros((3, 3)))
+        self.assertRaises(ValueError, self.create_pathogen, exposure_time=[1, 2, 3])
+
+    def test_waves(self):
+        pathogen = self.create_pathogen()
+        pathogen.introduce_pathogen(1, 0, strain=1)
+        self.run_steps(pathogen, 20)
+        self.assertTrue(pathogen.wave_done)
+        self.assertListEqual(pathogen.strain_waves[0], [])
+        self.assertIsNotNone(pathogen.strain_waves[1][0][1])
+        self.assertEqual(pathogen.waves[0][1], pathogen.strain_waves[1][0][1])
+
+    def test_susceptibility_per_exposure(self):
+        population = create_population(100, num_rooms=1)
+        population.position[:] = 1
+        pathogen = MultiStrainVirus(1, 2, population, duration_distribution=lambda size: np.full(size, 100),
+                                    incubation_distribution=lambda size: np.full(size, 100), death_rate=0)
+        pathogen.susceptibility[:, 0] = .1
+        pathogen.introduce_pathogen(1, 0, strain=0, skip_incubation=True)
+
+        # Sustained contact exposes every agent once, so about a tenth of them is infected.
+        infected = []
+        for t in range(1, 31):
+            cache_manager.time = t
+            pathogen.step(t)
+            infected.append((pathogen.strain_states[:, 0] != UserStates.susceptible).sum() - 1)
+
+        self.assertEqual(infected[0], 0)
+        self.assertEqual(infected[1], infected[-1])
+        self.assertTrue(0 < infected[-1] < 25)
@@ -0,0 +1,71 @@
+from functools import partial
+
+import numpy as np
+
+from i2mb.pathogen import UserStates
+from i2mb.pathogen.dynamic_infection import RegionVirusDynamicExposure
+from i2mb.pathogen.infection import RegionCoronaVirus
+from i2mb.utils import cache_manager
+from tests.i2mb_test_case import I2MBTestCase
+from tests.pathogen.dynamic_exposure_test import pair_exposure_function, ramp_infectiousness, \
+    region_exposure_function
+from tests.pathogen.fixtures import create_population
+
+
+def create_corona_virus(scheduled_progression):
+    np.random.seed(3)
+    return RegionCoronaVirus(1, 2, create_population(60), asymptomatic_p=0.4, death_rate=.2,
+                             duration_distribution=partial(np.random.normal, 15, 4),
+                             incubation_distribution=partial(np.random.normal, 6, 2),
+                             scheduled_progression=scheduled_progression)
+
+
+def create_dynamic_exposure(scheduled_progression):
+    np.random.seed(3)
+    return RegionVirusDynamicExposure(
+        region_exposure_function, lambda t, time_exposed, exposure: exposure * .5, ramp_infectiousness,
+        create_population(60), radius=1, illness_duration_distribution=lambda n: np.random.uniform(5, 20, n),
+        incubation_duration_distribution=lambda n: np.random.uniform(2, 8, n), death_rate=.2,
+        pair_exposure_function=lambda *args: 10 * pair_exposure_function(*args),
+        scheduled_progression=scheduled_progression)
+
+
+class TestScheduledProgression(I2MBTestCase):
+    def run_pathogens(self, create_pathogen, skip_incubation, steps=60):
+        history = []
+        for scheduled_progression in [False, True]:
+            pathogen = create_pathogen(scheduled_progression)
+            pathogen.introduce_pathogen(4, 0, skip_incubation=skip_incubation)
+            states = []
+            for t in range(1, steps):
+                # Transitions brought forward by a change of the disease profile need to be scheduled again.
+                if t == 5:
+                    pathogen.incubation_duration[:20] += 3
+                    pathogen.infectious_duration_pso[20:40] -= 2
+                    if scheduled_progression:
+                        pathogen.schedule_transitions(np.arange(20, 40))
+
+                cache_manager.time = t
+                pathogen.step(t)
+                states.append(pathogen.states.ravel().copy())
+
+            history.append(np.array(states))
+
+        # The scheduled progression freezes the deceased on their outcome.
+        deceased = pathogen.states.ravel() == UserStates.deceased
+        self.assertTrueAny(deceased)
+        self.assertEqualAll(pathogen.population.motion_mask.ravel(), ~deceased)
+
+        self.assertEqualAll(history[0], history[1])
+        return history[1]
+
+    def test_corona_virus(self):
+        for skip_incubation in [True, False]:
+            states = self.run_pathogens(create_corona_virus, skip_incubation)
+            self.assertGreater(len(np.unique(states)), 3)
+
+    def test_dynamic_exposure(self):
+        for skip_incubation in [True, False]:
+            states = self.run_pathogens(create_dynamic_exposure, skip_incubation)
+            self.assertTrueAny(states[-1] == UserStates.immune)
+            self.assertTrueAny(np.isin(states, [UserStates.infected, UserStates.infectious]))
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from i2mb.pathogen.transmission_log import TransmissionLog
+
+
+class TestTransmissionLog(TestCase):
+    def fill(self, log):
+        # 0 infects 1, 2, and 3; 1 infects 4; 3 infects 5 and 6.
+        log.append(1, np.array([0, 0]), np.array([1, 2]), np.array([10, 10]))
+        log.append(2, np.array([0, 1]), np.array([3, 4]), np.array([11, 12]))
+        log.append(4, np.array([3, 3]), np.array([5, 6]), 13)
+
+    def test_growth(self):
+        log = TransmissionLog(capacity=1)
+        self.fill(log)
+        self.assertEqual(len(log), 6)
+        self.assertListEqual(log.events.tolist(), [[1, 0, 1, 10], [1, 0, 2, 10], [2, 0, 3, 11], [2, 1, 4, 12],
+                                                   [4, 3, 5, 13], [4, 3, 6, 13]])
+
+    def test_spill(self):
+        in_memory = TransmissionLog()
+        self.fill(in_memory)
+        with tempfile.TemporaryDirectory() as directory:
+            spill_file = os.path.join(directory, "transmissions.bin")
+            log = TransmissionLog(spill_file=spill_file, chunk_size=3)
+            self.assertEqual(len(log.events), 0)
+
+            self.fill(log)
+            self.assertEqual(log.num_spilled, 4)
+            events = log.events
+            self.assertIsInstance(events, np.memmap)
+            self.assertListEqual(events.tolist(), in_memory.events.tolist())
+            self.assertEqual(os.path.getsize(spill_file), events.nbytes)
+            del events
+
+    def test_queries(self):
+        log = TransmissionLog()
+        self.fill(log)
+        self.assertListEqual(log.secondary_cases(8).tolist(), [3, 1, 0, 2, 0, 0, 0, 0])
+
+        # Agent 7 was infected but did not infect anyone
+        self.assertListEqual(log.secondary_case_distribution(np.arange(8)).tolist(), [5, 1, 1, 1])
+
+        time_of_infection = np.array([0, 1, 1, 2, 2, 4, 4, 0])
+        self.assertListEqual(log.serial_intervals(time_of_infection).tolist(), [1, 1, 2, 1, 2, 2])
+
+        self.assertEqual(log.r(), 6 / 3)
+        active = np.zeros(8, dtype=bool)
+        active[[1, 2, 3]] = True
+        self.assertEqual(log.r_current(active), 3 / 2)
+        self.assertEqual(TransmissionLog().r(), 0)
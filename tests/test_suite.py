@@ -1,15 +1,32 @@
 import unittest
 
 from tests.world_tester import WorldBuilderTestsNoGui
-from tests.core.agent_lists_test import TestAgentList
+from tests.core.agent_lists_test import TestAgentList, TestColumnarAgentList, TestAgentListViewMembership
+from tests.core.relocator_test import TestRelocator
+from tests.core.engine_profiler_test import TestEngineProfiler
 from tests.motion.random_motion_test import RandomMotion
 from tests.activities.base_activity_test import TestActivityList
+from tests.activities.activity_property_access_test import TestActivityPropertyAccess
+from tests.activities.activity_queue_controller_test import TestEnforceUniqueResourceUtilization
 from tests.activities.activity_manager_test import TestActivityManager
+from tests.activities.activity_diary_test import TestActivityDiary
 from tests.activities.default_activity_controller_test import TestDefaultActivityController
 from tests.activities.sleep_behaviour_test import TestSleepBehaviourNoGui
 from tests.activities.location_activity_controller_test import TestLocationActivityControllerNoGui
+from tests.activities.schedule_routines_test import TestCompiledSchedule, TestCompiledScheduleRoutines
 # from tests.activities.activity_queue_test import ActivityQueueTest
-from tests.activities.activity_descriptor_queue_tests import ActivityDescriptorQueueTest
+from tests.activities.activity_descriptor_queue_tests import ActivityDescriptorQueueTest, \
+    RingActivityDescriptorQueueTest
+from tests.utils.spatial_utils_tests import TestNeighbourSearch, TestRegionContacts
+from tests.utils.colelctions_tests import TestEventQueue
+from tests.interactions.contact_matrix_test import TestContactMatrix
+from tests.interactions.contact_list_test import TestContactStore
+from tests.pathogen.dynamic_exposure_test import TestRegionVirusDynamicExposure
+from tests.pathogen.infection_kernel_test import TestInfectionKernel
+from tests.pathogen.transmission_log_test import TestTransmissionLog
+from tests.pathogen.infectiousness_table_test import TestInfectiousnessTable
+from tests.pathogen.multi_strain_test import TestMultiStrainVirus
+from tests.pathogen.progression_test import TestScheduledProgression
 
 if __name__ == '__main__':
     unittest.main()
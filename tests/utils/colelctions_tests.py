@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from i2mb.utils.collections import ConstrainedDict
+import numpy as np
+
+from i2mb.utils.collections import ConstrainedDict, EventQueue
 
 
 class TestConstrainedDict(TestCase):
@@ -23,3 +25,26 @@ class TestConstrainedDict(TestCase):
             self.assertEqual(str(e), "'Test message for key b'")
 
 
+
+
+class TestEventQueue(TestCase):
+    def test_pop_due(self):
+        queue = EventQueue()
+        queue.schedule([5, 3, 5, 9], [0, 1, 2, 3], payload=[10, 11, 12, 13])
+        queue.schedule(3, [4])
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(queue.next_due(), 3)
+
+        due, ids, payload = queue.pop_due(2)
+        self.assertEqual(len(ids), 0)
+
+        due, ids, payload = queue.pop_due(5)
+        self.assertListEqual(due.tolist(), [3, 3, 5, 5])
+        self.assertListEqual(ids.tolist(), [1, 4, 0, 2])
+        self.assertListEqual(payload.tolist(), [11, 0, 10, 12])
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.next_due(), 9)
+
+        queue.pop_due(100)
+        self.assertEqual(len(queue), 0)
+        self.assertIsNone(queue.next_due())
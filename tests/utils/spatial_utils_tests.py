@@ -0,0 +1,61 @@
+import numpy as np
+
+from i2mb.engine.agents import AgentList
+from i2mb.engine.relocator import Relocator
+from i2mb.utils import cache_manager
+from i2mb.utils.spatial_utils import brute_force_pairs, grid_pairs, kdtree_pairs, set_neighbour_search, \
+    get_region_contacts, contacts_within_radius
+from i2mb.worlds import CompositeWorld
+from tests.i2mb_test_case import I2MBTestCase
+
+
+class TestNeighbourSearch(I2MBTestCase):
+    def setUp(self) -> None:
+        np.random.seed(3)
+
+    def test_engines_match_brute_force(self):
+        for n, side, radius in [(2, 1, .5), (40, 10, 1.), (300, 10, .25), (500, 100, 4.), (200, 1, 0.)]:
+            pos = np.random.random((n, 2)) * side
+            expected_idx, expected_d = brute_force_pairs(pos, radius)
+            for engine in [grid_pairs, kdtree_pairs]:
+                idx, d = engine(pos, radius)
+                self.assertEqual(idx.shape, expected_idx.shape, msg=f"{engine.__name__}, n={n}")
+                self.assertEqualAll(idx, expected_idx, msg=f"{engine.__name__}, n={n}")
+                self.assertTrue(np.allclose(d, expected_d), msg=f"{engine.__name__}, n={n}")
+
+    def test_only_pairs_within_radius(self):
+        pos = np.array([[0., 0.], [0.5, 0.], [2., 0.], [2., 0.9]])
+        idx, d = grid_pairs(pos, 1.)
+        self.assertEqual(idx.tolist(), [[0, 1], [2, 3]])
+        self.assertLessAll(d, 1.)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            set_neighbour_search("octree")
+
+
+class TestRegionContacts(I2MBTestCase):
+    def setUp(self) -> None:
+        self.population = AgentList(6)
+        self.world = CompositeWorld(regions=[CompositeWorld(dims=(10, 10)), CompositeWorld(dims=(10, 10))],
+                                    population=self.population)
+        self.relocator = Relocator(self.population, self.world)
+        self.relocator.move_agents(self.population.index[:4], self.world.regions[0])
+        self.relocator.move_agents(self.population.index[4:], self.world.regions[1])
+        self.population.position[:] = [[0, 0], [0.5, 0], [5, 5], [9, 9], [1, 1], [1, 1.5]]
+        cache_manager.invalidate()
+
+    def test_region_contacts(self):
+        region_contacts = get_region_contacts(self.population, 1.)
+        self.assertEqual(len(region_contacts), 2)
+        self.assertEqual(region_contacts.region(self.world.regions[0])[0].tolist(), [[0, 1]])
+        self.assertEqual(region_contacts.region(self.world.regions[1].id)[0].tolist(), [[4, 5]])
+        self.assertEqual(sorted(region_contacts.pairs.tolist()), [[0, 1], [4, 5]])
+        self.assertEqual(len(region_contacts.region(self.world)[0]), 0)
+        self.assertEqual(sorted(region_contacts.pair_region_ids.tolist()),
+                         sorted([self.world.regions[0].id, self.world.regions[1].id]))
+
+    def test_results_are_cached_per_radius(self):
+        self.assertIs(get_region_contacts(self.population, 1.), get_region_contacts(self.population, 1.))
+        self.assertIsNot(get_region_contacts(self.population, 1.), get_region_contacts(self.population, 100.))
+        self.assertEqual(sum(len(c) for c in contacts_within_radius(self.population, 100.)), 5)
@@ -213,6 +213,23 @@ class WorldBuilderTestsNoGui(TestCase):
 
             self.assertListEqual(list(index_entry), expected)
 
+    def test_region_tree(self):
+        w = WorldBuilder(world_cls=Apartment, world_kwargs=dict(num_residents=6), no_gui=True)
+        tree = w.universe.region_tree
+        for region in w.universe.list_all_regions():
+            self.assertIs(region.region_tree, tree)
+            children = sorted(r.index for r in getattr(region, "regions", []))
+            self.assertListEqual(sorted(tree.get_children(region.index)), children)
+
+            subtree = sorted(r.index for r in region.list_all_regions())
+            self.assertListEqual(sorted(tree.get_subtree(region.index)), subtree)
+            self.assertEqual(tree.get_subtree(region.index)[0], region.index)
+
+        parents = [w.universe.index, w.universe.regions[0].index]
+        children, children_parents = tree.get_children_of(parents)
+        for parent in parents:
+            self.assertListEqual(sorted(children[children_parents == parent]), sorted(tree.get_children(parent)))
+
     def test_global_time_update(self):
         w = WorldBuilder(world_cls=Apartment, world_kwargs=dict(num_residents=6), no_gui=True)
         t = time()